@@ -1,5 +1,5 @@
 const { app, ipcMain } = require('electron')
-const { execSync, exec } = require('child_process')
+const { execSync, spawn } = require('child_process')
 const fs = require('fs')
 const path = require('path')
 
@@ -120,6 +120,17 @@ function inferPartitionFlags(partition) {
   return flags
 }
 
+// 解析 eulerinstall --progress-json 输出的进度事件行，非事件行返回 null
+function parseProgressEvent(line) {
+  const trimmed = line.trim()
+  if (!trimmed.startsWith('{"event"')) return null
+  try {
+    return JSON.parse(trimmed)
+  } catch {
+    return null
+  }
+}
+
 function registerIpcListeners() {
   // 获取启动模式
   ipcMain.handle('get-boot-mode', () => {
@@ -134,22 +145,39 @@ function registerIpcListeners() {
   ipcMain.handle('install-system', async (event, { configPath, userConfigPath }) => {
     const webContents = event.sender
 
-    let installCommand
+    // --progress-json: eulerinstall 在 stdout 中输出逐行 JSON 进度事件（已在安装器侧限流）
+    const installArgs = ['eulerinstall', '--config', configPath]
     if (userConfigPath) {
       // 使用两个配置文件：eulerinstall配置和用户配置
-      installCommand = `sudo eulerinstall --config ${configPath} --creds ${userConfigPath} --silent`
-    } else {
-      // 只使用eulerinstall配置文件
-      installCommand = `sudo eulerinstall --config ${configPath} --silent`
+      installArgs.push('--creds', userConfigPath)
     }
+    installArgs.push('--silent', '--progress-json')
 
-    console.log('Install command:', installCommand)
-    const installProcess = exec(installCommand);
+    console.log('Install command:', `sudo ${installArgs.join(' ')}`)
+    const installProcess = spawn('sudo', installArgs)
 
+    // stdout 按行拆分：进度事件转发到 install-progress，其余内容仍作为日志转发
+    let stdoutBuffer = ''
     installProcess.stdout.on('data', (data) => {
-      const log = data.toString()
-      console.log('Install stdout:', log)
-      webContents.send('install-log', log)
+      stdoutBuffer += data.toString()
+      const lines = stdoutBuffer.split('\n')
+      stdoutBuffer = lines.pop()
+
+      const logLines = []
+      for (const line of lines) {
+        const event = parseProgressEvent(line)
+        if (event) {
+          webContents.send('install-progress', event)
+        } else {
+          logLines.push(line)
+        }
+      }
+
+      if (logLines.length > 0) {
+        const log = logLines.join('\n')
+        console.log('Install stdout:', log)
+        webContents.send('install-log', log)
+      }
     });
 
     installProcess.stderr.on('data', (data) => {
@@ -160,6 +188,9 @@ function registerIpcListeners() {
 
     return new Promise((resolve) => {
       installProcess.on('close', (code) => {
+        if (stdoutBuffer) {
+          webContents.send('install-log', stdoutBuffer)
+        }
         if (code === 0) {
           resolve({ success: true })
         } else {
@@ -12,9 +12,13 @@
 import importlib
 import os
 import sys
+import threading
 import time
 import traceback
 
+# first, --profile-startup measures the imports below
+from .lib.startup import startup_profile
+
 from .lib.args import arch_config_handler
 from .lib.disk.utils import disk_layouts
 from .lib.packages.packages import check_package_upgrade
@@ -23,6 +27,7 @@ from .lib.hardware import SysInfo
 from .lib.output import FormattedOutput, debug, error, info, log, warn
 from .lib.pacman import Pacman
 from .lib.plugins import load_plugin, plugins
+from .lib.progress import progress
 from .lib.translationhandler import Language, tr, translation_handler
 from .tui.curses_menu import Tui
 
@@ -41,6 +46,8 @@ def _log_sys_info() -> None:
 	debug(f'Virtualization detected: {SysInfo.virtualization()}; is VM: {SysInfo.is_vm()}')
 	debug(f'Graphics devices detected: {SysInfo._graphics_devices().keys()}')
 
+
+def _log_disk_layouts() -> None:
 	# For support reasons, we'll log the disk layout pre installation to match against post-installation layout
 	debug(f'Disk states before installing:\n{disk_layouts()}')
 
@@ -94,29 +101,50 @@ def main() -> int:
 		print(tr('Archinstall requires root privileges to run. See --help for more.'))
 		return 1
 
+	with startup_profile.step('parse arguments'):
+		args = arch_config_handler.args
+
+	if args.progress_fd is not None:
+		progress.open_fd(args.progress_fd)
+	elif args.progress_json:
+		progress.open_stdout()
+
 	# 检测系统类型并记录信息
 	from .lib.system_detection import SystemType
-	SystemType.log_system_info()
-	
+
+	with startup_profile.step('detect system'):
+		SystemType.log_system_info()
+
 	# 检查系统是否支持
 	if not SystemType.is_supported():
 		warn('Warning: This system type is not officially supported by archinstall. Use at your own risk.')
 
-	_log_sys_info()
+	# 安装前的磁盘状态必须在分区之前记录，同步执行；硬件信息仅用于排查问题，在后台记录，不阻塞菜单的显示
+	with startup_profile.step('log disk layouts'):
+		_log_disk_layouts()
 
-	if not arch_config_handler.args.offline:
+	threading.Thread(target=_log_sys_info, name='sys-info', daemon=True).start()
+
+	if not args.offline:
 		# 根据系统类型执行不同的同步操作
 		system_type = SystemType.detect()
 		if system_type == 'openEuler':
-			_fetch_openEuler_db()
+			with startup_profile.step('fetch package metadata'):
+				_fetch_openEuler_db()
 		elif system_type == 'arch':
 			# Arch Linux 的默认行为
 			pass
 
-		if not arch_config_handler.args.skip_version_check:
-			_check_new_version()
+		if not args.skip_version_check:
+			with startup_profile.step('check version'):
+				_check_new_version()
+
+	with startup_profile.step('load configuration'):
+		script = arch_config_handler.get_script()
 
-	script = arch_config_handler.get_script()
+	if args.profile_startup:
+		startup_profile.stop_tracing()
+		info(f'Startup profile:\n{startup_profile.summary()}')
 
 	mod_name = f'eulerinstall.scripts.{script}'
 	print(mod_name)
@@ -60,6 +60,12 @@ class Arguments:
 	skip_version_check: bool = False
 	advanced: bool = False
 	verbose: bool = False
+	copy_workers: int = 0
+	progress_fd: int | None = None
+	progress_json: bool = False
+	os_prober: str = 'all'
+	initramfs_mode: str = 'hostonly'
+	profile_startup: bool = False
 
 
 @dataclass
@@ -258,27 +264,41 @@ class ArchConfig:
 
 class ArchConfigHandler:
 	def __init__(self) -> None:
-		self._parser: ArgumentParser = self._define_arguments()
-		args: Arguments = self._parse_args()
-		self._args = args
+		# the command line and the configuration are parsed on first use, not at import time
+		self._parser: ArgumentParser | None = None
+		self._args: Arguments | None = None
+		self._config: ArchConfig | None = None
 
-		config = self._parse_config()
-
-		try:
-			self._config = ArchConfig.from_config(config, args)
-			self._config.version = self._get_version()
-		except ValueError as err:
-			warn(str(err))
-			exit(1)
+	@property
+	def parser(self) -> ArgumentParser:
+		if self._parser is None:
+			self._parser = self._define_arguments()
+		return self._parser
 
 	@property
 	def config(self) -> ArchConfig:
+		if self._config is None:
+			self._config = self._load_config()
 		return self._config
 
 	@property
 	def args(self) -> Arguments:
+		if self._args is None:
+			self._args = self._parse_args()
 		return self._args
 
+	def _load_config(self) -> ArchConfig:
+		config = self._parse_config()
+
+		try:
+			arch_config = ArchConfig.from_config(config, self.args)
+			arch_config.version = self._get_version()
+		except ValueError as err:
+			warn(str(err))
+			exit(1)
+
+		return arch_config
+
 	def get_script(self) -> str:
 		if script := self.args.script:
 			return script
@@ -289,7 +309,7 @@ class ArchConfigHandler:
 		return 'guided'
 
 	def print_help(self) -> None:
-		self._parser.print_help()
+		self.parser.print_help()
 
 	def _get_version(self) -> str:
 		try:
@@ -428,11 +448,49 @@ class ArchConfigHandler:
 			default=False,
 			help='Enabled verbose options',
 		)
+		parser.add_argument(
+			'--copy-workers',
+			type=int,
+			default=0,
+			help='Number of parallel workers copying the root filesystem into the target (0 picks one per CPU, at most 8)',
+		)
+		parser.add_argument(
+			'--progress-fd',
+			type=int,
+			default=None,
+			help='Write newline-delimited JSON progress events to this file descriptor',
+		)
+		parser.add_argument(
+			'--progress-json',
+			action='store_true',
+			default=False,
+			help='Write newline-delimited JSON progress events to stdout (for front-ends which cannot pass a file descriptor)',
+		)
+		parser.add_argument(
+			'--os-prober',
+			type=str,
+			choices=['all', 'install-disk', 'off'],
+			default='all',
+			help='Which disks os-prober searches for other operating systems to add to the GRUB menu (probed once per installation)',
+		)
+		parser.add_argument(
+			'--initramfs-mode',
+			type=str,
+			choices=['hostonly', 'generic'],
+			default='hostonly',
+			help='Build host-only initramfs images for the selected kernels only, or generic images for every installed kernel',
+		)
+		parser.add_argument(
+			'--profile-startup',
+			action='store_true',
+			default=False,
+			help='Print the time spent importing modules and initializing before the script starts',
+		)
 
 		return parser
 
 	def _parse_args(self) -> Arguments:
-		argparse_args = vars(self._parser.parse_args())
+		argparse_args = vars(self.parser.parse_args())
 		args: Arguments = Arguments(**argparse_args)
 
 		# amend the parameters (check internal consistency)
@@ -458,18 +516,18 @@ class ArchConfigHandler:
 		config_data: str | None = None
 		creds_data: str | None = None
 
-		if self._args.config is not None:
-			config_data = self._read_file(self._args.config)
-		elif self._args.config_url is not None:
-			config_data = self._fetch_from_url(self._args.config_url)
+		if self.args.config is not None:
+			config_data = self._read_file(self.args.config)
+		elif self.args.config_url is not None:
+			config_data = self._fetch_from_url(self.args.config_url)
 
 		if config_data is not None:
 			config.update(json.loads(config_data))
 
-		if self._args.creds is not None:
-			creds_data = self._read_file(self._args.creds)
-		elif self._args.creds_url is not None:
-			creds_data = self._fetch_from_url(self._args.creds_url)
+		if self.args.creds is not None:
+			creds_data = self._read_file(self.args.creds)
+		elif self.args.creds_url is not None:
+			creds_data = self._fetch_from_url(self.args.creds_url)
 
 		if creds_data is not None:
 			json_data = self._process_creds_data(creds_data)
@@ -482,9 +540,9 @@ class ArchConfigHandler:
 
 	def _process_creds_data(self, creds_data: str) -> dict[str, Any] | None:
 		if creds_data.startswith('$'):  # encrypted data
-			if self._args.creds_decryption_key is not None:
+			if self.args.creds_decryption_key is not None:
 				try:
-					creds_data = decrypt(creds_data, self._args.creds_decryption_key)
+					creds_data = decrypt(creds_data, self.args.creds_decryption_key)
 					return json.loads(creds_data)
 				except ValueError as err:
 					if 'Invalid password' in str(err):
@@ -0,0 +1,184 @@
+# Arch Linux install script (archinstall)
+# Copyright (C) 2021-2023 Arch Linux
+#
+# This file is part of archinstall.
+# This file is licensed under the GNU General Public License version 3.
+# Refer to the `LICENSE` file for further details.
+
+# Modified for openEuler Installation by Liu Wang in 2025
+
+from __future__ import annotations
+
+import re
+import secrets
+import subprocess
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import IO
+
+from .exceptions import SysCallError
+from .general import _cmd_history, _log_cmd
+from .output import debug
+
+
+@dataclass
+class ChrootResult:
+	command: str
+	exit_code: int
+	output: bytes
+
+	def decode(self, encoding: str = 'utf-8', errors: str = 'backslashreplace') -> str:
+		return self.output.decode(encoding, errors).strip()
+
+
+class ChrootSession:
+	"""
+	A long-lived shell inside the target which runs commands sent over its stdin.
+
+	Every command runs in its own subshell with stdout and stderr merged, afterwards the
+	shell prints a random marker together with the exit code, so the output and the
+	exit code of each command can be told apart without starting a new chroot.
+	"""
+
+	def __init__(self, target: Path, chroot_cmd: str = 'chroot'):
+		self.target = target
+		self.chroot_cmd = chroot_cmd
+
+		self._marker = f'__eulerinstall_{secrets.token_hex(8)}__'
+		self._marker_re = re.compile(rf'^{self._marker} (\d+)\n$'.encode())
+		self._proc: subprocess.Popen[bytes] | None = None
+		self._lock = threading.Lock()
+
+	def __enter__(self) -> ChrootSession:
+		self.start()
+		return self
+
+	def __exit__(self, exc_type: type[BaseException] | None, exc_value: BaseException | None, traceback: TracebackType | None) -> None:
+		self.close()
+
+	@property
+	def running(self) -> bool:
+		return self._proc is not None and self._proc.poll() is None
+
+	def start(self) -> None:
+		if self.running:
+			return
+
+		debug(f'Starting chroot session in {self.target}')
+
+		cmd = [self.chroot_cmd, str(self.target), '/bin/sh']
+		_cmd_history(cmd)
+
+		self._proc = subprocess.Popen(
+			cmd,
+			stdin=subprocess.PIPE,
+			stdout=subprocess.PIPE,
+			stderr=subprocess.STDOUT,
+		)
+
+	def close(self) -> None:
+		if self._proc is None:
+			return
+
+		proc, self._proc = self._proc, None
+
+		try:
+			if proc.stdin:
+				proc.stdin.write(b'exit\n')
+				proc.stdin.close()
+		except OSError:
+			pass
+
+		try:
+			proc.wait(timeout=10)
+		except subprocess.TimeoutExpired:
+			proc.kill()
+			proc.wait()
+
+		if proc.stdout:
+			proc.stdout.close()
+
+	def _script(self, cmd: str, input_data: bytes | None) -> bytes:
+		# the trailing newline before ')' keeps a comment at the end of cmd from eating it
+		if input_data is None:
+			script = f'( {cmd}\n) </dev/null 2>&1\n'.encode()
+		else:
+			delimiter = f'{self._marker}_INPUT'
+			if not input_data.endswith(b'\n'):
+				input_data += b'\n'
+			script = f"( {cmd}\n) 2>&1 <<'{delimiter}'\n".encode() + input_data + f'{delimiter}\n'.encode()
+
+		return script + f"printf '\\n{self._marker} %d\\n' $?\n".encode()
+
+	@staticmethod
+	def _write(stdin: IO[bytes], payload: bytes) -> None:
+		try:
+			stdin.write(payload)
+			stdin.flush()
+		except OSError as err:
+			debug(f'Unable to write to chroot session: {err}')
+
+	def _read_result(self, cmd: str) -> ChrootResult:
+		assert self._proc is not None and self._proc.stdout is not None
+
+		output = bytearray()
+
+		for line in self._proc.stdout:
+			if match := self._marker_re.match(line):
+				# drop the newline printed in front of the marker
+				return ChrootResult(cmd, int(match.group(1)), bytes(output[:-1]))
+
+			output += line
+
+		exit_code = self._proc.wait()
+		self._proc = None
+		raise SysCallError(f'Chroot session ended while running: {cmd}', exit_code=exit_code, worker_log=bytes(output))
+
+	def run_batch(
+		self,
+		cmds: list[str],
+		check: bool = False,
+		input_data: list[bytes | None] | None = None,
+	) -> list[ChrootResult]:
+		"""
+		Sends all commands at once and collects their results in order.
+		With check=True the first failed command raises a SysCallError once all commands ran.
+		"""
+		inputs = input_data if input_data is not None else [None] * len(cmds)
+
+		with self._lock:
+			self.start()
+			assert self._proc is not None and self._proc.stdin is not None
+
+			for cmd in cmds:
+				debug(f'chroot session: {cmd}')
+				# logged as the chroot invocation it replaces, the session is the only process counted
+				_log_cmd([self.chroot_cmd, str(self.target), '/bin/sh', '-c', cmd])
+
+			payload = b''.join(self._script(cmd, data) for cmd, data in zip(cmds, inputs))
+
+			# written from a separate thread, a large batch could otherwise block on a full
+			# stdin pipe while the shell blocks on its full stdout pipe
+			writer = threading.Thread(target=self._write, args=(self._proc.stdin, payload), daemon=True)
+			writer.start()
+
+			try:
+				results = [self._read_result(cmd) for cmd in cmds]
+			finally:
+				writer.join()
+
+		if check:
+			for result in results:
+				if result.exit_code != 0:
+					raise SysCallError(
+						f'{result.command} exited with abnormal exit code [{result.exit_code}]: {result.decode()[-500:]}',
+						exit_code=result.exit_code,
+						worker_log=result.output,
+					)
+
+		return results
+
+	def run(self, cmd: str, check: bool = True, input_data: bytes | None = None) -> ChrootResult:
+		return self.run_batch([cmd], check=check, input_data=[input_data])[0]
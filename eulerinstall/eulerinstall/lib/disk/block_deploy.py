@@ -0,0 +1,194 @@
+# Arch Linux install script (archinstall)
+# Copyright (C) 2021-2023 Arch Linux
+#
+# This file is part of archinstall.
+# This file is licensed under the GNU General Public License version 3.
+# Refer to the `LICENSE` file for further details.
+
+# Modified for openEuler Installation by Liu Wang in 2025
+
+from __future__ import annotations
+
+import os
+import shutil
+import time
+from pathlib import Path
+
+from ..exceptions import DiskError, SysCallError
+from ..general import SysCommand
+from ..models.device import DiskLayoutConfiguration, DiskLayoutType, EncryptionType, FilesystemType, PartitionModification
+from ..output import debug, info, warn
+from ..rootfs_copy import _EMPTIED_DIRS, _EXCLUDED_FILES
+from .device_handler import device_handler
+from .utils import umount
+
+# tools writing only the blocks marked as used in the filesystem's allocation map
+_BLOCK_COPY_TOOLS = {
+	FilesystemType.Ext4: ['e2image', 'e2fsck', 'resize2fs', 'tune2fs'],
+	FilesystemType.Xfs: ['xfs_copy', 'xfs_growfs'],
+}
+
+
+def find_block_deploy_target(disk_config: DiskLayoutConfiguration) -> PartitionModification | None:
+	"""
+	Returns the root partition if the layout allows writing the root image onto it directly,
+	that is a plain ext4/xfs root partition without LVM, LUKS or btrfs subvolumes.
+	"""
+	if disk_config.config_type == DiskLayoutType.Pre_mount:
+		debug('Block deployment: not possible for pre-mounted configurations')
+		return None
+
+	if disk_config.lvm_config:
+		debug('Block deployment: not possible with LVM')
+		return None
+
+	if disk_config.disk_encryption and disk_config.disk_encryption.encryption_type != EncryptionType.NoEncryption:
+		debug('Block deployment: not possible with disk encryption')
+		return None
+
+	for mod in disk_config.device_modifications:
+		for part_mod in mod.partitions:
+			if not part_mod.is_root():
+				continue
+
+			if not part_mod.is_create_or_modify():
+				debug('Block deployment: root partition is not formatted by the installer')
+				return None
+
+			if part_mod.fs_type not in _BLOCK_COPY_TOOLS or part_mod.btrfs_subvols:
+				debug(f'Block deployment: unsupported root filesystem {part_mod.fs_type}')
+				return None
+
+			return part_mod
+
+	debug('Block deployment: no root partition found')
+	return None
+
+
+class BlockDeployer:
+	"""
+	Writes the root filesystem image onto the root partition block by block.
+	Only the blocks in use are written (e2image -ra / xfs_copy read the allocation map),
+	afterwards the filesystem is grown to the partition size and gets a new UUID.
+	"""
+
+	_TMP_MOUNT = Path('/mnt/eulerinstall_block')
+
+	def __init__(
+		self,
+		image: Path,
+		part_mod: PartitionModification,
+		child_mountpoints: list[Path],
+	):
+		self.image = image
+		self.part_mod = part_mod
+		self.dev_path = part_mod.safe_dev_path
+		self.fs_type = part_mod.safe_fs_type
+		# mountpoints of other partitions, their content is shadowed on the root filesystem
+		self.child_mountpoints = child_mountpoints
+
+	def image_fs_type(self) -> FilesystemType | None:
+		try:
+			fs_type = SysCommand(['blkid', '-o', 'value', '-s', 'TYPE', str(self.image)]).decode()
+		except SysCallError as err:
+			debug(f'Unable to determine filesystem of {self.image}: {err}')
+			return None
+
+		try:
+			return FilesystemType(fs_type)
+		except ValueError:
+			return None
+
+	def _partition_size(self) -> int:
+		sectors = Path(f'/sys/class/block/{self.dev_path.name}/size').read_text().strip()
+		return int(sectors) * 512
+
+	def supported(self) -> bool:
+		if not self.image.exists():
+			warn(f'Block deployment: image {self.image} not found')
+			return False
+
+		if missing := [tool for tool in _BLOCK_COPY_TOOLS[self.fs_type] if not shutil.which(tool)]:
+			warn(f'Block deployment: missing tools {missing}')
+			return False
+
+		if (image_fs := self.image_fs_type()) != self.fs_type:
+			warn(f'Block deployment: image filesystem {image_fs} does not match root filesystem {self.fs_type.value}')
+			return False
+
+		if self.image.stat().st_size > self._partition_size():
+			warn(f'Block deployment: root partition {self.dev_path} is smaller than {self.image}')
+			return False
+
+		return True
+
+	def _write_ext4(self) -> None:
+		SysCommand(['e2image', '-ra', '-p', str(self.image), str(self.dev_path)])
+
+		try:
+			SysCommand(['e2fsck', '-f', '-y', str(self.dev_path)])
+		except SysCallError as err:
+			# exit code 1 means errors were corrected
+			if err.exit_code != 1:
+				raise DiskError(f'Filesystem check of {self.dev_path} failed: {err}')
+
+		SysCommand(['resize2fs', str(self.dev_path)])
+		SysCommand(['tune2fs', '-U', 'random', str(self.dev_path)])
+
+	def _write_xfs(self) -> None:
+		# xfs_copy generates a new UUID for the destination unless -d is given
+		SysCommand(['xfs_copy', str(self.image), str(self.dev_path)])
+
+	@staticmethod
+	def _empty_dir(path: Path) -> None:
+		if not path.is_dir() or path.is_symlink():
+			return
+
+		for entry in os.scandir(path):
+			if entry.is_dir(follow_symlinks=False):
+				shutil.rmtree(entry.path)
+			else:
+				os.unlink(entry.path)
+
+	def _clear_shadowed(self, root: Path) -> None:
+		for mountpoint in self.child_mountpoints:
+			self._empty_dir(root / mountpoint.relative_to('/'))
+
+	def _clear_image_state(self, root: Path) -> None:
+		"""Removes what the file copy leaves out, e.g. the machine-id has to be generated per installation"""
+		for name in _EXCLUDED_FILES:
+			(root / name).unlink(missing_ok=True)
+
+		for name in _EMPTIED_DIRS:
+			self._empty_dir(root / name)
+
+	def deploy(self) -> None:
+		info(f'Writing {self.image} to {self.dev_path}')
+		start = time.monotonic()
+
+		try:
+			match self.fs_type:
+				case FilesystemType.Ext4:
+					self._write_ext4()
+				case FilesystemType.Xfs:
+					self._write_xfs()
+		except SysCallError as err:
+			raise DiskError(f'Could not write {self.image} to {self.dev_path}: {err}')
+
+		device_handler.udev_sync()
+		device_handler.mount(self.dev_path, self._TMP_MOUNT, create_target_mountpoint=True)
+
+		try:
+			if self.fs_type == FilesystemType.Xfs:
+				SysCommand(['xfs_growfs', str(self._TMP_MOUNT)])
+
+			self._clear_shadowed(self._TMP_MOUNT)
+			self._clear_image_state(self._TMP_MOUNT)
+		finally:
+			umount(self.dev_path)
+
+		device_handler.udev_sync()
+		lsblk_info = device_handler.fetch_part_info(self.dev_path)
+		self.part_mod.uuid = lsblk_info.uuid
+
+		info(f'Root filesystem written to {self.dev_path} in {time.monotonic() - start:.1f}s')
@@ -0,0 +1,165 @@
+# Arch Linux install script (archinstall)
+# Copyright (C) 2021-2023 Arch Linux
+#
+# This file is part of archinstall.
+# This file is licensed under the GNU General Public License version 3.
+# Refer to the `LICENSE` file for further details.
+
+# Modified for openEuler Installation by Liu Wang in 2025
+
+from __future__ import annotations
+
+import errno
+import fcntl
+import os
+import platform
+import struct
+from pathlib import Path
+
+from ..exceptions import DiskError, SysCallError
+from ..general import SysCommand
+from ..output import debug
+
+# struct btrfs_ioctl_vol_args { __s64 fd; char name[BTRFS_PATH_NAME_MAX + 1]; }
+_BTRFS_PATH_NAME_MAX = 4087
+_BTRFS_VOL_ARGS = struct.Struct(f'=q{_BTRFS_PATH_NAME_MAX + 1}s')
+_BTRFS_IOCTL_MAGIC = 0x94
+
+FS_COMPR_FL = 0x00000004
+FS_NOCOW_FL = 0x00800000
+
+# errors meaning the kernel (or the filesystem below the path) does not provide the ioctl,
+# EINVAL is a rejected request, e.g. compression together with nodatacow
+_UNSUPPORTED = {errno.ENOTTY, errno.ENOSYS, errno.EOPNOTSUPP}
+
+
+def _ioc(direction: str, magic: int, nr: int, size: int, machine: str | None = None) -> int:
+	"""
+	Request number as built by the _IOR/_IOW macros, the direction bits and the size field
+	differ on powerpc, mips and sparc
+	"""
+	machine = machine or platform.machine()
+
+	if machine.startswith(('ppc', 'powerpc', 'mips', 'sparc')):
+		read, write, size_bits = 2, 4, 13
+	else:
+		read, write, size_bits = 2, 1, 14
+
+	bits = {'r': read, 'w': write}[direction]
+	return (bits << (16 + size_bits)) | (size << 16) | (magic << 8) | nr
+
+
+def subvol_create_request(machine: str | None = None) -> int:
+	return _ioc('w', _BTRFS_IOCTL_MAGIC, 14, _BTRFS_VOL_ARGS.size, machine)
+
+
+def getflags_request(machine: str | None = None) -> int:
+	# declared with a long argument, the kernel reads and writes an int
+	return _ioc('r', ord('f'), 1, struct.calcsize('l'), machine)
+
+
+def setflags_request(machine: str | None = None) -> int:
+	return _ioc('w', ord('f'), 2, struct.calcsize('l'), machine)
+
+
+def subvol_create_args(name: str) -> bytes:
+	encoded = name.encode()
+
+	if not encoded or b'/' in encoded or len(encoded) > _BTRFS_PATH_NAME_MAX:
+		raise DiskError(f'Invalid subvolume name: {name}')
+
+	return _BTRFS_VOL_ARGS.pack(0, encoded)
+
+
+def with_attributes(flags: int, nodatacow: bool, compress: bool) -> int:
+	if nodatacow:
+		flags |= FS_NOCOW_FL
+	if compress:
+		flags |= FS_COMPR_FL
+	return flags
+
+
+class SubvolumeBuilder:
+	"""
+	Creates btrfs subvolumes below a mounted filesystem and sets their file attributes with
+	one ioctl each instead of a btrfs and chattr process per subvolume. Falls back to the
+	commands once the kernel rejects the ioctls as unsupported.
+	"""
+
+	def __init__(self, mountpoint: Path) -> None:
+		self.mountpoint = mountpoint
+		self._native_create = True
+		self._native_flags = True
+
+	def create_all(self, names: list[Path | str], nodatacow: bool = False, compress: bool = False) -> None:
+		# parents are created before the subvolumes nested in them
+		for name in sorted(names, key=str):
+			self.create(name, nodatacow, compress)
+
+	def create(self, name: Path | str, nodatacow: bool = False, compress: bool = False) -> Path:
+		path = self.mountpoint / name
+		debug(f'Creating subvolume: {name}')
+
+		if self._native_create:
+			self._native_create = self._ioctl_create(path)
+
+		if not self._native_create:
+			try:
+				SysCommand(['btrfs', 'subvolume', 'create', '-p', str(path)])
+			except SysCallError as err:
+				raise DiskError(f'Could not create subvolume {path}: {err}')
+
+		if nodatacow or compress:
+			self.set_attributes(path, nodatacow, compress)
+
+		return path
+
+	def set_attributes(self, path: Path, nodatacow: bool, compress: bool) -> None:
+		if self._native_flags:
+			self._native_flags = self._ioctl_set_attributes(path, nodatacow, compress)
+
+		if not self._native_flags:
+			attributes = ('C' if nodatacow else '') + ('c' if compress else '')
+
+			try:
+				SysCommand(['chattr', f'+{attributes}', str(path)])
+			except SysCallError as err:
+				raise DiskError(f'Could not set {attributes} attributes at {path}: {err}')
+
+	def _ioctl_create(self, path: Path) -> bool:
+		"""False if the ioctl is not available and the command has to be used"""
+		# a mutable buffer, ioctl() copies immutable arguments only up to 1024 bytes
+		args = bytearray(subvol_create_args(path.name))
+		# same as -p, the intermediate directories are plain directories
+		path.parent.mkdir(parents=True, exist_ok=True)
+
+		fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY | os.O_CLOEXEC)
+
+		try:
+			fcntl.ioctl(fd, subvol_create_request(), args)
+		except OSError as err:
+			if err.errno in _UNSUPPORTED:
+				debug(f'btrfs subvolume ioctl not available, using btrfs-progs: {err}')
+				return False
+			raise DiskError(f'Could not create subvolume {path}: {err}')
+		finally:
+			os.close(fd)
+
+		return True
+
+	def _ioctl_set_attributes(self, path: Path, nodatacow: bool, compress: bool) -> bool:
+		"""False if the ioctls are not available and chattr has to be used"""
+		fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY | os.O_CLOEXEC)
+
+		try:
+			flags = struct.unpack('i', fcntl.ioctl(fd, getflags_request(), struct.pack('i', 0)))[0]
+			fcntl.ioctl(fd, setflags_request(), struct.pack('i', with_attributes(flags, nodatacow, compress)))
+		except OSError as err:
+			if err.errno in _UNSUPPORTED:
+				debug(f'File attribute ioctls not available, using chattr: {err}')
+				return False
+			raise DiskError(f'Could not set attributes at {path}: {err}')
+		finally:
+			os.close(fd)
+
+		return True
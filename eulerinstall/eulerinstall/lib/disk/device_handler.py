@@ -13,15 +13,29 @@ import json
 import logging
 import os
 import stat
-import time
 from collections.abc import Iterable
 from pathlib import Path
+from subprocess import CalledProcessError
 from typing import Literal, overload
 
-from parted import Device, Disk, DiskException, FileSystem, Geometry, IOException, Partition, PartitionException, freshDisk, getAllDevices, getDevice, newDisk
+from parted import (
+	PARTITION_EXTENDED,
+	Device,
+	Disk,
+	DiskException,
+	FileSystem,
+	Geometry,
+	IOException,
+	Partition,
+	PartitionException,
+	freshDisk,
+	getAllDevices,
+	getDevice,
+	newDisk,
+)
 
 from ..exceptions import DiskError, SysCallError, UnknownFilesystemFormat
-from ..general import SysCommand, SysCommandWorker
+from ..general import SysCommand, SysCommandWorker, run
 from ..luks import Luks2
 from ..models.device import (
 	DEFAULT_ITER_TIME,
@@ -50,94 +64,164 @@ from ..models.device import (
 	_PartitionInfo,
 )
 from ..models.users import Password
-from ..output import debug, error, info, log
+from ..output import debug, error, info, log, warn
+from ..profiler import profiler
 from ..utils.util import is_subpath
+from .btrfs import SubvolumeBuilder
+from .holders import teardown_holders
+from .mount_manager import mount_manager
+from .udev import wait_for_partitions
 from .utils import (
+	block_topology,
 	find_lsblk_info,
-	get_all_lsblk_info,
 	get_lsblk_info,
+	invalidate_lsblk_cache,
+	poll_until,
 	umount,
 )
 
+# LVM reports lag behind the commands changing the metadata, e.g. until udev processed a new volume
+_LVM_REPORT_TIMEOUT = 30.0
+
 
 class DeviceHandler:
 	_TMP_BTRFS_MOUNT = Path('/mnt/arch_btrfs')
 
 	def __init__(self) -> None:
+		# devices are probed with libparted on first use, not at import time
 		self._devices: dict[Path, BDevice] = {}
+		self._all_loaded = False
+		self._udev_synced = False
 		self._partition_table = PartitionTable.default()
-		self.load_devices()
 
 	@property
 	def devices(self) -> list[BDevice]:
+		if not self._all_loaded:
+			self.load_devices()
 		return list(self._devices.values())
 
 	@property
 	def partition_table(self) -> PartitionTable:
 		return self._partition_table
 
+	def _ensure_udev_synced(self) -> None:
+		if not self._udev_synced:
+			self.udev_sync()
+			self._udev_synced = True
+
+	@profiler.phase('DeviceHandler.load_devices')
 	def load_devices(self) -> None:
+		"""
+		Probes every block device of the system
+		"""
 		block_devices = {}
 
-		self.udev_sync()
-		all_lsblk_info = get_all_lsblk_info()
+		self._ensure_udev_synced()
+		topology = block_topology.snapshot()
 		devices = getAllDevices()
 		devices.extend(self.get_loop_devices())
 
+		for device in devices:
+			dev_lsblk_info = topology.find(device.path)
+
+			if block_device := self._probe_device(device, dev_lsblk_info):
+				block_devices[block_device.device_info.path] = block_device
+
+		self._devices = block_devices
+		self._all_loaded = True
+
+	def _load_device(self, path: Path) -> BDevice | None:
+		"""
+		Probes a single disk and adds it to the known devices
+		"""
+		self._ensure_udev_synced()
+
+		try:
+			lsblk_info = get_lsblk_info(path)
+		except DiskError as err:
+			debug(f'Device lsblk info not found: {path}: {err}')
+			return None
+
+		# partitions are part of the disk they belong to
+		if lsblk_info.type == 'part':
+			return None
+
+		try:
+			device = getDevice(str(path))
+		except IOException as err:
+			debug(f'Unable to probe device {path}: {err}')
+			return None
+
+		block_device = self._probe_device(device, lsblk_info)
+
+		if block_device:
+			self._devices[block_device.device_info.path] = block_device
+
+		return block_device
+
+	def _probe_device(self, device: Device, dev_lsblk_info: LsblkInfo | None) -> BDevice | None:
 		archiso_mountpoint = Path('/run/archiso/airootfs')
 
-		for device in devices:
-			dev_lsblk_info = find_lsblk_info(device.path, all_lsblk_info)
+		if not dev_lsblk_info:
+			debug(f'Device lsblk info not found: {device.path}')
+			return None
 
-			if not dev_lsblk_info:
-				debug(f'Device lsblk info not found: {device.path}')
-				continue
+		if dev_lsblk_info.type == 'rom':
+			return None
 
-			if dev_lsblk_info.type == 'rom':
-				continue
+		# exclude archiso loop device
+		if dev_lsblk_info.mountpoint == archiso_mountpoint:
+			return None
 
-			# exclude archiso loop device
-			if dev_lsblk_info.mountpoint == archiso_mountpoint:
-				continue
+		try:
+			if dev_lsblk_info.pttype:
+				disk = newDisk(device)
+			else:
+				disk = freshDisk(device, self.partition_table.value)
+		except DiskException as err:
+			debug(f'Unable to get disk from {device.path}: {err}')
+			return None
 
-			try:
-				if dev_lsblk_info.pttype:
-					disk = newDisk(device)
-				else:
-					disk = freshDisk(device, self.partition_table.value)
-			except DiskException as err:
-				debug(f'Unable to get disk from {device.path}: {err}')
-				continue
+		device_info = _DeviceInfo.from_disk(disk)
+		partition_infos = []
 
-			device_info = _DeviceInfo.from_disk(disk)
-			partition_infos = []
+		for partition in disk.partitions:
+			lsblk_info = find_lsblk_info(partition.path, dev_lsblk_info.children)
 
-			for partition in disk.partitions:
-				lsblk_info = find_lsblk_info(partition.path, dev_lsblk_info.children)
+			if not lsblk_info:
+				debug(f'Partition lsblk info not found: {partition.path}')
+				continue
 
-				if not lsblk_info:
-					debug(f'Partition lsblk info not found: {partition.path}')
-					continue
+			fs_type = self._determine_fs_type(partition, lsblk_info)
+			subvol_infos = []
 
-				fs_type = self._determine_fs_type(partition, lsblk_info)
-				subvol_infos = []
+			#if fs_type == FilesystemType.Btrfs:
+			#	subvol_infos = self.get_btrfs_info(partition.path, lsblk_info)
 
-				#if fs_type == FilesystemType.Btrfs:
-				#	subvol_infos = self.get_btrfs_info(partition.path, lsblk_info)
+			partition_infos.append(
+				_PartitionInfo.from_partition(
+					partition,
+					lsblk_info,
+					fs_type,
+					subvol_infos,
+				),
+			)
 
-				partition_infos.append(
-					_PartitionInfo.from_partition(
-						partition,
-						lsblk_info,
-						fs_type,
-						subvol_infos,
-					),
-				)
+		return BDevice(disk, device_info, partition_infos)
 
-			block_device = BDevice(disk, device_info, partition_infos)
-			block_devices[block_device.device_info.path] = block_device
+	def refresh(self, paths: Iterable[Path] | None = None) -> None:
+		"""
+		Re-probes the given disks, e.g. after they were repartitioned.
+		Without paths all known devices are dropped and probed again on next use.
+		"""
+		if paths is None:
+			self._devices = {}
+			self._all_loaded = False
+			return
 
-		self._devices = block_devices
+		for path in paths:
+			self._devices.pop(path, None)
+			self._load_device(path)
 
 	@staticmethod
 	def get_loop_devices() -> list[Device]:
@@ -182,7 +266,13 @@ class DeviceHandler:
 		return None
 
 	def get_device(self, path: Path) -> BDevice | None:
-		return self._devices.get(path, None)
+		if (device := self._devices.get(path, None)) is not None:
+			return device
+
+		if self._all_loaded:
+			return None
+
+		return self._load_device(path)
 
 	def get_device_by_partition_path(self, partition_path: Path) -> BDevice | None:
 		partition = self.find_partition(partition_path)
@@ -196,6 +286,19 @@ class DeviceHandler:
 			part = next(filter(lambda x: str(x.path) == str(path), device.partition_infos), None)
 			if part is not None:
 				return part
+
+		if self._all_loaded:
+			return None
+
+		# probe the disk the partition belongs to
+		try:
+			lsblk_info = get_lsblk_info(path)
+		except DiskError:
+			return None
+
+		if lsblk_info.pkname and (device := self.get_device(Path('/dev') / lsblk_info.pkname)):
+			return next(filter(lambda x: str(x.path) == str(path), device.partition_infos), None)
+
 		return None
 
 	def get_parent_device_path(self, dev_path: Path) -> Path:
@@ -230,7 +333,7 @@ class DeviceHandler:
 		subvol_infos: list[_BtrfsSubvolumeInfo] = []
 
 		if not lsblk_info.mountpoint:
-			self.mount(dev_path, self._TMP_BTRFS_MOUNT, create_target_mountpoint=True)
+			self.mount(dev_path, self._TMP_BTRFS_MOUNT, mount_fs='btrfs', create_target_mountpoint=True)
 			mountpoint = self._TMP_BTRFS_MOUNT
 		else:
 			# when multiple subvolumes are mounted then the lsblk output may look like
@@ -270,6 +373,7 @@ class DeviceHandler:
 
 		return subvol_infos
 
+	@profiler.phase('DeviceHandler.format')
 	def format(
 		self,
 		fs_type: FilesystemType,
@@ -312,7 +416,10 @@ class DeviceHandler:
 			msg = f'Could not format {path} with {fs_type.value}: {err.message}'
 			error(msg)
 			raise DiskError(msg) from err
+		finally:
+			invalidate_lsblk_cache()
 
+	@profiler.phase('DeviceHandler.encrypt')
 	def encrypt(
 		self,
 		dev_path: Path,
@@ -342,6 +449,7 @@ class DeviceHandler:
 
 		return luks_handler
 
+	@profiler.phase('DeviceHandler.format_encrypted')
 	def format_encrypted(
 		self,
 		dev_path: Path,
@@ -373,11 +481,7 @@ class DeviceHandler:
 		info(f'luks2 locking device: {dev_path}')
 		luks_handler.lock()
 
-	def _lvm_info(
-		self,
-		cmd: str,
-		info_type: Literal['lv', 'vg', 'pvseg'],
-	) -> LvmVolumeInfo | LvmGroupInfo | LvmPVInfo | None:
+	def _lvm_report(self, cmd: str, info_type: Literal['lv', 'vg', 'pvseg']) -> list[dict[str, str]]:
 		raw_info = SysCommand(cmd).decode().split('\n')
 
 		# for whatever reason the output sometimes contains
@@ -388,30 +492,42 @@ class DeviceHandler:
 
 		reports = json.loads(data)
 
-		for report in reports['report']:
-			if len(report[info_type]) != 1:
-				raise ValueError('Report does not contain any entry')
-
-			entry = report[info_type][0]
-
-			match info_type:
-				case 'pvseg':
-					return LvmPVInfo(
-						pv_name=Path(entry['pv_name']),
-						lv_name=entry['lv_name'],
-						vg_name=entry['vg_name'],
-					)
-				case 'lv':
-					return LvmVolumeInfo(
-						lv_name=entry['lv_name'],
-						vg_name=entry['vg_name'],
-						lv_size=Size(int(entry['lv_size'][:-1]), Unit.B, SectorSize.default()),
-					)
-				case 'vg':
-					return LvmGroupInfo(
-						vg_uuid=entry['vg_uuid'],
-						vg_size=Size(int(entry['vg_size'][:-1]), Unit.B, SectorSize.default()),
-					)
+		return [entry for report in reports['report'] for entry in report[info_type]]
+
+	@staticmethod
+	def _lv_info(entry: dict[str, str]) -> LvmVolumeInfo:
+		return LvmVolumeInfo(
+			lv_name=entry['lv_name'],
+			vg_name=entry['vg_name'],
+			lv_size=Size(int(entry['lv_size'][:-1]), Unit.B, SectorSize.default()),
+		)
+
+	def _lvm_info(
+		self,
+		cmd: str,
+		info_type: Literal['lv', 'vg', 'pvseg'],
+	) -> LvmVolumeInfo | LvmGroupInfo | LvmPVInfo | None:
+		entries = self._lvm_report(cmd, info_type)
+
+		if len(entries) != 1:
+			raise ValueError('Report does not contain any entry')
+
+		entry = entries[0]
+
+		match info_type:
+			case 'pvseg':
+				return LvmPVInfo(
+					pv_name=Path(entry['pv_name']),
+					lv_name=entry['lv_name'],
+					vg_name=entry['vg_name'],
+				)
+			case 'lv':
+				return self._lv_info(entry)
+			case 'vg':
+				return LvmGroupInfo(
+					vg_uuid=entry['vg_uuid'],
+					vg_size=Size(int(entry['vg_size'][:-1]), Unit.B, SectorSize.default()),
+				)
 
 		return None
 
@@ -429,21 +545,54 @@ class DeviceHandler:
 		cmd: str,
 		info_type: Literal['lv', 'vg', 'pvseg'],
 	) -> LvmVolumeInfo | LvmGroupInfo | LvmPVInfo | None:
-		while True:
+		def fetch() -> LvmVolumeInfo | LvmGroupInfo | LvmPVInfo | None:
 			try:
 				return self._lvm_info(cmd, info_type)
 			except ValueError:
-				time.sleep(3)
+				return None
+
+		return poll_until(fetch, _LVM_REPORT_TIMEOUT, f'LVM report "{cmd}"')
+
+	def _lv_infos(self, vg_name: str) -> dict[str, LvmVolumeInfo]:
+		cmd = f'lvs --reportformat json --unit B -S vg_name={vg_name}'
+		return {entry['lv_name']: self._lv_info(entry) for entry in self._lvm_report(cmd, 'lv')}
+
+	def lvm_vol_infos(self, vg_name: str, lv_names: list[str]) -> dict[str, LvmVolumeInfo]:
+		"""
+		Infos of the given volumes of a VG, e.g. after creating them. Every attempt runs a
+		single lvs report for the whole VG until all volumes are listed.
+		"""
+
+		def fetch() -> dict[str, LvmVolumeInfo] | None:
+			try:
+				infos = self._lv_infos(vg_name)
+			except ValueError:
+				return None
+
+			if missing := [name for name in lv_names if name not in infos]:
+				debug(f'Volumes not reported yet in {vg_name}: {missing}')
+				return None
+
+			return {name: infos[name] for name in lv_names}
 
-	def lvm_vol_info(self, lv_name: str) -> LvmVolumeInfo | None:
-		cmd = f'lvs --reportformat json --unit B -S lv_name={lv_name}'
+		return poll_until(fetch, _LVM_REPORT_TIMEOUT, f'Volumes of VG {vg_name}')
 
-		return self._lvm_info_with_retry(cmd, 'lv')
+	def lvm_group_extents(self, vg_name: str) -> tuple[int, int]:
+		"""Extent size in bytes and number of free extents of a VG, waits until the VG is reported"""
+		cmd = f'vgs --reportformat json --unit B -o vg_name,vg_extent_size,vg_free_count -S vg_name={vg_name}'
 
-	def lvm_group_info(self, vg_name: str) -> LvmGroupInfo | None:
-		cmd = f'vgs --reportformat json --unit B -o vg_name,vg_uuid,vg_size -S vg_name={vg_name}'
+		def fetch() -> tuple[int, int] | None:
+			try:
+				entries = self._lvm_report(cmd, 'vg')
+			except ValueError:
+				return None
+
+			if len(entries) != 1:
+				return None
 
-		return self._lvm_info_with_retry(cmd, 'vg')
+			return int(entries[0]['vg_extent_size'][:-1]), int(entries[0]['vg_free_count'])
+
+		return poll_until(fetch, _LVM_REPORT_TIMEOUT, f'LVM report "{cmd}"')
 
 	def lvm_pvseg_info(self, vg_name: str, lv_name: str) -> LvmPVInfo | None:
 		cmd = f'pvs --segments -o+lv_name,vg_name -S vg_name={vg_name},lv_name={lv_name} --reportformat json '
@@ -476,6 +625,7 @@ class DeviceHandler:
 		debug(f'Reducing LVM volume size: {cmd}')
 		SysCommand(cmd)
 
+	@profiler.phase('DeviceHandler.lvm_pv_create')
 	def lvm_pv_create(self, pvs: Iterable[Path]) -> None:
 		cmd = 'pvcreate ' + ' '.join([str(pv) for pv in pvs])
 		debug(f'Creating LVM PVS: {cmd}')
@@ -484,6 +634,7 @@ class DeviceHandler:
 		worker.poll()
 		worker.write(b'y\n', line_ending=False)
 
+	@profiler.phase('DeviceHandler.lvm_vg_create')
 	def lvm_vg_create(self, pvs: Iterable[Path], vg_name: str) -> None:
 		pvs_str = ' '.join([str(pv) for pv in pvs])
 		cmd = f'vgcreate --yes {vg_name} {pvs_str}'
@@ -494,23 +645,44 @@ class DeviceHandler:
 		worker.poll()
 		worker.write(b'y\n', line_ending=False)
 
-	def lvm_vol_create(self, vg_name: str, volume: LvmVolume, offset: Size | None = None) -> None:
-		if offset is not None:
-			length = volume.length - offset
-		else:
-			length = volume.length
+	@profiler.phase('DeviceHandler.lvm_vols_create')
+	def lvm_vols_create(self, vg_name: str, volumes: list[tuple[LvmVolume, int]]) -> dict[str, LvmVolumeInfo]:
+		"""
+		Creates the volumes of a VG with the given number of extents in a single lvm shell
+		instead of one lvcreate process each, and verifies all of them with one lvs report
+		"""
+		commands = ''.join(f'lvcreate --yes -l {extents} -n {volume.name} {vg_name}\n' for volume, extents in volumes)
 
-		length_str = length.format_size(Unit.B, include_unit=False)
-		cmd = f'lvcreate --yes -L {length_str}B {vg_name} -n {volume.name}'
+		debug(f'Creating volumes in {vg_name}:\n{commands}')
 
-		debug(f'Creating volume: {cmd}')
+		try:
+			result = run(['lvm'], input_data=commands.encode())
+			debug(f'lvm output: {result.stdout.decode(errors="backslashreplace").rstrip()}')
+		except CalledProcessError as err:
+			warn(f'lvm shell failed, creating the remaining volumes one by one: {err.stdout.decode(errors="backslashreplace").rstrip()}')
+		except OSError as err:
+			warn(f'lvm shell not available, creating the volumes one by one: {err}')
 
-		worker = SysCommandWorker(cmd)
-		worker.poll()
-		worker.write(b'y\n', line_ending=False)
+		# lvcreate returns once the metadata is committed, the report lists the volumes right away
+		try:
+			infos = self._lv_infos(vg_name)
+		except ValueError:
+			# no report of the VG yet, nothing was created by the lvm shell
+			infos = {}
 
-		volume.vg_name = vg_name
-		volume.dev_path = Path(f'/dev/{vg_name}/{volume.name}')
+		for volume, extents in volumes:
+			if volume.name not in infos:
+				cmd = ['lvcreate', '--yes', '-l', str(extents), '-n', volume.name, vg_name]
+
+				try:
+					run(cmd)
+				except CalledProcessError as err:
+					raise DiskError(f'Could not create volume {vg_name}/{volume.name}: {err.stdout.decode(errors="backslashreplace").rstrip()}')
+
+			volume.vg_name = vg_name
+			volume.dev_path = Path(f'/dev/{vg_name}/{volume.name}')
+
+		return self.lvm_vol_infos(vg_name, [volume.name for volume, _ in volumes])
 
 	def _setup_partition(
 		self,
@@ -599,6 +771,7 @@ class DeviceHandler:
 
 		return lsblk_info
 
+	@profiler.phase('DeviceHandler.create_lvm_btrfs_subvolumes')
 	def create_lvm_btrfs_subvolumes(
 		self,
 		path: Path,
@@ -607,29 +780,17 @@ class DeviceHandler:
 	) -> None:
 		info(f'Creating subvolumes: {path}')
 
-		self.mount(path, self._TMP_BTRFS_MOUNT, create_target_mountpoint=True)
-
-		for sub_vol in sorted(btrfs_subvols, key=lambda x: x.name):
-			debug(f'Creating subvolume: {sub_vol.name}')
+		self.mount(path, self._TMP_BTRFS_MOUNT, mount_fs='btrfs', create_target_mountpoint=True)
 
-			subvol_path = self._TMP_BTRFS_MOUNT / sub_vol.name
-
-			SysCommand(f'btrfs subvolume create -p {subvol_path}')
-
-			if BtrfsMountOption.nodatacow.value in mount_options:
-				try:
-					SysCommand(f'chattr +C {subvol_path}')
-				except SysCallError as err:
-					raise DiskError(f'Could not set nodatacow attribute at {subvol_path}: {err}')
-
-			if BtrfsMountOption.compress.value in mount_options:
-				try:
-					SysCommand(f'chattr +c {subvol_path}')
-				except SysCallError as err:
-					raise DiskError(f'Could not set compress attribute at {subvol_path}: {err}')
+		SubvolumeBuilder(self._TMP_BTRFS_MOUNT).create_all(
+			[sub_vol.name for sub_vol in btrfs_subvols],
+			nodatacow=BtrfsMountOption.nodatacow.value in mount_options,
+			compress=BtrfsMountOption.compress.value in mount_options,
+		)
 
 		umount(path)
 
+	@profiler.phase('DeviceHandler.create_btrfs_volumes')
 	def create_btrfs_volumes(
 		self,
 		part_mod: PartitionModification,
@@ -659,16 +820,12 @@ class DeviceHandler:
 		self.mount(
 			dev_path,
 			self._TMP_BTRFS_MOUNT,
+			mount_fs='btrfs',
 			create_target_mountpoint=True,
 			options=part_mod.mount_options,
 		)
 
-		for sub_vol in sorted(part_mod.btrfs_subvols, key=lambda x: x.name):
-			debug(f'Creating subvolume: {sub_vol.name}')
-
-			subvol_path = self._TMP_BTRFS_MOUNT / sub_vol.name
-
-			SysCommand(f'btrfs subvolume create -p {subvol_path}')
+		SubvolumeBuilder(self._TMP_BTRFS_MOUNT).create_all([sub_vol.name for sub_vol in part_mod.btrfs_subvols])
 
 		umount(dev_path)
 
@@ -688,6 +845,7 @@ class DeviceHandler:
 
 		return luks_handler
 
+	@profiler.phase('DeviceHandler.umount_all_existing')
 	def umount_all_existing(self, device_path: Path | BDevice) -> None:
 		if isinstance(device_path, BDevice):
 			path = device_path.device_info.path
@@ -695,10 +853,8 @@ class DeviceHandler:
 		else:
 			path = device_path
 			partitions = None
-			if path in self._devices:
-				partitions = self._devices[path].partition_infos
-			elif str(path) in self._devices:
-				partitions = self._devices[str(path)].partition_infos
+			if device := self.get_device(Path(path)):
+				partitions = device.partition_infos
 
 		debug(f'Unmounting all existing partitions: {path}')
 
@@ -714,19 +870,16 @@ class DeviceHandler:
 			else:
 				umount(partition.path, recursive=True)
 
+	@profiler.phase('DeviceHandler.clearpart_device')
 	def clearpart_device(self, dev_path: Path | str | BDevice) -> None:
 		block_device = None
 
 		if isinstance(dev_path, BDevice):
 			block_device = dev_path
 			dev_path = dev_path.device_info.path
-		elif isinstance(dev_path, str):
+		else:
 			dev_path = Path(dev_path)
-			if dev_path in self._devices:
-				block_device = self._devices[dev_path]
-		elif isinstance(dev_path, Path):
-			if dev_path in self._devices:
-				block_device = self._devices[dev_path]
+			block_device = self.get_device(dev_path)
 
 		info(f'Clearing device: {dev_path}')
 
@@ -735,25 +888,16 @@ class DeviceHandler:
 
 		self.umount_all_existing(dev_path)
 
-		self._force_remove_dm_mappings(dev_path)
-
-		if block_device:
-			for partition in block_device.partition_infos:
-				luks = Luks2(partition.path)
-				if luks.isLuks():
-					debug(f'Encrypted partition found: {partition.path}')
-					luks.lock()
+		# LVM volumes, LUKS mappings and RAID arrays stacked on the disk, top-down in one pass
+		teardown_holders(dev_path)
 
 		self._clear_lvm_on_device(dev_path)
 
-		self._force_remove_dm_mappings(dev_path)
-
 		if block_device:
 			for partition in block_device.partition_infos:
-				luks = Luks2(partition.path)
-				if luks.isLuks():
+				if partition.fs_type == FilesystemType.Crypto_luks:
 					debug(f'Erasing encrypted partition: {partition.path}')
-					luks.erase()
+					Luks2(partition.path).erase()
 
 				self._wipe_lvm_signatures(partition.path)
 				self._wipe(partition.path)
@@ -761,27 +905,21 @@ class DeviceHandler:
 		self._wipe_lvm_signatures(dev_path)
 		self._wipe(dev_path)
 
-		self._force_remove_dm_mappings(dev_path)
-
-		self.udev_sync()
-		time.sleep(1)
 		self.partprobe(dev_path)
 		self.udev_sync()
-		time.sleep(1)
 
 	def _clear_lvm_on_device(self, dev_path: Path) -> None:
 		info(f'Checking for LVM on device: {dev_path}')
 
-		vg_names = self._find_vg_names_on_device(dev_path)
+		pvs = self._pvs_on_device(dev_path)
 
-		for vg_name in vg_names:
+		for vg_name in dict.fromkeys(vg_name for _, vg_name in pvs if vg_name):
 			debug(f'Found VG {vg_name} on device {dev_path}')
-			self._deactivate_vg(vg_name)
 			self._remove_lvm_volume_group(vg_name)
 
-		self._remove_orphan_pvs_on_device(dev_path)
-
-		self._force_remove_dm_mappings(dev_path)
+		# the PVs of removed VGs are orphans now as well
+		for pv_path, _ in pvs:
+			self._remove_lvm_physical_volume(pv_path)
 
 	@staticmethod
 	def _is_pv_on_device(pv_path: Path, dev_path: Path) -> bool:
@@ -802,132 +940,25 @@ class DeviceHandler:
 
 		return remainder.isdigit()
 
-	def _find_vg_names_on_device(self, dev_path: Path) -> list[str]:
-		vg_names = []
-		try:
-			pv_output = SysCommand(['pvs', '--reportformat', 'json', '-o', 'pv_name,vg_name']).decode()
-			if not pv_output.strip():
-				debug('No PVs found')
-				return vg_names
-			pv_data = json.loads(pv_output)
-			for report in pv_data.get('report', []):
-				for pv in report.get('pv', []):
-					pv_path = Path(pv['pv_name'])
-					if self._is_pv_on_device(pv_path, dev_path):
-						vg_name = pv.get('vg_name')
-						if vg_name and vg_name not in vg_names:
-							vg_names.append(vg_name)
-		except (SysCallError, json.JSONDecodeError) as err:
-			debug(f'Error finding VGs: {err}')
+	def _pvs_on_device(self, dev_path: Path) -> list[tuple[Path, str]]:
+		"""(pv path, vg name) of every PV on the device from a single pvs report, orphans have no vg name"""
+		pvs: list[tuple[Path, str]] = []
 
-		return vg_names
-
-	def _remove_orphan_pvs_on_device(self, dev_path: Path) -> None:
 		try:
 			pv_output = SysCommand(['pvs', '--reportformat', 'json', '-o', 'pv_name,vg_name']).decode()
 			if not pv_output.strip():
-				return
+				debug('No PVs found')
+				return pvs
 			pv_data = json.loads(pv_output)
 			for report in pv_data.get('report', []):
 				for pv in report.get('pv', []):
 					pv_path = Path(pv['pv_name'])
 					if self._is_pv_on_device(pv_path, dev_path):
-						vg_name = pv.get('vg_name')
-						if not vg_name:
-							debug(f'Found orphan PV {pv_path}, removing')
-							self._remove_lvm_physical_volume(pv_path)
+						pvs.append((pv_path, pv.get('vg_name', '')))
 		except (SysCallError, json.JSONDecodeError) as err:
-			debug(f'Error removing orphan PVs: {err}')
+			debug(f'Error finding PVs: {err}')
 
-	def _deactivate_vg(self, vg_name: str) -> None:
-		debug(f'Deactivating VG {vg_name}')
-		try:
-			SysCommand(['vgchange', '-an', vg_name])
-			debug(f'Successfully deactivated VG {vg_name}')
-		except SysCallError as err:
-			debug(f'Failed to deactivate VG {vg_name}: {err}')
-
-	def _force_remove_dm_mappings(self, dev_path: Path | None = None) -> None:
-		if dev_path:
-			dev_name = dev_path.name
-			debug(f'Force removing DM mappings for device: {dev_path}')
-			device_major_minor = self._get_device_major_minor(dev_path)
-		else:
-			debug('Force removing device mapper mappings')
-			device_major_minor = None
-
-		try:
-			output = SysCommand(['dmsetup', 'ls']).decode()
-			for line in output.splitlines():
-				if line.strip():
-					mapper_name = line.split()[0]
-
-					if dev_path:
-						try:
-							deps_output = SysCommand(['dmsetup', 'deps', mapper_name]).decode()
-							if self._is_dm_mapping_for_device(deps_output, dev_name, device_major_minor):
-								debug(f'Removing DM mapping: {mapper_name}')
-								try:
-									SysCommand(['dmsetup', 'remove', '--force', mapper_name])
-								except SysCallError as err:
-									debug(f'Failed to remove DM mapping {mapper_name}: {err}')
-						except SysCallError as err:
-							debug(f'Failed to get deps for DM mapping {mapper_name}: {err}')
-					else:
-						debug(f'Removing DM mapping: {mapper_name}')
-						try:
-							SysCommand(['dmsetup', 'remove', '--force', mapper_name])
-						except SysCallError as err:
-							debug(f'Failed to remove DM mapping {mapper_name}: {err}')
-			debug('Successfully removed DM mappings')
-		except SysCallError as err:
-			debug(f'Failed to list DM mappings: {err}')
-
-	def _get_device_major_minor(self, dev_path: Path) -> tuple[int, int] | None:
-		try:
-			stat_info = os.stat(dev_path)
-			major = os.major(stat_info.st_rdev)
-			minor = os.minor(stat_info.st_rdev)
-			return (major, minor)
-		except OSError as err:
-			debug(f'Failed to get device major/minor for {dev_path}: {err}')
-			return None
-
-	def _is_dm_mapping_for_device(self, deps_output: str, device_name: str, device_major_minor: tuple[int, int] | None) -> bool:
-		if device_name in deps_output:
-			return True
-
-		if device_major_minor:
-			expected = f'({device_major_minor[0]}, {device_major_minor[1]})'
-			if expected in deps_output:
-				return True
-
-			for part_name in self._get_device_partitions(device_name):
-				part_path = Path(f'/dev/{part_name}')
-				part_major_minor = self._get_device_major_minor(part_path)
-				if part_major_minor:
-					expected = f'({part_major_minor[0]}, {part_major_minor[1]})'
-					if expected in deps_output:
-						return True
-
-		return False
-
-	@staticmethod
-	def _get_device_partitions(device_name: str) -> list[str]:
-		partitions = []
-		sys_block_path = Path(f'/sys/block/{device_name}')
-
-		if not sys_block_path.exists():
-			return partitions
-
-		try:
-			for entry in sys_block_path.iterdir():
-				if entry.name.startswith(device_name):
-					partitions.append(entry.name)
-		except OSError as err:
-			debug(f'Failed to read partitions for {device_name}: {err}')
-
-		return partitions
+		return pvs
 
 	def _remove_lvm_volume_group(self, vg_name: str) -> None:
 		debug(f'Removing LVM volume group: {vg_name}')
@@ -977,6 +1008,7 @@ class DeviceHandler:
 		except SysCallError as err:
 			debug(f'Failed to wipe LVM signatures on {dev_path}: {err}')
 			
+	@profiler.phase('DeviceHandler.partition')
 	def partition(
 		self,
 		modification: DeviceModification,
@@ -996,10 +1028,10 @@ class DeviceHandler:
 			self.clearpart_device(modification.device)
 			self.wipe_dev(modification.device)
 
+			# 内核丢弃旧分区后再写入新分区表
 			dev_path = modification.device.device_info.path
-			self.udev_sync()
 			self.partprobe(dev_path)
-			self.udev_sync()
+			wait_for_partitions(dev_path, {})
 
 			disk = freshDisk(modification.device.disk.device, partition_table.value)
 		else:
@@ -1018,13 +1050,28 @@ class DeviceHandler:
 			self._setup_partition(part_mod, modification.device, disk, requires_delete=requires_delete)
 
 		disk.commit()
+		invalidate_lsblk_cache()
 
-		# 确保内核识别新的分区表
+		# parted 提交时已通知内核，等待新分区的设备节点出现即可
 		dev_path = modification.device.device_info.path
-		self.udev_sync()
-		self.partprobe(dev_path)
-		self.udev_sync()
-		time.sleep(2)
+		expected = self._expected_partitions(disk)
+
+		if not wait_for_partitions(dev_path, expected):
+			# 内核未能识别分区表时，才重新读取分区表并触发 udev
+			warn(f'Partitions of {dev_path} did not appear, re-reading the partition table')
+			self.partprobe(dev_path)
+			try:
+				SysCommand(['blockdev', '--rereadpt', str(dev_path)])
+			except SysCallError as err:
+				debug(f'Failed to reread partition table: {err}')
+
+			try:
+				SysCommand(['udevadm', 'trigger', '--action=add', '--subsystem-match=block'])
+			except SysCallError as err:
+				debug(f'Failed to trigger udev: {err}')
+
+			if not wait_for_partitions(dev_path, expected):
+				warn(f'Partitions of {dev_path} still differ from the partition table')
 
 		# 清除新分区的旧签名，防止 mkfs 读取到残留元数据
 		for part_mod in filtered_part:
@@ -1034,29 +1081,24 @@ class DeviceHandler:
 				except SysCallError as err:
 					debug(f'Failed to wipe signatures on {part_mod.dev_path}: {err}')
 
-		self.udev_sync()
-		self.partprobe(dev_path)
+		# udev 处理完新分区后 lsblk 才能读到 PARTUUID 等信息
 		self.udev_sync()
 
-		# 重新读取分区表，确保内核缓存被刷新
-		try:
-			SysCommand(['blockdev', '--rereadpt', str(dev_path)])
-		except SysCallError as err:
-			debug(f'Failed to reread partition table: {err}')
-
-		self.udev_sync()
+		# only the repartitioned disk has to be probed again
+		self.refresh(paths=[dev_path])
 
-		# 确保分区设备节点存在
-		for part_mod in filtered_part:
-			if part_mod.dev_path:
-				part_dev = Path(part_mod.dev_path)
-				if not part_dev.exists():
-					try:
-						SysCommand(['udevadm', 'trigger', '--action=add', '--subsystem-match=block'])
-						self.udev_sync()
-						time.sleep(2)
-					except SysCallError as err:
-						debug(f'Failed to trigger udev: {err}')
+	@staticmethod
+	def _expected_partitions(disk: Disk) -> dict[Path, int | None]:
+		"""
+		Device path and size in bytes of every partition in the committed partition table. The
+		kernel reports an extended partition with a size of its own (2 sectors), it is only
+		expected to exist.
+		"""
+		sector_size = disk.device.sectorSize
+		return {
+			Path(partition.path): None if partition.type & PARTITION_EXTENDED else partition.geometry.length * sector_size
+			for partition in disk.partitions
+		}
 
 	@staticmethod
 	def swapon(path: Path) -> None:
@@ -1065,6 +1107,7 @@ class DeviceHandler:
 		except SysCallError as err:
 			raise DiskError(f'Could not enable swap {path}:\n{err.message}')
 
+	@profiler.phase('DeviceHandler.mount')
 	def mount(
 		self,
 		dev_path: Path,
@@ -1079,28 +1122,10 @@ class DeviceHandler:
 		if not target_mountpoint.exists():
 			raise ValueError('Target mountpoint does not exist')
 
-		lsblk_info = get_lsblk_info(dev_path)
-		if target_mountpoint in lsblk_info.mountpoints:
-			info(f'Device already mounted at {target_mountpoint}')
-			return
-
-		cmd = ['mount']
-
-		if len(options):
-			cmd.extend(('-o', ','.join(options)))
-		if mount_fs:
-			cmd.extend(('-t', mount_fs))
-
-		cmd.extend((str(dev_path), str(target_mountpoint)))
-
-		command = ' '.join(cmd)
-
-		debug(f'Mounting {dev_path}: {command}')
-
 		try:
-			SysCommand(command)
-		except SysCallError as err:
-			raise DiskError(f'Could not mount {dev_path}: {command}\n{err.message}')
+			mount_manager.mount(dev_path, target_mountpoint, mount_fs, options)
+		finally:
+			invalidate_lsblk_cache()
 
 	def detect_pre_mounted_mods(self, base_mountpoint: Path) -> list[DeviceModification]:
 		part_mods: dict[Path, list[PartitionModification]] = {}
@@ -1164,6 +1189,7 @@ class DeviceHandler:
 		except OSError as err:
 			debug(f'Failed to wipe {dev_path}: {err}')
 
+	@profiler.phase('DeviceHandler.wipe_dev')
 	def wipe_dev(self, block_device: BDevice) -> None:
 		"""
 		Wipe the block device of meta-data, be it file system, LVM, etc.
@@ -1207,11 +1233,15 @@ class DeviceHandler:
 			debug(f'Failed to wipe tail of {dev_path}: {err}')
 
 	@staticmethod
+	@profiler.phase('DeviceHandler.udev_sync')
 	def udev_sync() -> None:
 		try:
 			SysCommand('udevadm settle')
 		except SysCallError as err:
 			debug(f'Failed to synchronize with udev: {err}')
 
+		# udev has processed all events, lsblk may report a different layout now
+		invalidate_lsblk_cache()
+
 
 device_handler = DeviceHandler()
@@ -9,15 +9,15 @@
 
 from __future__ import annotations
 
-import math
 import time
+from functools import partial
 from pathlib import Path
 
 from eulerinstall.lib.translationhandler import tr
 from eulerinstall.tui.curses_menu import Tui
 
 from ..interactions.general_conf import ask_abort
-from ..luks import Luks2
+from ..luks import Luks2, luks_kdf
 from ..models.device import (
 	DiskEncryption,
 	DiskLayoutConfiguration,
@@ -33,7 +33,11 @@ from ..models.device import (
 	Unit,
 )
 from ..output import debug, info, error
+from ..progress import progress
+from ..profiler import profiler
 from .device_handler import device_handler
+from .format_scheduler import FormatScheduler
+from .utils import plan_lv_extents
 from ..general import SysCommand
 from ..exceptions import SysCallError
 
@@ -43,6 +47,7 @@ class FilesystemHandler:
 		self._disk_config = disk_config
 		self._enc_config = disk_config.disk_encryption
 
+	@profiler.phase('FilesystemHandler.perform_filesystem_operations')
 	def perform_filesystem_operations(self, show_countdown: bool = True) -> None:
 		# clean mpath
 		self._clean_mpath()
@@ -67,29 +72,40 @@ class FilesystemHandler:
 		# Setup the blockdevice, filesystem (and optionally encryption).
 		# Once that's done, we'll hand over to perform_installation()
 
-		# make sure all devices are unmounted
-		for mod in device_mods:
-			device_handler.umount_all_existing(mod.device_path)
+		with progress.phase('partition'), profiler.phase('FilesystemHandler.partition'):
+			# make sure all devices are unmounted
+			for mod in device_mods:
+				device_handler.umount_all_existing(mod.device_path)
 
-		for mod in device_mods:
-			device_handler.partition(mod)
+			for mod in device_mods:
+				device_handler.partition(mod)
 
-		device_handler.udev_sync()
+			device_handler.udev_sync()
 
-		if self._disk_config.lvm_config:
-			for mod in device_mods:
-				if boot_part := mod.get_boot_partition():
-					debug(f'Formatting boot partition: {boot_part.dev_path}')
-					self._format_partitions([boot_part])
+		with progress.phase('format'), profiler.phase('FilesystemHandler.format'):
+			# independent partitions and volumes are formatted in parallel
+			scheduler = FormatScheduler(lock_limits={'luks': self._luks_concurrency()})
 
-			self.perform_lvm_operations()
-		else:
-			for mod in device_mods:
-				self._format_partitions(mod.partitions)
+			if self._disk_config.lvm_config:
+				for mod in device_mods:
+					if boot_part := mod.get_boot_partition():
+						debug(f'Formatting boot partition: {boot_part.dev_path}')
+						self._schedule_partitions(scheduler, [boot_part])
+
+				self._schedule_lvm_operations(scheduler)
+			else:
+				for mod in device_mods:
+					self._schedule_partitions(scheduler, mod.partitions, with_subvolumes=True)
+
+			scheduler.run()
 
-				for part_mod in mod.partitions:
-					if part_mod.fs_type == FilesystemType.Btrfs and part_mod.is_create_or_modify():
-						device_handler.create_btrfs_volumes(part_mod, enc_conf=self._enc_config)
+	def _luks_concurrency(self) -> int:
+		if self._enc_config is None or self._enc_config.encryption_type == EncryptionType.NoEncryption:
+			return 1
+
+		# calibrate once before formatting, all devices use the result
+		luks_kdf.params(self._enc_config.iter_time)
+		return luks_kdf.concurrency(self._enc_config.iter_time)
 
 	def _clean_mpath(self) -> None:
 		try:
@@ -98,40 +114,57 @@ class FilesystemHandler:
 		except SysCallError as e:
 			error(f'clean mpath failed: {e}')
 
-	def _format_partitions(
+	def _schedule_partitions(
 		self,
+		scheduler: FormatScheduler,
 		partitions: list[PartitionModification],
+		with_subvolumes: bool = False,
 	) -> None:
-		"""
-		Format can be given an overriding path, for instance /dev/null to test
-		the formatting functionality and in essence the support for the given filesystem.
-		"""
-
 		# don't touch existing partitions
 		create_or_modify_parts = [p for p in partitions if p.is_create_or_modify()]
 
 		self._validate_partitions(create_or_modify_parts)
 
 		for part_mod in create_or_modify_parts:
-			# partition will be encrypted
+			device = str(part_mod.safe_dev_path)
+			locks = []
+
+			# the key derivation of luks is memory hard, only as many run at once as memory and CPUs allow
 			if self._enc_config is not None and part_mod in self._enc_config.partitions:
-				device_handler.format_encrypted(
-					part_mod.safe_dev_path,
-					part_mod.mapper_name,
-					part_mod.safe_fs_type,
-					self._enc_config,
+				locks.append('luks')
+
+			task = scheduler.add(f'format {device}', partial(self._format_partition, part_mod), locks=locks, device=device)
+
+			if with_subvolumes and part_mod.fs_type == FilesystemType.Btrfs:
+				scheduler.add(
+					f'subvolumes {device}',
+					partial(device_handler.create_btrfs_volumes, part_mod, enc_conf=self._enc_config),
+					deps=[task],
+					# the subvolumes are created on a shared temporary mountpoint
+					locks=['btrfs-mount', *locks],
+					device=device,
 				)
-			else:
-				device_handler.format(part_mod.safe_fs_type, part_mod.safe_dev_path)
 
-			# synchronize with udev before using lsblk
-			device_handler.udev_sync()
+	def _format_partition(self, part_mod: PartitionModification) -> None:
+		# partition will be encrypted
+		if self._enc_config is not None and part_mod in self._enc_config.partitions:
+			device_handler.format_encrypted(
+				part_mod.safe_dev_path,
+				part_mod.mapper_name,
+				part_mod.safe_fs_type,
+				self._enc_config,
+			)
+		else:
+			device_handler.format(part_mod.safe_fs_type, part_mod.safe_dev_path)
+
+		# synchronize with udev before using lsblk
+		device_handler.udev_sync()
 
-			lsblk_info = device_handler.fetch_part_info(part_mod.safe_dev_path)
+		lsblk_info = device_handler.fetch_part_info(part_mod.safe_dev_path)
 
-			part_mod.partn = lsblk_info.partn
-			part_mod.partuuid = lsblk_info.partuuid
-			part_mod.uuid = lsblk_info.uuid
+		part_mod.partn = lsblk_info.partn
+		part_mod.partuuid = lsblk_info.partuuid
+		part_mod.uuid = lsblk_info.uuid
 
 	def _validate_partitions(self, partitions: list[PartitionModification]) -> None:
 		checks = {
@@ -149,41 +182,86 @@ class FilesystemHandler:
 				raise exc
 
 	def perform_lvm_operations(self) -> None:
+		scheduler = FormatScheduler(lock_limits={'luks': self._luks_concurrency()})
+		self._schedule_lvm_operations(scheduler)
+		scheduler.run()
+
+	def _schedule_lvm_operations(self, scheduler: FormatScheduler) -> None:
 		info('Setting up LVM config...')
 
-		if not self._disk_config.lvm_config:
+		if not (lvm_config := self._disk_config.lvm_config):
 			return
 
-		if self._enc_config:
-			self._setup_lvm_encrypted(
-				self._disk_config.lvm_config,
-				self._enc_config,
-			)
-		else:
-			self._setup_lvm(self._disk_config.lvm_config)
-			self._format_lvm_vols(self._disk_config.lvm_config)
+		enc_config = self._enc_config
+		enc_mods: dict[PartitionModification, Luks2] = {}
+		enc_vols: dict[LvmVolume, Luks2] = {}
+		luks_tasks = []
+
+		# partition -> LUKS -> PV -> VG -> LV -> (LUKS) -> mkfs -> btrfs subvolumes
+		if enc_config and enc_config.encryption_type == EncryptionType.LvmOnLuks:
+			for part_mod in self._get_partitions_to_encrypt(enc_config):
+				luks_tasks.append(
+					scheduler.add(
+						f'luks {part_mod.safe_dev_path}',
+						partial(self._encrypt_partition, part_mod, enc_config, enc_mods, False),
+						locks=['luks'],
+						device=str(part_mod.safe_dev_path),
+					),
+				)
+
+		pv_task = scheduler.add('lvm pvcreate', partial(self._lvm_create_pvs, lvm_config, enc_mods), deps=luks_tasks, locks=['lvm'])
+		vol_tasks = []
 
-	def _setup_lvm_encrypted(self, lvm_config: LvmConfiguration, enc_config: DiskEncryption) -> None:
-		if enc_config.encryption_type == EncryptionType.LvmOnLuks:
-			enc_mods = self._encrypt_partitions(enc_config, lock_after_create=False)
+		for vg in lvm_config.vol_groups:
+			vg_task = scheduler.add(f'lvm vg {vg.name}', partial(self._setup_lvm_vg, vg, enc_mods), deps=[pv_task], locks=['lvm'])
+
+			for vol in vg.volumes:
+				# the volume only gets its dev_path once the vg task created it
+				device = f'/dev/{vg.name}/{vol.name}'
+				deps = [vg_task]
+
+				if enc_config and enc_config.encryption_type == EncryptionType.LuksOnLvm and vol in enc_config.lvm_volumes:
+					deps = [
+						scheduler.add(
+							f'luks {device}',
+							partial(self._encrypt_lvm_vol, vol, enc_config, enc_vols, False),
+							deps=deps,
+							locks=['luks'],
+							device=device,
+						),
+					]
+
+				format_task = scheduler.add(f'format {device}', partial(self._format_lvm_vol, vol, enc_vols), deps=deps, device=device)
+				vol_tasks.append(format_task)
+
+				if vol.fs_type == FilesystemType.Btrfs:
+					vol_tasks.append(
+						scheduler.add(
+							f'subvolumes {device}',
+							partial(self._create_lvm_vol_subvolumes, vol, enc_vols),
+							deps=[format_task],
+							locks=['btrfs-mount'],
+							device=device,
+						),
+					)
 
-			self._setup_lvm(lvm_config, enc_mods)
-			self._format_lvm_vols(lvm_config)
+		if enc_config and enc_config.encryption_type == EncryptionType.LvmOnLuks:
+			scheduler.add('lvm close', partial(self._close_lvm_on_luks, lvm_config, enc_mods), deps=vol_tasks, locks=['lvm'])
+		elif enc_config and enc_config.encryption_type == EncryptionType.LuksOnLvm:
+			scheduler.add('lvm close', partial(self._close_luks_on_lvm, lvm_config, enc_vols), deps=vol_tasks, locks=['lvm'])
 
-			# export the lvm group safely otherwise the Luks cannot be closed
-			self._safely_close_lvm(lvm_config)
+	def _close_lvm_on_luks(self, lvm_config: LvmConfiguration, enc_mods: dict[PartitionModification, Luks2]) -> None:
+		# export the lvm group safely otherwise the Luks cannot be closed
+		self._safely_close_lvm(lvm_config)
 
-			for luks in enc_mods.values():
-				luks.lock()
-		elif enc_config.encryption_type == EncryptionType.LuksOnLvm:
-			self._setup_lvm(lvm_config)
-			enc_vols = self._encrypt_lvm_vols(lvm_config, enc_config, False)
-			self._format_lvm_vols(lvm_config, enc_vols)
+		for luks in enc_mods.values():
+			luks.lock()
 
-			for luks in enc_vols.values():
-				luks.lock()
+	def _close_luks_on_lvm(self, lvm_config: LvmConfiguration, enc_vols: dict[LvmVolume, Luks2]) -> None:
+		for luks in enc_vols.values():
+			luks.lock()
 
-			self._safely_close_lvm(lvm_config)
+		self._safely_close_lvm(lvm_config)
 
 	def _safely_close_lvm(self, lvm_config: LvmConfiguration) -> None:
 		for vg in lvm_config.vol_groups:
@@ -192,80 +270,43 @@ class FilesystemHandler:
 
 			device_handler.lvm_export_vg(vg)
 
-	def _setup_lvm(
+	def _setup_lvm_vg(
 		self,
-		lvm_config: LvmConfiguration,
+		vg: LvmVolumeGroup,
 		enc_mods: dict[PartitionModification, Luks2] = {},
 	) -> None:
-		self._lvm_create_pvs(lvm_config, enc_mods)
-
-		for vg in lvm_config.vol_groups:
-			pv_dev_paths = self._get_all_pv_dev_paths(vg.pvs, enc_mods)
-
-			device_handler.lvm_vg_create(pv_dev_paths, vg.name)
-
-			# figure out what the actual available size in the group is
-			vg_info = device_handler.lvm_group_info(vg.name)
-
-			if not vg_info:
-				raise ValueError('Unable to fetch VG info')
-
-			# the actual available LVM Group size will be smaller than the
-			# total PVs size due to reserved metadata storage etc.
-			# so we'll have a look at the total avail. size, check the delta
-			# to the desired sizes and subtract some equally from the actually
-			# created volume
-			avail_size = vg_info.vg_size
-			desired_size = sum([vol.length for vol in vg.volumes], Size(0, Unit.B, SectorSize.default()))
-
-			delta = desired_size - avail_size
-			delta_bytes = delta.convert(Unit.B)
+		pv_dev_paths = self._get_all_pv_dev_paths(vg.pvs, enc_mods)
 
-			# Round the offset up to the next physical extent (PE, 4 MiB by default)
-			# to ensure lvcreate`s internal rounding doesn`t consume space reserved
-			# for subsequent logical volumes.
-			pe_bytes = Size(4, Unit.MiB, SectorSize.default()).convert(Unit.B)
-			pe_count = math.ceil(delta_bytes.value / pe_bytes.value)
-			rounded_offset = pe_count * pe_bytes.value
-			max_vol_offset = Size(rounded_offset, Unit.B, SectorSize.default())
+		device_handler.lvm_vg_create(pv_dev_paths, vg.name)
 
-			max_vol = max(vg.volumes, key=lambda x: x.length)
+		# the actual available LVM Group size will be smaller than the
+		# total PVs size due to reserved metadata storage etc.
+		# so all volumes are planned in full extents of the group up
+		# front and the largest one takes up the difference
+		extent_size, free_extents = device_handler.lvm_group_extents(vg.name)
+		extents = plan_lv_extents([lv.length.convert(Unit.B).value for lv in vg.volumes], extent_size, free_extents)
 
-			for lv in vg.volumes:
-				offset = max_vol_offset if lv == max_vol else None
+		for lv, count in zip(vg.volumes, extents):
+			debug(f'vg: {vg.name}, vol: {lv.name}, extents: {count} of {extent_size} bytes')
 
-				debug(f'vg: {vg.name}, vol: {lv.name}, offset: {offset}')
-				device_handler.lvm_vol_create(vg.name, lv, offset)
+		# one lvm session creates all volumes, one report verifies them
+		device_handler.lvm_vols_create(vg.name, list(zip(vg.volumes, extents)))
 
-				while True:
-					debug('Fetching LVM volume info')
-					lv_info = device_handler.lvm_vol_info(lv.name)
-					if lv_info is not None:
-						break
+		self._lvm_vol_handle_e2scrub(vg)
 
-					time.sleep(1)
+	def _lvm_vol_path(self, vol: LvmVolume, enc_vols: dict[LvmVolume, Luks2]) -> Path:
+		if enc_vol := enc_vols.get(vol, None):
+			if not enc_vol.mapper_dev:
+				raise ValueError('No mapper device defined')
+			return enc_vol.mapper_dev
 
-			self._lvm_vol_handle_e2scrub(vg)
+		return vol.safe_dev_path
 
-	def _format_lvm_vols(
-		self,
-		lvm_config: LvmConfiguration,
-		enc_vols: dict[LvmVolume, Luks2] = {},
-	) -> None:
-		for vol in lvm_config.get_all_volumes():
-			if enc_vol := enc_vols.get(vol, None):
-				if not enc_vol.mapper_dev:
-					raise ValueError('No mapper device defined')
-				path = enc_vol.mapper_dev
-			else:
-				path = vol.safe_dev_path
+	def _format_lvm_vol(self, vol: LvmVolume, enc_vols: dict[LvmVolume, Luks2]) -> None:
+		device_handler.format(vol.fs_type, self._lvm_vol_path(vol, enc_vols))
 
-			# wait a bit otherwise the mkfs will fail as it can't
-			# find the mapper device yet
-			device_handler.format(vol.fs_type, path)
-
-			if vol.fs_type == FilesystemType.Btrfs:
-				device_handler.create_lvm_btrfs_subvolumes(path, vol.btrfs_subvols, vol.mount_options)
+	def _create_lvm_vol_subvolumes(self, vol: LvmVolume, enc_vols: dict[LvmVolume, Luks2]) -> None:
+		device_handler.create_lvm_btrfs_subvolumes(self._lvm_vol_path(vol, enc_vols), vol.btrfs_subvols, vol.mount_options)
 
 	def _lvm_create_pvs(
 		self,
@@ -295,58 +336,48 @@ class FilesystemHandler:
 
 		return pv_paths
 
-	def _encrypt_lvm_vols(
+	def _encrypt_lvm_vol(
 		self,
-		lvm_config: LvmConfiguration,
+		vol: LvmVolume,
 		enc_config: DiskEncryption,
+		enc_vols: dict[LvmVolume, Luks2],
 		lock_after_create: bool = True,
-	) -> dict[LvmVolume, Luks2]:
-		enc_vols: dict[LvmVolume, Luks2] = {}
-
-		for vol in lvm_config.get_all_volumes():
-			if vol in enc_config.lvm_volumes:
-				luks_handler = device_handler.encrypt(
-					vol.safe_dev_path,
-					vol.mapper_name,
-					enc_config.encryption_password,
-					lock_after_create,
-					iter_time=enc_config.iter_time,
-				)
-
-				enc_vols[vol] = luks_handler
-
-		return enc_vols
+	) -> None:
+		enc_vols[vol] = device_handler.encrypt(
+			vol.safe_dev_path,
+			vol.mapper_name,
+			enc_config.encryption_password,
+			lock_after_create,
+			iter_time=enc_config.iter_time,
+		)
 
-	def _encrypt_partitions(
-		self,
-		enc_config: DiskEncryption,
-		lock_after_create: bool = True,
-	) -> dict[PartitionModification, Luks2]:
-		enc_mods: dict[PartitionModification, Luks2] = {}
+	def _get_partitions_to_encrypt(self, enc_config: DiskEncryption) -> list[PartitionModification]:
+		partitions = []
 
 		for mod in self._disk_config.device_modifications:
-			partitions = mod.partitions
-
 			# don't touch existing partitions
-			filtered_part = [p for p in partitions if not p.exists()]
+			filtered_part = [p for p in mod.partitions if not p.exists()]
 
 			self._validate_partitions(filtered_part)
 
-			enc_mods = {}
-
-			for part_mod in filtered_part:
-				if part_mod in enc_config.partitions:
-					luks_handler = device_handler.encrypt(
-						part_mod.safe_dev_path,
-						part_mod.mapper_name,
-						enc_config.encryption_password,
-						lock_after_create=lock_after_create,
-						iter_time=enc_config.iter_time,
-					)
+			partitions += [p for p in filtered_part if p in enc_config.partitions]
 
-					enc_mods[part_mod] = luks_handler
+		return partitions
 
-		return enc_mods
+	def _encrypt_partition(
+		self,
+		part_mod: PartitionModification,
+		enc_config: DiskEncryption,
+		enc_mods: dict[PartitionModification, Luks2],
+		lock_after_create: bool = True,
+	) -> None:
+		enc_mods[part_mod] = device_handler.encrypt(
+			part_mod.safe_dev_path,
+			part_mod.mapper_name,
+			enc_config.encryption_password,
+			lock_after_create=lock_after_create,
+			iter_time=enc_config.iter_time,
+		)
 
 	def _lvm_vol_handle_e2scrub(self, vol_gp: LvmVolumeGroup) -> None:
 		# from arch wiki:
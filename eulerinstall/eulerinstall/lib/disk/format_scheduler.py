@@ -0,0 +1,155 @@
+# Arch Linux install script (archinstall)
+# Copyright (C) 2021-2023 Arch Linux
+#
+# This file is part of archinstall.
+# This file is licensed under the GNU General Public License version 3.
+# Refer to the `LICENSE` file for further details.
+
+# Modified for openEuler Installation by Liu Wang in 2025
+
+from __future__ import annotations
+
+import os
+import time
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from ..output import debug, info
+from ..profiler import profiler
+from ..progress import progress
+
+
+def default_format_workers() -> int:
+	return max(1, min(os.cpu_count() or 1, 8))
+
+
+@dataclass
+class FormatTask:
+	name: str
+	action: Callable[[], None]
+	deps: list[str] = field(default_factory=list)
+	# tasks sharing a lock never run at the same time (e.g. a shared temporary mountpoint),
+	# unless the scheduler allows more holders of that lock
+	locks: list[str] = field(default_factory=list)
+	# device the task works on, used to report timings per device
+	device: str | None = None
+
+
+@dataclass
+class TaskTiming:
+	name: str
+	device: str | None
+	elapsed: float
+
+
+class FormatScheduler:
+	"""
+	Runs the disk setup steps (LUKS, LVM PV/VG/LV, mkfs, btrfs subvolumes) as a dependency
+	graph, steps which don't depend on each other run in parallel on a bounded thread pool.
+
+	Ready tasks are always started in the order they were added, and if tasks fail no further
+	tasks are started and the error of the first failed task (in order of addition) is raised
+	once the running tasks finished, so a failing layout reports the same error every time.
+	"""
+
+	def __init__(self, max_workers: int | None = None, lock_limits: dict[str, int] | None = None):
+		self.max_workers = max_workers if max_workers else default_format_workers()
+		# how many tasks may hold a lock at once, 1 for locks which are not listed
+		self.lock_limits = lock_limits or {}
+		self._tasks: dict[str, FormatTask] = {}
+
+	def add(
+		self,
+		name: str,
+		action: Callable[[], None],
+		deps: list[str] = [],
+		locks: list[str] = [],
+		device: str | None = None,
+	) -> str:
+		if name in self._tasks:
+			raise ValueError(f'Task {name} was already added')
+
+		for dep in deps:
+			if dep not in self._tasks:
+				raise ValueError(f'Task {name} depends on unknown task {dep}')
+
+		self._tasks[name] = FormatTask(name, action, list(deps), list(locks), device)
+		return name
+
+	def _can_lock(self, task: FormatTask, held_locks: Counter[str]) -> bool:
+		return all(held_locks[lock] < self.lock_limits.get(lock, 1) for lock in task.locks)
+
+	def _timed(self, task: FormatTask) -> float:
+		debug(f'Starting disk task: {task.name}')
+		progress.step(task.name)
+
+		start = time.monotonic()
+
+		with profiler.phase(task.name):
+			task.action()
+
+		return time.monotonic() - start
+
+	def _report(self, timings: list[TaskTiming]) -> None:
+		per_device: dict[str, float] = {}
+
+		for timing in timings:
+			debug(f'Disk task {timing.name} finished in {timing.elapsed:.2f}s')
+
+			if timing.device:
+				per_device[timing.device] = per_device.get(timing.device, 0.0) + timing.elapsed
+
+		for device, elapsed in per_device.items():
+			info(f'Disk setup of {device} took {elapsed:.1f}s')
+
+	def run(self) -> list[TaskTiming]:
+		order = list(self._tasks)
+		pending = list(order)
+		done: set[str] = set()
+		held_locks: Counter[str] = Counter()
+		running: dict[Future[float], FormatTask] = {}
+		errors: dict[str, BaseException] = {}
+		timings: list[TaskTiming] = []
+
+		with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='disk-task') as executor:
+			while pending or running:
+				if not errors:
+					for name in list(pending):
+						if len(running) >= self.max_workers:
+							break
+
+						task = self._tasks[name]
+
+						if not all(dep in done for dep in task.deps) or not self._can_lock(task, held_locks):
+							continue
+
+						pending.remove(name)
+						held_locks.update(task.locks)
+						running[executor.submit(self._timed, task)] = task
+
+				# dependencies always refer to earlier tasks, so something is runnable unless a task failed
+				if not running:
+					break
+
+				finished, _ = wait(running, return_when=FIRST_COMPLETED)
+
+				for future in finished:
+					task = running.pop(future)
+					held_locks.subtract(task.locks)
+
+					try:
+						timings.append(TaskTiming(task.name, task.device, future.result()))
+					except BaseException as err:
+						errors[task.name] = err
+					else:
+						done.add(task.name)
+
+		self._report(timings)
+
+		if errors:
+			first = next(name for name in order if name in errors)
+			raise errors[first]
+
+		return timings
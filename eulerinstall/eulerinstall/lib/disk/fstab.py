@@ -0,0 +1,176 @@
+# Arch Linux install script (archinstall)
+# Copyright (C) 2021-2023 Arch Linux
+#
+# This file is part of archinstall.
+# This file is licensed under the GNU General Public License version 3.
+# Refer to the `LICENSE` file for further details.
+
+# Modified for openEuler Installation by Liu Wang in 2025
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from ..output import debug
+from .mountinfo import API_FSTYPES, MountInfo, mounts_below, unescape
+from .utils import block_topology
+
+# Filesystems whose fsck tool checks them at boot, the others are checked on mount or not at all
+_FSCK_FSTYPES = {'ext2', 'ext3', 'ext4', 'vfat', 'msdos', 'f2fs'}
+
+# Superblock options which are reported but must not end up in fstab
+_DROPPED_OPTIONS = {'rw', 'ro', 'seclabel'}
+
+
+@dataclass
+class FstabEntry:
+	spec: str
+	file: str
+	vfstype: str
+	options: str
+	freq: int = 0
+	passno: int = 0
+
+	def line(self) -> str:
+		return f'{escape(self.spec):<25} {escape(self.file):<14} {self.vfstype:<7} {self.options} {self.freq} {self.passno}'
+
+
+def escape(value: str) -> str:
+	return value.replace('\\', '\\134').replace(' ', '\\040').replace('\t', '\\011').replace('\n', '\\012')
+
+
+def _relative_mountpoint(mountpoint: Path, target: Path) -> str:
+	return str(Path('/') / mountpoint.relative_to(target))
+
+
+def _options(mount: MountInfo) -> str:
+	options = list(mount.options)
+
+	for option in mount.super_options:
+		name = option.partition('=')[0]
+
+		# subvolid changes when the subvolume is recreated, subvol is kept instead
+		if option in _DROPPED_OPTIONS or name == 'subvolid' or option in options:
+			continue
+
+		options.append(option)
+
+	return ','.join(options)
+
+
+def _bind_source(mount: MountInfo, mounted: list[MountInfo], target: Path) -> str | None:
+	"""
+	Path in the installed system which is the source of a bind mount, i.e. an earlier mount of
+	the same filesystem whose root contains the root of this one. A btrfs mount of another
+	subvolume is not a bind mount, it has the subvolume as root.
+	"""
+	if mount.fs_type == 'btrfs' and mount.root == mount.super_option('subvol'):
+		return None
+
+	for other in mounted:
+		if other.dev != mount.dev or other.root == mount.root:
+			continue
+
+		if other.root == '/' or mount.root.startswith(other.root.rstrip('/') + '/'):
+			rest = os.path.relpath(mount.root, other.root)
+			return str(Path(_relative_mountpoint(other.mountpoint, target)) / rest)
+
+	return None
+
+
+def _passno(mount: MountInfo, mountpoint: str) -> int:
+	if mount.fs_type not in _FSCK_FSTYPES:
+		return 0
+	return 1 if mountpoint == '/' else 2
+
+
+def generate_fstab(
+	mounts: list[MountInfo],
+	target: Path,
+	uuids: dict[str, str],
+	swaps: list[tuple[str, str]] | None = None,
+) -> list[FstabEntry]:
+	"""
+	Builds the fstab entries of everything mounted below target.
+
+	mounts is the mount table (e.g. /proc/self/mountinfo), uuids maps device paths to their
+	filesystem UUID and swaps lists (path, type) pairs as in /proc/swaps. Parents are listed
+	before the mounts nested in them, bind mounts refer to the path they were bound from and
+	btrfs subvolumes keep their subvol option. Devices without a UUID use their path.
+	"""
+	entries: list[FstabEntry] = []
+	mounted: list[MountInfo] = []
+
+	visible = [mount for mount in mounts_below(mounts, target) if mount.fs_type not in API_FSTYPES]
+	# sorted() is stable, mounts of the same depth keep the mount order
+	visible = sorted(visible, key=lambda mount: len(mount.mountpoint.parts))
+
+	for mount in visible:
+		mountpoint = _relative_mountpoint(mount.mountpoint, target)
+
+		if (source := _bind_source(mount, mounted, target)) is not None:
+			entries.append(FstabEntry(source, mountpoint, 'none', 'bind'))
+		else:
+			spec = f'UUID={uuids[mount.source]}' if mount.source in uuids else mount.source
+			entries.append(FstabEntry(spec, mountpoint, mount.fs_type, _options(mount), passno=_passno(mount, mountpoint)))
+
+		mounted.append(mount)
+
+	for path, swap_type in swaps or []:
+		if swap_type == 'partition':
+			spec = f'UUID={uuids[path]}' if path in uuids else path
+		elif Path(path) == target or target in Path(path).parents:
+			spec = _relative_mountpoint(Path(path), target)
+		else:
+			debug(f'Swap file {path} is not part of the installation')
+			continue
+
+		entries.append(FstabEntry(spec, 'none', 'swap', 'defaults'))
+
+	return entries
+
+
+def parse_swaps(content: str) -> list[tuple[str, str]]:
+	"""(path, type) of every active swap area in /proc/swaps"""
+	swaps = []
+
+	for line in content.splitlines()[1:]:
+		fields = line.split()
+		if len(fields) >= 2:
+			swaps.append((unescape(fields[0]), fields[1]))
+
+	return swaps
+
+
+def read_uuids(by_uuid: Path = Path('/dev/disk/by-uuid')) -> dict[str, str]:
+	"""Filesystem UUIDs of all block devices from the udev symlinks, keyed by the kernel device path"""
+	uuids: dict[str, str] = {}
+
+	try:
+		links = list(by_uuid.iterdir())
+	except OSError:
+		return uuids
+
+	for link in links:
+		uuids[os.path.realpath(link)] = link.name
+
+	return uuids
+
+
+def resolve_uuids(sources: set[str]) -> dict[str, str]:
+	"""
+	UUIDs of the given device paths in one pass over /dev/disk/by-uuid, a single lsblk run
+	only covers the devices udev has not linked (yet)
+	"""
+	by_device = read_uuids()
+	uuids: dict[str, str] = {}
+
+	for source in sources:
+		if uuid := by_device.get(os.path.realpath(source)):
+			uuids[source] = uuid
+		elif source.startswith('/dev/') and (info := block_topology.snapshot().find(source)) and info.uuid:
+			uuids[source] = info.uuid
+
+	return uuids
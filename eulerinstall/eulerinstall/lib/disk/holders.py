@@ -0,0 +1,134 @@
+# Arch Linux install script (archinstall)
+# Copyright (C) 2021-2023 Arch Linux
+#
+# This file is part of archinstall.
+# This file is licensed under the GNU General Public License version 3.
+# Refer to the `LICENSE` file for further details.
+
+# Modified for openEuler Installation by Liu Wang in 2025
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from ..exceptions import SysCallError
+from ..general import SysCommand
+from ..output import debug, info
+
+_SYS_BLOCK = Path('/sys/class/block')
+
+
+def kernel_name(dev_path: Path) -> str:
+	"""sda2 for /dev/sda2, dm-0 for /dev/mapper/vg-root"""
+	return Path(os.path.realpath(dev_path)).name
+
+
+def read_holder_graph(sys_block: Path = _SYS_BLOCK) -> dict[str, list[str]]:
+	"""Kernel names of the devices holding each block device open, e.g. {'sda2': ['dm-0']}"""
+	graph: dict[str, list[str]] = {}
+
+	try:
+		names = os.listdir(sys_block)
+	except OSError as err:
+		debug(f'Unable to list {sys_block}: {err}')
+		return graph
+
+	for name in names:
+		try:
+			graph[name] = sorted(os.listdir(sys_block / name / 'holders'))
+		except OSError:
+			graph[name] = []
+
+	return graph
+
+
+def partitions_of(name: str, sys_block: Path = _SYS_BLOCK) -> list[str]:
+	try:
+		entries = list((sys_block / name).iterdir())
+	except OSError:
+		return []
+
+	return sorted(entry.name for entry in entries if (entry / 'partition').exists())
+
+
+def teardown_order(roots: list[str], graph: dict[str, list[str]]) -> list[str]:
+	"""
+	Every device stacked on top of the roots, each one listed after all devices which hold it,
+	so removing them in this order never hits a device which is still in use
+	"""
+	order: list[str] = []
+	seen: set[str] = set()
+
+	def visit(name: str) -> None:
+		for holder in graph.get(name, []):
+			if holder not in seen:
+				seen.add(holder)
+				visit(holder)
+				order.append(holder)
+
+	for root in roots:
+		visit(root)
+
+	return order
+
+
+def _kind(name: str, sys_block: Path) -> str:
+	if (sys_block / name / 'dm').exists():
+		return 'dm'
+	if (sys_block / name / 'md').exists():
+		return 'md'
+	return 'other'
+
+
+def _dm_name(name: str, sys_block: Path) -> str:
+	try:
+		return (sys_block / name / 'dm' / 'name').read_text().strip()
+	except OSError:
+		return name
+
+
+def teardown_batches(order: list[str], sys_block: Path = _SYS_BLOCK) -> list[tuple[str, list[str]]]:
+	"""Consecutive devices of the same kind are grouped, so each group is removed by one command"""
+	batches: list[tuple[str, list[str]]] = []
+
+	for name in order:
+		kind = _kind(name, sys_block)
+
+		if batches and batches[-1][0] == kind:
+			batches[-1][1].append(name)
+		else:
+			batches.append((kind, [name]))
+
+	return batches
+
+
+def teardown_holders(dev_path: Path, sys_block: Path = _SYS_BLOCK) -> list[str]:
+	"""
+	Removes all device mapper (LVM, LUKS) and RAID devices stacked on a disk or its partitions,
+	top-down, with one dmsetup or mdadm call per group. Returns the removed kernel names.
+	"""
+	name = kernel_name(dev_path)
+	order = teardown_order([name, *partitions_of(name, sys_block)], read_holder_graph(sys_block))
+
+	if not order:
+		return []
+
+	info(f'Removing {len(order)} devices stacked on {dev_path}: {", ".join(order)}')
+
+	for kind, names in teardown_batches(order, sys_block):
+		match kind:
+			case 'dm':
+				cmd = ['dmsetup', 'remove', '--force', '--retry', *[_dm_name(name, sys_block) for name in names]]
+			case 'md':
+				cmd = ['mdadm', '--stop', *[f'/dev/{name}' for name in names]]
+			case _:
+				debug(f'Unable to remove holders {names} of {dev_path}')
+				continue
+
+		try:
+			SysCommand(cmd)
+		except SysCallError as err:
+			debug(f'Failed to remove {names}: {err}')
+
+	return order
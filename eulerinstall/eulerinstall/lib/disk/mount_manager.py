@@ -0,0 +1,277 @@
+# Arch Linux install script (archinstall)
+# Copyright (C) 2021-2023 Arch Linux
+#
+# This file is part of archinstall.
+# This file is licensed under the GNU General Public License version 3.
+# Refer to the `LICENSE` file for further details.
+
+# Modified for openEuler Installation by Liu Wang in 2025
+
+from __future__ import annotations
+
+import ctypes
+import errno
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import cache
+from pathlib import Path
+
+from ..exceptions import DiskError, SysCallError
+from ..general import SysCommand
+from ..output import debug, info
+from .mountinfo import MountInfo, read_mountinfo
+
+# flags of mount(2), see <sys/mount.h>
+_MS_FLAGS = {
+	'ro': 0x1,
+	'nosuid': 0x2,
+	'nodev': 0x4,
+	'noexec': 0x8,
+	'sync': 0x10,
+	'dirsync': 0x80,
+	'noatime': 0x400,
+	'nodiratime': 0x800,
+	'silent': 0x8000,
+	'relatime': 0x200000,
+	'strictatime': 0x1000000,
+	'lazytime': 0x2000000,
+}
+
+# the defaults of mount(2), nothing has to be set for them
+_DEFAULT_OPTIONS = {'defaults', 'rw', 'suid', 'dev', 'exec', 'async', 'atime', 'diratime', 'loud'}
+
+# only interpreted by mount(8) and fstab, the kernel rejects them
+_USERSPACE_OPTIONS = {'auto', 'noauto', 'nofail', 'user', 'nouser', 'users', 'owner', 'group', '_netdev'}
+
+_MNT_DETACH = 0x2
+
+_MAX_WORKERS = 8
+
+
+@dataclass
+class MountRequest:
+	source: Path
+	target: Path
+	# kernel filesystem type, mount(8) probes the device if it is not given or unknown
+	fs_type: str | None = None
+	options: list[str] = field(default_factory=list)
+
+
+def split_options(options: list[str]) -> tuple[int, str]:
+	"""mount(8) options as mount(2) flags and the data string passed to the filesystem"""
+	flags = 0
+	data: list[str] = []
+
+	for option in options:
+		if option in _MS_FLAGS:
+			flags |= _MS_FLAGS[option]
+		elif option in _DEFAULT_OPTIONS or option in _USERSPACE_OPTIONS or option.startswith(('x-', 'comment=')):
+			continue
+		else:
+			data.append(option)
+
+	return flags, ','.join(data)
+
+
+def mount_levels(requests: list[MountRequest]) -> list[list[MountRequest]]:
+	"""
+	Groups the requests so every mount comes after the mounts of its parent directories (and
+	earlier mounts on the same path), the mounts within a group are independent of each other
+	"""
+	levels: dict[int, int] = {}
+	by_depth = sorted(range(len(requests)), key=lambda idx: (len(requests[idx].target.parts), idx))
+
+	for idx in by_depth:
+		target = requests[idx].target
+		below = [
+			levels[other]
+			for other in levels
+			if requests[other].target in target.parents or requests[other].target == target
+		]
+		levels[idx] = max(below, default=-1) + 1
+
+	grouped: list[list[MountRequest]] = [[] for _ in range(max(levels.values(), default=-1) + 1)]
+
+	for idx, request in enumerate(requests):
+		grouped[levels[idx]].append(request)
+
+	return grouped
+
+
+def _same_device(source: str, dev_path: Path) -> bool:
+	return source == str(dev_path) or (source.startswith('/') and os.path.realpath(source) == os.path.realpath(dev_path))
+
+
+@cache
+def _libc() -> ctypes.CDLL | None:
+	try:
+		libc = ctypes.CDLL(None, use_errno=True)
+		libc.mount.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_ulong, ctypes.c_char_p]
+		libc.umount2.argtypes = [ctypes.c_char_p, ctypes.c_int]
+	except (OSError, AttributeError) as err:
+		debug(f'mount(2) not available, using mount(8): {err}')
+		return None
+
+	return libc
+
+
+class MountManager:
+	"""
+	Mounts through mount(2) and umount2(2) instead of a mount/umount process each, checks the
+	mount state in /proc/self/mountinfo and records its own mounts, so they can be taken down
+	in the exact reverse order
+	"""
+
+	def __init__(self, mountinfo: Path = Path('/proc/self/mountinfo')) -> None:
+		self._mountinfo = mountinfo
+		self._mounted: list[Path] = []
+		self._lock = threading.Lock()
+
+	@property
+	def mounted(self) -> list[Path]:
+		with self._lock:
+			return list(self._mounted)
+
+	def mounts(self) -> list[MountInfo]:
+		return read_mountinfo(self._mountinfo)
+
+	def is_mounted(self, source: Path, target: Path, mounts: list[MountInfo] | None = None) -> bool:
+		return any(entry.mountpoint == target and _same_device(entry.source, source) for entry in mounts or self.mounts())
+
+	def mount(
+		self,
+		source: Path,
+		target: Path,
+		fs_type: str | None = None,
+		options: list[str] = [],
+		mounts: list[MountInfo] | None = None,
+	) -> None:
+		target.mkdir(parents=True, exist_ok=True)
+
+		if self.is_mounted(source, target, mounts):
+			info(f'Device already mounted at {target}')
+			return
+
+		debug(f'Mounting {source} at {target}: type {fs_type}, options {options}')
+
+		if fs_type is None or not self._mount_syscall(source, target, fs_type, options):
+			self._mount_command(source, target, options)
+
+		with self._lock:
+			self._mounted.append(target)
+
+	def mount_all(self, requests: list[MountRequest]) -> None:
+		"""
+		Mounts parents before their children and the siblings of each level concurrently. If a
+		mount fails, everything mounted by this call is unmounted again.
+		"""
+		mounts = self.mounts()
+		mounted_before = len(self.mounted)
+
+		def mount(request: MountRequest) -> None:
+			self.mount(request.source, request.target, request.fs_type, request.options, mounts)
+
+		try:
+			for level in mount_levels(requests):
+				with ThreadPoolExecutor(max_workers=min(len(level), _MAX_WORKERS), thread_name_prefix='mount') as executor:
+					# list() raises the first error once all mounts of the level are done
+					list(executor.map(mount, level))
+		except (DiskError, OSError):
+			self._umount_recorded(mounted_before)
+			raise
+
+	def umount(self, target: Path, lazy: bool = False) -> bool:
+		"""False if nothing was mounted at target"""
+		libc = _libc()
+
+		if libc is None:
+			try:
+				SysCommand(['umount', *(['-l'] if lazy else []), str(target)])
+			except SysCallError as err:
+				if 'not mounted' not in str(err) and 'not found' not in str(err):
+					raise DiskError(f'Could not unmount {target}: {err}')
+				return False
+		elif libc.umount2(os.fsencode(target), _MNT_DETACH if lazy else 0) != 0:
+			code = ctypes.get_errno()
+
+			# EINVAL: not a mountpoint, ENOENT: gone with a lazily unmounted parent
+			if code in (errno.EINVAL, errno.ENOENT):
+				debug(f'{target} is not mounted, skipping unmount')
+				return False
+
+			raise DiskError(f'Could not unmount {target}: {os.strerror(code)}')
+
+		with self._lock:
+			if target in self._mounted:
+				# the last mount on the path is the one which was removed
+				del self._mounted[len(self._mounted) - 1 - self._mounted[::-1].index(target)]
+
+		return True
+
+	def umount_all(self) -> None:
+		"""Unmounts everything mounted by the manager, in reverse order"""
+		self._umount_recorded(0)
+
+	def umount_device(self, path: Path, recursive: bool = False) -> None:
+		"""
+		Lazily unmounts all mounts of a device (or the mount at a path), deepest first. With
+		recursive the mounts nested below them are unmounted as well.
+		"""
+		mounts = self.mounts()
+		targets = {entry.mountpoint for entry in mounts if entry.mountpoint == path or _same_device(entry.source, path)}
+
+		if recursive:
+			targets |= {entry.mountpoint for entry in mounts if any(target in entry.mountpoint.parents for target in targets)}
+
+		if not targets:
+			return
+
+		debug(f'{path} is currently mounted at: {[str(target) for target in targets]}')
+
+		for target in sorted(targets, key=lambda target: len(target.parts), reverse=True):
+			debug(f'Unmounting mountpoint: {target}')
+			self.umount(target, lazy=True)
+
+	def _mount_syscall(self, source: Path, target: Path, fs_type: str, options: list[str]) -> bool:
+		"""False if mount(8) has to be used instead, e.g. the type is not a kernel filesystem name"""
+		if (libc := _libc()) is None:
+			return False
+
+		flags, data = split_options(options)
+
+		if libc.mount(os.fsencode(source), os.fsencode(target), fs_type.encode(), flags, data.encode() or None) == 0:
+			return True
+
+		code = ctypes.get_errno()
+
+		if code == errno.ENODEV:
+			debug(f'Kernel does not know filesystem type {fs_type}, using mount(8)')
+			return False
+
+		raise DiskError(f'Could not mount {source} at {target}: {os.strerror(code)}')
+
+	def _mount_command(self, source: Path, target: Path, options: list[str]) -> None:
+		# without a type, mount(8) probes the device itself
+		cmd = ['mount']
+
+		if options:
+			cmd.extend(('-o', ','.join(options)))
+
+		cmd.extend((str(source), str(target)))
+
+		try:
+			SysCommand(cmd)
+		except SysCallError as err:
+			raise DiskError(f'Could not mount {source}: {" ".join(cmd)}\n{err.message}')
+
+	def _umount_recorded(self, keep: int) -> None:
+		for target in reversed(self.mounted[keep:]):
+			try:
+				self.umount(target)
+			except DiskError as err:
+				debug(f'Unable to unmount {target}: {err}')
+
+
+mount_manager = MountManager()
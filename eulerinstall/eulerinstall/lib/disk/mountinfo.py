@@ -0,0 +1,122 @@
+# Arch Linux install script (archinstall)
+# Copyright (C) 2021-2023 Arch Linux
+#
+# This file is part of archinstall.
+# This file is licensed under the GNU General Public License version 3.
+# Refer to the `LICENSE` file for further details.
+
+# Modified for openEuler Installation by Liu Wang in 2025
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+_ESCAPE_RE = re.compile(r'\\([0-7]{3})')
+
+# Kernel API and in-memory filesystems, systemd mounts them at boot and the kernel labels them
+API_FSTYPES = {
+	'autofs',
+	'binfmt_misc',
+	'bpf',
+	'cgroup',
+	'cgroup2',
+	'configfs',
+	'debugfs',
+	'devpts',
+	'devtmpfs',
+	'efivarfs',
+	'fusectl',
+	'hugetlbfs',
+	'mqueue',
+	'proc',
+	'pstore',
+	'securityfs',
+	'selinuxfs',
+	'sysfs',
+	'tmpfs',
+	'tracefs',
+}
+
+
+def unescape(value: str) -> str:
+	"""The kernel escapes space, tab, newline and backslash as octal in the mount tables"""
+	return _ESCAPE_RE.sub(lambda match: chr(int(match.group(1), 8)), value)
+
+
+@dataclass(frozen=True)
+class MountInfo:
+	"""One line of /proc/self/mountinfo, see proc(5)"""
+
+	mount_id: int
+	parent_id: int
+	# major:minor of the mounted filesystem, equal for bind mounts of the same filesystem
+	dev: str
+	# directory of the filesystem which is mounted, e.g. the subvolume or the source of a bind mount
+	root: str
+	mountpoint: Path
+	# per mount options, e.g. rw,relatime
+	options: list[str]
+	fs_type: str
+	source: str
+	# options of the filesystem itself, e.g. subvol=/@home
+	super_options: list[str]
+
+	def super_option(self, name: str) -> str | None:
+		for option in self.super_options:
+			key, _, value = option.partition('=')
+			if key == name:
+				return value
+		return None
+
+
+def parse_mountinfo(content: str) -> list[MountInfo]:
+	entries: list[MountInfo] = []
+
+	for line in content.splitlines():
+		fields = line.split()
+
+		try:
+			# a variable number of optional fields ends with a single '-'
+			separator = fields.index('-', 6)
+		except ValueError:
+			continue
+
+		if len(fields) < separator + 4:
+			continue
+
+		entries.append(
+			MountInfo(
+				mount_id=int(fields[0]),
+				parent_id=int(fields[1]),
+				dev=fields[2],
+				root=unescape(fields[3]),
+				mountpoint=Path(unescape(fields[4])),
+				options=fields[5].split(','),
+				fs_type=fields[separator + 1],
+				source=unescape(fields[separator + 2]),
+				super_options=fields[separator + 3].split(','),
+			)
+		)
+
+	return entries
+
+
+def read_mountinfo(path: Path = Path('/proc/self/mountinfo')) -> list[MountInfo]:
+	return parse_mountinfo(path.read_text())
+
+
+def mounts_below(entries: list[MountInfo], target: Path) -> list[MountInfo]:
+	"""
+	Mounts at or below target which are visible, i.e. not hidden by a later mount on the
+	same path, in mount order so parents come before the mounts nested in them.
+	"""
+	visible: dict[Path, MountInfo] = {}
+
+	for entry in entries:
+		if entry.mountpoint == target or target in entry.mountpoint.parents:
+			visible.pop(entry.mountpoint, None)
+			visible[entry.mountpoint] = entry
+
+	return list(visible.values())
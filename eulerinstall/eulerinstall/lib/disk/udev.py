@@ -0,0 +1,143 @@
+# Arch Linux install script (archinstall)
+# Copyright (C) 2021-2023 Arch Linux
+#
+# This file is part of archinstall.
+# This file is licensed under the GNU General Public License version 3.
+# Refer to the `LICENSE` file for further details.
+
+# Modified for openEuler Installation by Liu Wang in 2025
+
+from __future__ import annotations
+
+import os
+import select
+import socket
+import stat
+import time
+from pathlib import Path
+
+from ..output import debug
+from .holders import kernel_name, partitions_of
+
+_SYS_BLOCK = Path('/sys/class/block')
+
+_NETLINK_KOBJECT_UEVENT = 15
+_KERNEL_EVENTS_GROUP = 1
+
+# sysfs reports sizes in 512 byte units independent of the logical sector size
+_SYSFS_SECTOR_SIZE = 512
+
+# events are only a wakeup, the state is checked again at least this often
+_EVENT_POLL_INTERVAL = 0.5
+_POLL_INTERVAL = 0.05
+
+
+def _uevent_socket() -> socket.socket | None:
+	"""Netlink socket receiving the kernel block device events, None where netlink is not available"""
+	try:
+		sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW | socket.SOCK_NONBLOCK | socket.SOCK_CLOEXEC, _NETLINK_KOBJECT_UEVENT)
+	except (AttributeError, OSError) as err:
+		debug(f'Kernel uevents not available, polling sysfs instead: {err}')
+		return None
+
+	try:
+		sock.bind((0, _KERNEL_EVENTS_GROUP))
+	except OSError as err:
+		debug(f'Unable to subscribe to kernel uevents, polling sysfs instead: {err}')
+		sock.close()
+		return None
+
+	return sock
+
+
+def _drain(sock: socket.socket) -> None:
+	try:
+		while sock.recv(8192):
+			pass
+	except OSError:
+		# BlockingIOError once all queued events are read, ENOBUFS if events were dropped
+		pass
+
+
+def _size(name: str, sys_block: Path) -> int | None:
+	try:
+		return int((sys_block / name / 'size').read_text()) * _SYSFS_SECTOR_SIZE
+	except (OSError, ValueError):
+		return None
+
+
+def _is_block_device(path: Path) -> bool:
+	try:
+		return stat.S_ISBLK(os.stat(path).st_mode)
+	except OSError:
+		return False
+
+
+def partitions_ready(
+	disk: str,
+	expected: dict[str, int | None],
+	sys_block: Path = _SYS_BLOCK,
+	dev: Path = Path('/dev'),
+) -> bool:
+	"""
+	True if the kernel knows exactly the expected partitions of the disk (kernel name to size
+	in bytes, None to skip the size) and their device nodes exist
+	"""
+	if not (sys_block / disk).exists():
+		return False
+
+	if set(partitions_of(disk, sys_block)) != set(expected):
+		return False
+
+	for name, size in expected.items():
+		if (size is not None and _size(name, sys_block) != size) or not _is_block_device(dev / name):
+			return False
+
+	return True
+
+
+def wait_for_partitions(
+	dev_path: Path,
+	expected: dict[Path, int | None],
+	timeout: float = 10.0,
+	sys_block: Path = _SYS_BLOCK,
+	dev: Path = Path('/dev'),
+) -> bool:
+	"""
+	Waits until the partitions of a disk are the expected ones (device path to size in bytes),
+	e.g. after a new partition table was committed. Wakes up on every kernel block event and
+	falls back to polling sysfs. Returns False on timeout.
+	"""
+	disk = kernel_name(dev_path)
+	names = {kernel_name(path): size for path, size in expected.items()}
+
+	if not (sys_block / disk).exists():
+		debug(f'{dev_path} is not listed in {sys_block}, unable to wait for its partitions')
+		return False
+
+	start = time.monotonic()
+	deadline = start + timeout
+
+	# subscribed before the first check, an event between check and wait is not lost
+	sock = _uevent_socket()
+
+	try:
+		while True:
+			if partitions_ready(disk, names, sys_block, dev):
+				debug(f'Partitions of {dev_path} ready after {time.monotonic() - start:.2f}s')
+				return True
+
+			remaining = deadline - time.monotonic()
+			if remaining <= 0:
+				debug(f'Partitions of {dev_path} not ready after {timeout}s, expected {names}')
+				return False
+
+			if sock is not None:
+				readable, _, _ = select.select([sock], [], [], min(remaining, _EVENT_POLL_INTERVAL))
+				if readable:
+					_drain(sock)
+			else:
+				time.sleep(min(remaining, _POLL_INTERVAL))
+	finally:
+		if sock is not None:
+			sock.close()
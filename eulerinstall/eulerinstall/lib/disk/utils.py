@@ -7,15 +7,25 @@
 
 # Modified for openEuler Installation by Liu Wang in 2025
 
+import hashlib
+import math
+import os
+import threading
+import time
+from collections.abc import Callable
 from pathlib import Path
+from typing import TypeVar
 
 from pydantic import BaseModel
 
+from eulerinstall.lib.disk.mount_manager import mount_manager
 from eulerinstall.lib.exceptions import DiskError, SysCallError
 from eulerinstall.lib.general import SysCommand
 from eulerinstall.lib.models.device import LsblkInfo
 from eulerinstall.lib.output import debug, warn
 
+_T = TypeVar('_T')
+
 
 class LsblkOutput(BaseModel):
 	blockdevices: list[LsblkInfo]
@@ -54,11 +64,129 @@ def _fetch_lsblk_info(
 	return LsblkOutput.model_validate_json(output)
 
 
+class LsblkSnapshot:
+	"""
+	A single lsblk run of the whole system, indexed for direct lookups.
+	Devices show up more than once in the lsblk tree (e.g. a LV spanning several PVs),
+	the first occurrence is kept.
+	"""
+
+	def __init__(self, output: LsblkOutput):
+		self.output = output
+		self.entries: list[LsblkInfo] = []
+		self.by_path: dict[Path, LsblkInfo] = {}
+		# kernel names (sda2, dm-0) as referenced by pkname
+		self.by_kname: dict[str, LsblkInfo] = {}
+		self.by_mountpoint: dict[Path, list[LsblkInfo]] = {}
+		self.by_uuid: dict[str, LsblkInfo] = {}
+		self.by_partuuid: dict[str, LsblkInfo] = {}
+		self.by_parent: dict[str, list[LsblkInfo]] = {}
+
+		self._index(output.blockdevices)
+
+	def _index(self, infos: list[LsblkInfo]) -> None:
+		for entry in infos:
+			self.entries.append(entry)
+
+			if entry.path not in self.by_path:
+				self.by_path[entry.path] = entry
+
+				# /dev/mapper/* and /dev/disk/by-* are symlinks to the kernel name
+				real_path = Path(os.path.realpath(entry.path))
+				self.by_path.setdefault(real_path, entry)
+				self.by_kname.setdefault(real_path.name, entry)
+
+				for mountpoint in entry.mountpoints:
+					self.by_mountpoint.setdefault(mountpoint, []).append(entry)
+
+				if entry.uuid:
+					self.by_uuid.setdefault(entry.uuid, entry)
+
+				if entry.partuuid:
+					self.by_partuuid.setdefault(entry.partuuid, entry)
+
+				if entry.pkname:
+					self.by_parent.setdefault(entry.pkname, []).append(entry)
+
+			self._index(entry.children)
+
+	def find(self, dev_path: Path | str) -> LsblkInfo | None:
+		dev_path = Path(dev_path)
+
+		if (entry := self.by_path.get(dev_path)) is not None:
+			return entry
+
+		return self.by_path.get(Path(os.path.realpath(dev_path)))
+
+
+class BlockTopology:
+	"""
+	Caches the lsblk output of the system so that repeated lookups don't spawn
+	a new lsblk process each time.
+
+	The snapshot is dropped explicitly by the device handler whenever it changes the
+	layout (partitioning, formatting, mounting, udev settle) and otherwise invalidates
+	itself when the mount table, the set of block devices or the udev database changed.
+	"""
+
+	def __init__(self) -> None:
+		self._lock = threading.Lock()
+		self._snapshot: LsblkSnapshot | None = None
+		self._fingerprint: tuple[object, ...] | None = None
+
+	@staticmethod
+	def _current_fingerprint() -> tuple[object, ...]:
+		try:
+			mountinfo = hashlib.sha1(Path('/proc/self/mountinfo').read_bytes()).hexdigest()
+		except OSError:
+			mountinfo = None
+
+		try:
+			block_devices = tuple(sorted(os.listdir('/sys/class/block')))
+		except OSError:
+			block_devices = None
+
+		try:
+			# udev writes its database entries by renaming a temporary file
+			udev_db = os.stat('/run/udev/data').st_mtime_ns
+		except OSError:
+			udev_db = None
+
+		return mountinfo, block_devices, udev_db
+
+	def invalidate(self) -> None:
+		with self._lock:
+			self._snapshot = None
+			self._fingerprint = None
+
+	def snapshot(self) -> LsblkSnapshot:
+		with self._lock:
+			fingerprint = self._current_fingerprint()
+
+			if self._snapshot is None or fingerprint != self._fingerprint:
+				self._snapshot = LsblkSnapshot(_fetch_lsblk_info())
+				self._fingerprint = fingerprint
+
+			return self._snapshot
+
+
+block_topology = BlockTopology()
+
+
+def invalidate_lsblk_cache() -> None:
+	block_topology.invalidate()
+
+
 def get_lsblk_info(
 	dev_path: Path | str,
 	reverse: bool = False,
 	full_dev_path: bool = False,
 ) -> LsblkInfo:
+	if not reverse and not full_dev_path:
+		if lsblk_info := block_topology.snapshot().find(dev_path):
+			return lsblk_info
+
+	# not a known block device path (or a special output format), ask lsblk directly
 	infos = _fetch_lsblk_info(dev_path, reverse=reverse, full_dev_path=full_dev_path)
 
 	if infos.blockdevices:
@@ -68,11 +196,20 @@ def get_lsblk_info(
 
 
 def get_all_lsblk_info() -> list[LsblkInfo]:
-	return _fetch_lsblk_info().blockdevices
+	return block_topology.snapshot().output.blockdevices
 
 
 def get_lsblk_output() -> LsblkOutput:
-	return _fetch_lsblk_info()
+	return block_topology.snapshot().output
+
+
+def get_lsblk_parent(dev_path: Path | str) -> LsblkInfo | None:
+	snapshot = block_topology.snapshot()
+
+	if (lsblk_info := snapshot.find(dev_path)) and lsblk_info.pkname:
+		return snapshot.by_kname.get(lsblk_info.pkname)
+
+	return None
 
 
 def find_lsblk_info(
@@ -90,24 +227,91 @@ def find_lsblk_info(
 
 
 def get_lsblk_by_mountpoint(mountpoint: Path, as_prefix: bool = False) -> list[LsblkInfo]:
-	def _check(infos: list[LsblkInfo]) -> list[LsblkInfo]:
-		devices = []
-		for entry in infos:
-			if as_prefix:
-				matches = [m for m in entry.mountpoints if str(m).startswith(str(mountpoint))]
-				if matches:
-					devices += [entry]
-			elif mountpoint in entry.mountpoints:
-				devices += [entry]
+	snapshot = block_topology.snapshot()
+
+	if not as_prefix:
+		return list(snapshot.by_mountpoint.get(mountpoint, []))
+
+	devices = []
+	for entry in snapshot.entries:
+		if any(str(m).startswith(str(mountpoint)) for m in entry.mountpoints):
+			devices.append(entry)
+
+	return devices
+
+
+def get_kernel_names(dev_path: Path) -> set[str]:
+	"""Kernel names (sda, sda1, dm-0) of a device and everything stacked on top of it"""
+	names: set[str] = set()
+	pending = [get_lsblk_info(dev_path)]
+
+	while pending:
+		entry = pending.pop()
+		names.add(Path(os.path.realpath(entry.path)).name)
+		pending += entry.children
+
+	return names
+
 
-			if len(entry.children) > 0:
-				if len(match := _check(entry.children)) > 0:
-					devices += match
+def restrict_proc_partitions(content: str, names: set[str]) -> str:
+	"""Content of /proc/partitions reduced to the header and the given kernel names"""
+	lines = []
 
-		return devices
+	for line in content.splitlines():
+		fields = line.split()
 
-	all_info = get_all_lsblk_info()
-	return _check(all_info)
+		if len(fields) < 4 or fields[0] == 'major' or fields[3] in names:
+			lines.append(line)
+
+	return '\n'.join(lines) + '\n'
+
+
+def poll_until(
+	check: Callable[[], _T | None],
+	timeout: float,
+	what: str,
+	initial_delay: float = 0.05,
+	max_delay: float = 1.0,
+) -> _T:
+	"""
+	Calls check until it returns a value, the pause between the attempts doubles up to
+	max_delay. Raises DiskError once the timeout passed.
+	"""
+	deadline = time.monotonic() + timeout
+	delay = initial_delay
+	attempts = 0
+
+	while True:
+		attempts += 1
+
+		if (result := check()) is not None:
+			return result
+
+		remaining = deadline - time.monotonic()
+		if remaining <= 0:
+			raise DiskError(f'{what} not ready after {timeout}s ({attempts} attempts)')
+
+		time.sleep(min(delay, remaining))
+		delay = min(delay * 2, max_delay)
+
+
+def plan_lv_extents(lengths: list[int], extent_size: int, free_extents: int) -> list[int]:
+	"""
+	Number of extents of each volume of a VG (lengths in bytes). Volumes are rounded up to
+	full extents like lvcreate -L does, and the largest volume takes up the difference to
+	the free extents, as the usable size of a VG is smaller than its PVs due to the metadata.
+	"""
+	if not lengths:
+		return []
+
+	extents = [math.ceil(length / extent_size) for length in lengths]
+	largest = max(range(len(lengths)), key=lambda idx: lengths[idx])
+	extents[largest] += free_extents - sum(extents)
+
+	if extents[largest] <= 0:
+		raise DiskError(f'Volumes of {sum(lengths)} bytes do not fit into {free_extents} extents of {extent_size} bytes')
+
+	return extents
 
 
 def disk_layouts() -> str:
@@ -121,27 +325,7 @@ def disk_layouts() -> str:
 
 
 def umount(mountpoint: Path, recursive: bool = False) -> None:
-	lsblk_info = get_lsblk_info(mountpoint)
-
-	if not lsblk_info.mountpoints:
-		return
+	"""Lazily unmounts a device from all its mountpoints (or the mount at a path), read from the mount table"""
+	mount_manager.umount_device(mountpoint, recursive)
 
-	debug(f'Partition {mountpoint} is currently mounted at: {[str(m) for m in lsblk_info.mountpoints]}')
-
-	cmd = ['umount']
-	cmd.append('-l')
-
-	if recursive:
-		cmd.append('-R')
-
-	for path in lsblk_info.mountpoints:
-		debug(f'Unmounting mountpoint: {path}')
-		try:
-			SysCommand(cmd + [str(path)])
-		except SysCallError as e:
-			# Ignore errors when trying to unmount a directory that is not mounted or not found
-			if 'not mounted' in str(e) or 'not found' in str(e) or 'no mount point specified' in str(e):
-				debug(f'Mountpoint {path} is not mounted or not found, skipping unmount')
-			else:
-				# Re-raise other errors
-				raise
+	invalidate_lsblk_cache()
@@ -36,6 +36,7 @@ else:
 
 from .exceptions import RequirementError, SysCallError
 from .output import debug, error, logger
+from .profiler import profiler
 
 # https://stackoverflow.com/a/43627833/929999
 _VT100_ESCAPE_REGEX = r'\x1B\[[?0-9;]*[a-zA-Z]'
@@ -114,6 +115,20 @@ class UNSAFE_JSON(json.JSONEncoder, json.JSONDecoder):
 
 
 class SysCommandWorker:
+	"""
+	Runs a command inside a pty and collects its output.
+
+	The pty and a pidfd of the child are watched by a single epoll object, so
+	``poll()`` wakes up as soon as there is output or the child exited instead of
+	polling on a timer. Output is appended to a ``bytearray`` in large reads.
+	"""
+
+	# bytes read from the pty per os.read()
+	_READ_SIZE = 65536
+	# once the child exited, wait this long for output still in flight from
+	# grandchildren holding on to the pty
+	_DRAIN_TIMEOUT = 0.05
+
 	def __init__(
 		self,
 		cmd: str | list[str],
@@ -138,10 +153,12 @@ class SysCommandWorker:
 		self.working_directory = working_directory
 
 		self.exit_code: int | None = None
-		self._trace_log = b''
+		self._trace_log = bytearray()
 		self._trace_log_pos = 0
 		self.poll_object = epoll()
 		self.child_fd: int | None = None
+		self._pidfd: int | None = None
+		self._pty_closed = False
 		self.started: float | None = None
 		self.ended: float | None = None
 		self.remove_vt100_escape_codes_from_lines: bool = remove_vt100_escape_codes_from_lines
@@ -162,7 +179,7 @@ class SysCommandWorker:
 
 	def __iter__(self, *args: str, **kwargs: dict[str, Any]) -> Iterator[bytes]:
 		last_line = self._trace_log.rfind(b'\n')
-		lines = filter(None, self._trace_log[self._trace_log_pos : last_line].splitlines())
+		lines = filter(None, bytes(self._trace_log[self._trace_log_pos : last_line]).splitlines())
 		for line in lines:
 			if self.remove_vt100_escape_codes_from_lines:
 				line = clear_vt100_escape_codes(line)
@@ -174,14 +191,14 @@ class SysCommandWorker:
 	@override
 	def __repr__(self) -> str:
 		self.make_sure_we_are_executing()
-		return str(self._trace_log)
+		return str(bytes(self._trace_log))
 
 	@override
 	def __str__(self) -> str:
 		try:
 			return self._trace_log.decode('utf-8')
 		except UnicodeDecodeError:
-			return str(self._trace_log)
+			return str(bytes(self._trace_log))
 
 	def __enter__(self) -> 'SysCommandWorker':
 		return self
@@ -190,11 +207,7 @@ class SysCommandWorker:
 		# b''.join(sys_command('sync')) # No need to, since the underlying fs() object will call sync.
 		# TODO: https://stackoverflow.com/questions/28157929/how-to-safely-handle-an-exception-inside-a-context-manager
 
-		if self.child_fd:
-			try:
-				os.close(self.child_fd)
-			except Exception:
-				pass
+		self._close()
 
 		if self.peek_output:
 			# To make sure any peaked output didn't leave us hanging
@@ -209,9 +222,21 @@ class SysCommandWorker:
 			raise SysCallError(
 				f'{self.cmd} exited with abnormal exit code [{self.exit_code}]: {str(self)[-500:]}',
 				self.exit_code,
-				worker_log=self._trace_log,
+				worker_log=bytes(self._trace_log),
 			)
 
+	def _close(self) -> None:
+		for fd in (self.child_fd, self._pidfd):
+			if fd:
+				try:
+					os.close(fd)
+				except OSError:
+					pass
+
+		self.child_fd = None
+		self._pidfd = None
+		self.poll_object.close()
+
 	def is_alive(self) -> bool:
 		self.poll()
 
@@ -220,6 +245,16 @@ class SysCommandWorker:
 
 		return False
 
+	def wait(self) -> int | None:
+		"""
+		Blocks until the command exited and raises SysCallError on a non-zero exit code
+		"""
+		while self.is_alive():
+			pass
+
+		self.__exit__(None, None, None)
+		return self.exit_code
+
 	def write(self, data: bytes, line_ending: bool = True) -> int:
 		assert isinstance(data, bytes)  # TODO: Maybe we can support str as well and encode it
 
@@ -259,38 +294,84 @@ class SysCommandWorker:
 
 		return True
 
-	def poll(self) -> None:
+	def _read_output(self) -> None:
+		if self.child_fd is None or self._pty_closed:
+			return
+
+		while True:
+			try:
+				output = os.read(self.child_fd, self._READ_SIZE)
+			except BlockingIOError:
+				return
+			except OSError:
+				# EIO: every holder of the pty slave is gone
+				output = b''
+
+			if not output:
+				self._pty_closed = True
+				self.poll_object.unregister(self.child_fd)
+				return
+
+			self.peak(output)
+			self._trace_log += output
+
+	def _reap(self, options: int) -> bool:
+		try:
+			pid, wait_status = os.waitpid(self.pid, options)
+		except ChildProcessError:
+			self.exit_code = 1
+			return True
+
+		if pid == 0:
+			return False
+
+		self.exit_code = os.waitstatus_to_exitcode(wait_status)
+		return True
+
+	def _finish(self) -> None:
+		if self._pidfd is not None:
+			self.poll_object.unregister(self._pidfd)
+			os.close(self._pidfd)
+			self._pidfd = None
+
+		while not self._pty_closed and self.poll_object.poll(self._DRAIN_TIMEOUT):
+			self._read_output()
+
+		if self.exit_code is None:
+			self._reap(0)
+
+		self.ended = time.time()
+
+	def poll(self, timeout: float | None = 0.1) -> None:
+		"""
+		Waits up to ``timeout`` seconds (forever for None) for output or the exit of the child
+		"""
 		self.make_sure_we_are_executing()
 
-		if self.child_fd:
-			got_output = False
-			for _fileno, _event in self.poll_object.poll(0.1):
-				try:
-					output = os.read(self.child_fd, 8192)
-					got_output = True
-					self.peak(output)
-					self._trace_log += output
-				except OSError:
-					self.ended = time.time()
-					break
+		if not self.child_fd or self.ended:
+			return
 
-			if self.ended or (not got_output and not _pid_exists(self.pid)):
-				self.ended = time.time()
-				try:
-					wait_status = os.waitpid(self.pid, 0)[1]
-					self.exit_code = os.waitstatus_to_exitcode(wait_status)
-				except ChildProcessError:
-					try:
-						wait_status = os.waitpid(self.child_fd, 0)[1]
-						self.exit_code = os.waitstatus_to_exitcode(wait_status)
-					except ChildProcessError:
-						self.exit_code = 1
+		# without a pidfd the exit is only noticed by checking the child below
+		if self._pidfd is None and timeout is None:
+			timeout = 0.1
+
+		events = dict(self.poll_object.poll(-1 if timeout is None else timeout))
+
+		if self.child_fd in events:
+			self._read_output()
+
+		if self._pidfd is not None:
+			exited = self._pidfd in events
+		else:
+			exited = self._reap(os.WNOHANG)
+
+		if exited:
+			self._finish()
 
 	def execute(self) -> bool:
 		import pty
 
-		if (old_dir := os.getcwd()) != self.working_directory:
-			os.chdir(str(self.working_directory))
+		_cmd_history(self.cmd)
 
 		# Note: If for any reason, we get a Python exception between here
 		#   and until os.close(), the traceback will get locked inside
@@ -301,21 +382,28 @@ class SysCommandWorker:
 
 		# https://stackoverflow.com/questions/4022600/python-pty-fork-how-does-it-work
 		if not self.pid:
-			_cmd_history(self.cmd)
-
+			# the working directory is only changed in the child, other threads
+			# of the installer keep their working directory
 			try:
+				os.chdir(str(self.working_directory))
 				os.execve(self.cmd[0], list(self.cmd), {**os.environ, **self.environment_vars})
-			except FileNotFoundError:
-				error(f'{self.cmd[0]} does not exist.')
-				self.exit_code = 1
-				return False
-		else:
-			# Only parent process moves back to the original working directory
-			os.chdir(old_dir)
+			except OSError as err:
+				os.write(2, f'{self.cmd[0]}: {err}\n'.encode())
+			finally:
+				os._exit(1)
 
 		self.started = time.time()
+
+		os.set_blocking(self.child_fd, False)
 		self.poll_object.register(self.child_fd, EPOLLIN | EPOLLHUP)
 
+		try:
+			self._pidfd = os.pidfd_open(self.pid)
+			self.poll_object.register(self._pidfd, EPOLLIN)
+		except (AttributeError, OSError):
+			# kernels older than 5.3, fall back to checking the child on every poll
+			self._pidfd = None
+
 		return True
 
 	def decode(self, encoding: str = 'UTF-8') -> str:
@@ -361,7 +449,7 @@ class SysCommand:
 			start = key.start or 0
 			end = key.stop or len(self.session._trace_log)
 
-			return self.session._trace_log[start:end]
+			return bytes(self.session._trace_log[start:end])
 		else:
 			raise ValueError("SysCommand() doesn't have key & value pairs, only slices, SysCommand('ls')[:10] as an example.")
 
@@ -388,7 +476,7 @@ class SysCommand:
 			self.session = session
 
 			while not self.session.ended:
-				self.session.poll()
+				self.session.poll(timeout=None)
 
 		if self.peek_output:
 			sys.stdout.write('\n')
@@ -411,9 +499,9 @@ class SysCommand:
 			raise ValueError('No session available')
 
 		if remove_cr:
-			return self.session._trace_log.replace(b'\r\n', b'\n')
+			return bytes(self.session._trace_log).replace(b'\r\n', b'\n')
 
-		return self.session._trace_log
+		return bytes(self.session._trace_log)
 
 	@property
 	def exit_code(self) -> int | None:
@@ -425,27 +513,23 @@ class SysCommand:
 	@property
 	def trace_log(self) -> bytes | None:
 		if self.session:
-			return self.session._trace_log
+			return bytes(self.session._trace_log)
 		return None
 
 
 def _append_log(file: str, content: str) -> None:
-	path = logger.directory / file
-
-	change_perm = not path.exists()
+	# written by the background log writer, the file is created readable for the owner and group
+	logger.append(file, content, mode=stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP)
 
-	try:
-		with path.open('a') as f:
-			f.write(content)
 
-		if change_perm:
-			path.chmod(stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP)
-	except (PermissionError, FileNotFoundError):
-		# If the file does not exist, ignore the error
-		pass
+def _cmd_history(cmd: list[str]) -> None:
+	# every external command is logged here right before it is spawned
+	profiler.count_child()
+	_log_cmd(cmd)
 
 
-def _cmd_history(cmd: list[str]) -> None:
+def _log_cmd(cmd: list[str]) -> None:
+	# also used for commands run by an already running process, e.g. a chroot session
 	content = f'{time.time()} {cmd}\n'
 	_append_log('cmd_history.txt', content)
 
@@ -468,9 +552,3 @@ def run(
 		check=True,
 	)
 
-
-def _pid_exists(pid: int) -> bool:
-	try:
-		return any(subprocess.check_output(['ps', '--no-headers', '-o', 'pid', '-p', str(pid)]).strip())
-	except subprocess.CalledProcessError:
-		return False
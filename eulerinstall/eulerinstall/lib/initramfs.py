@@ -0,0 +1,122 @@
+# Arch Linux install script (archinstall)
+# Copyright (C) 2021-2023 Arch Linux
+#
+# This file is part of archinstall.
+# This file is licensed under the GNU General Public License version 3.
+# Refer to the `LICENSE` file for further details.
+
+# Modified for openEuler Installation by Liu Wang in 2025
+
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from subprocess import CalledProcessError
+
+from .general import run
+from .output import debug, info, warn
+
+# dracut modules which are known to break on some hardware
+_OMITTED_MODULES = ['multipath']
+
+
+@dataclass
+class StorageStack:
+	"""What the initramfs needs to find and mount the root filesystem"""
+
+	# kernel filesystem drivers, e.g. ext4, xfs, vfat
+	filesystems: set[str] = field(default_factory=set)
+	# dracut modules, e.g. lvm, crypt, btrfs
+	modules: set[str] = field(default_factory=set)
+
+
+@dataclass
+class InitramfsResult:
+	kver: str
+	image: str
+	hostonly: bool
+	elapsed: float
+	size: int
+
+
+def installed_kernel_versions(target: Path) -> list[str]:
+	"""Kernel versions with modules in the target, directories without modules.dep are leftovers"""
+	modules_dir = target / 'lib/modules'
+
+	if not modules_dir.is_dir():
+		return []
+
+	return sorted(entry.name for entry in modules_dir.iterdir() if (entry / 'modules.dep').exists())
+
+
+def dracut_args(kver: str, stack: StorageStack | None) -> list[str]:
+	"""Arguments of a host-only build for the given storage stack, or of a generic build without a stack"""
+	args = ['--force']
+
+	for module in _OMITTED_MODULES:
+		args += ['--omit', module]
+
+	if stack is not None:
+		args.append('--hostonly')
+		if stack.filesystems:
+			args += ['--add-drivers', ' '.join(sorted(stack.filesystems))]
+		if stack.modules:
+			args += ['--add', ' '.join(sorted(stack.modules))]
+
+	return args + ['--kver', kver, f'/boot/initramfs-{kver}.img']
+
+
+class InitramfsBuilder:
+	"""
+	Builds the initramfs images of the given kernels with dracut in the target, one process
+	per kernel. A host-only build only contains the drivers of the storage stack of this
+	machine, if it fails the kernel gets a generic image instead.
+	"""
+
+	def __init__(self, target: Path, chroot_cmd: str = 'chroot', workers: int | None = None):
+		self.target = target
+		self.chroot_cmd = chroot_cmd
+		self.workers = workers if workers else max(1, os.cpu_count() or 1)
+
+	def _dracut(self, kver: str, stack: StorageStack | None) -> None:
+		run([self.chroot_cmd, str(self.target), 'dracut', *dracut_args(kver, stack)])
+
+	def _build(self, kver: str, stack: StorageStack | None) -> InitramfsResult:
+		start = time.monotonic()
+		hostonly = stack is not None
+
+		try:
+			self._dracut(kver, stack)
+		except CalledProcessError as err:
+			if not hostonly:
+				raise
+
+			output = err.stdout.decode(errors='backslashreplace').strip()[-500:] if err.stdout else ''
+			warn(f'Host-only initramfs for {kver} failed, building a generic one: {output}')
+
+			hostonly = False
+			self._dracut(kver, None)
+
+		image = f'/boot/initramfs-{kver}.img'
+		image_path = self.target / image.lstrip('/')
+		size = image_path.stat().st_size if image_path.exists() else 0
+
+		return InitramfsResult(kver, image, hostonly, time.monotonic() - start, size)
+
+	def build(self, kvers: list[str], stack: StorageStack | None) -> list[InitramfsResult]:
+		debug(f'Building initramfs for {", ".join(kvers)} with {stack}')
+		start = time.monotonic()
+
+		with ThreadPoolExecutor(max_workers=min(self.workers, max(len(kvers), 1)), thread_name_prefix='dracut') as executor:
+			results = list(executor.map(lambda kver: self._build(kver, stack), kvers))
+
+		for result in results:
+			mode = 'host-only' if result.hostonly else 'generic'
+			info(f'initramfs {result.image}: {mode}, {result.size / 1024 / 1024:.1f} MiB in {result.elapsed:.1f}s')
+
+		info(f'Built {len(results)} initramfs images in {time.monotonic() - start:.1f}s')
+
+		return results
@@ -16,16 +16,28 @@ import shutil
 import subprocess
 import textwrap
 import time
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from subprocess import CalledProcessError
 from types import TracebackType
 from typing import Any
 
+from eulerinstall.lib.disk.block_deploy import BlockDeployer, find_block_deploy_target
 from eulerinstall.lib.disk.device_handler import device_handler
 from eulerinstall.lib.disk.fido import Fido2
-from eulerinstall.lib.disk.utils import get_lsblk_by_mountpoint, get_lsblk_info
+from eulerinstall.lib.disk.fstab import generate_fstab, parse_swaps, resolve_uuids
+from eulerinstall.lib.disk.mount_manager import MountRequest, mount_manager
+from eulerinstall.lib.disk.mountinfo import mounts_below, read_mountinfo
+from eulerinstall.lib.disk.utils import (
+	get_kernel_names,
+	get_lsblk_by_mountpoint,
+	get_lsblk_parent,
+	invalidate_lsblk_cache,
+	restrict_proc_partitions,
+)
 from eulerinstall.lib.models.device import (
+	DeployMode,
 	DiskEncryption,
 	DiskLayoutConfiguration,
 	EncryptionType,
@@ -43,11 +55,13 @@ from eulerinstall.lib.translationhandler import tr
 from eulerinstall.tui.curses_menu import Tui
 
 from .args import arch_config_handler
+from .chroot import ChrootResult, ChrootSession
 from .exceptions import DiskError, HardwareIncompatibilityError, RequirementError, ServiceException, SysCallError
 from .general import SysCommand, run
 from .hardware import SysInfo
+from .initramfs import InitramfsBuilder, StorageStack, installed_kernel_versions
 from .locale.utils import verify_keyboard_layout, verify_x11_keyboard_layout
-from .luks import Luks2
+from .luks import Luks2, luks_kdf
 from .models.bootloader import Bootloader
 from .models.locale import LocaleConfiguration
 from .models.mirrors import MirrorConfiguration
@@ -57,6 +71,10 @@ from .output import debug, error, info, log, logger, warn
 from .pacman import Pacman
 from .pacman.config import PacmanConfig
 from .plugins import plugins
+from .progress import progress
+from .profiler import profiler
+from .rootfs_copy import RootfsCopier
+from .selinux import SelinuxLabeler, get_context, supports_context, target_mounts
 from .storage import storage
 from .disk.utils import umount
 
@@ -98,6 +116,18 @@ class Installer:
 		self._disk_encryption = disk_config.disk_encryption or DiskEncryption(EncryptionType.NoEncryption)
 		self.target: Path = target
 
+		self._deploy_mode = disk_config.deploy_mode
+		# set once rootfs.img was written onto the root partition
+		self._block_deployed = False
+		# mountpoints in the target which kept the SELinux contexts of rootfs.img
+		self._selinux_preserved: list[Path] = []
+		# time the copy finished, files changed afterwards are relabeled on those mountpoints
+		self._rootfs_copied_at: float | None = None
+		# grub.cfg is generated once by write_grub_config(), requests only set the flag
+		self._grub_config_pending = False
+		# os-prober output, probed at most once per installation
+		self._os_prober_result: str | None = None
+
 		self.init_time = time.strftime('%Y-%m-%d_%H-%M-%S')
 		self.milliseconds = int(str(time.time()).split('.')[1])
 		self._helper_flags: dict[str, str | bool | None] = {
@@ -141,14 +171,22 @@ class Installer:
 		self._zram_enabled = False
 		self._disable_fstrim = False
 
+		# bind mounts for chroot are set up once, the session is started on first use
+		self._chroot_mounts_ready = False
+		self._chroot_session: ChrootSession | None = None
+
 		self.pacman = Pacman(self.target, arch_config_handler.args.silent)
 
 	def __enter__(self) -> 'Installer':
 		return self
 
 	def __exit__(self, exc_type: type[BaseException] | None, exc_value: BaseException | None, traceback: TracebackType | None) -> bool | None:
+		# the session keeps the target busy, it has to be gone before anything is unmounted
+		self.close_chroot_session()
+
 		if exc_type is not None:
 			error(str(exc_value))
+			progress.done(success=False)
 
 			self.sync_log_to_install_medium()
 
@@ -160,12 +198,17 @@ class Installer:
 			# Return None to propagate the exception
 			return None
 
+		# scripts which never call updategrub() still get their grub.cfg
+		self.write_grub_config()
+
 		self.sync()
 
 		if not (missing_steps := self.post_install_check()):
 			msg = f'Installation completed without any errors.\nLog files temporarily available at {logger.directory}.\nYou may reboot when ready.\n'
 			log(msg, fg='green')
+			progress.done(success=True)
 			self.sync_log_to_install_medium()
+			self._umount_layout()
 			return True
 		else:
 			warn('Some required steps were not successfully installed/configured before leaving the installer:')
@@ -174,11 +217,19 @@ class Installer:
 				warn(f' - {step}')
 
 			warn(f'Detailed error logs can be found at: {logger.directory}')
+			progress.done(success=False)
 			warn('Submit this zip file as an issue to https://github.com/archlinux/archinstall/issues')
 
 			self.sync_log_to_install_medium()
+			self._umount_layout()
 			return False
 
+	def _umount_layout(self) -> None:
+		"""按与挂载相反的顺序卸载 mount_ordered_layout 挂载的目标系统分区"""
+		debug(f'Unmounting the target layout: {[str(target) for target in reversed(mount_manager.mounted)]}')
+		mount_manager.umount_all()
+
+	@profiler.phase('Installer.sync')
 	def sync(self) -> None:
 		info(tr('Syncing the system...'))
 		SysCommand('sync')
@@ -220,7 +271,7 @@ class Installer:
 			info(tr('Skipping waiting for automatic time sync (this can cause issues if time is out of sync during installation)'))
 
 		# 根据系统类型等待不同的镜像服务
-		mirror_service = SystemType.get_mirror_service()
+		mirror_service = SystemType.host_profile().mirror_service
 		if mirror_service != 'unknown':
 			info(f'Waiting for automatic mirror selection ({mirror_service}) to complete.')
 			# 判断是否为 timer 类型服务
@@ -238,7 +289,7 @@ class Installer:
 		# 	time.sleep(1)
 
 		if not arch_config_handler.args.skip_wkd:
-			keyring_service = SystemType.get_keyring_service()
+			keyring_service = SystemType.host_profile().keyring_service
 			if keyring_service != 'unknown':
 				info(tr(f'Waiting for keyring sync ({keyring_service}) to complete.'))
 				# 如果 timer 没有启动过，直接跳过等待
@@ -273,35 +324,73 @@ class Installer:
 					f'Please resize it to at least 200MiB and re-run the installation.',
 				)
 
+	@profiler.phase('Installer.sanity_check')
 	def sanity_check(self) -> None:
 		# self._verify_boot_part()
 		self._verify_service_stop()
 
+	@profiler.phase('Installer.mount_ordered_layout')
+	@progress.phase('mount')
 	def mount_ordered_layout(self) -> None:
 		debug('Mounting ordered layout')
 
+		if self._deploy_mode == DeployMode.Block:
+			self._deploy_root_image()
+
 		luks_handlers: dict[Any, Luks2] = {}
+		requests: list[MountRequest] = []
 
 		match self._disk_encryption.encryption_type:
 			case EncryptionType.NoEncryption:
-				self._mount_lvm_layout()
+				requests += self._lvm_layout_mounts()
 			case EncryptionType.Luks:
 				luks_handlers = self._prepare_luks_partitions(self._disk_encryption.partitions)
 			case EncryptionType.LvmOnLuks:
 				luks_handlers = self._prepare_luks_partitions(self._disk_encryption.partitions)
 				self._import_lvm()
-				self._mount_lvm_layout(luks_handlers)
+				requests += self._lvm_layout_mounts(luks_handlers)
 			case EncryptionType.LuksOnLvm:
 				self._import_lvm()
 				luks_handlers = self._prepare_luks_lvm(self._disk_encryption.lvm_volumes)
-				self._mount_lvm_layout(luks_handlers)
+				requests += self._lvm_layout_mounts(luks_handlers)
+
+		# all regular partitions
+		requests += self._partition_layout_mounts(luks_handlers)
+
+		# 根目录先挂载，其余挂载点按目录层级依次挂载，同一层级的挂载并行执行
+		mount_manager.mount_all(requests)
+		invalidate_lsblk_cache()
+
+	def _separate_mountpoints(self) -> list[Path]:
+		"""除根分区以外所有分区的挂载点"""
+		return sorted(
+			part_mod.mountpoint
+			for mod in self._disk_config.device_modifications
+			for part_mod in mod.partitions
+			if part_mod.mountpoint and not part_mod.is_root() and not part_mod.is_delete()
+		)
+
+	@profiler.phase('Installer._deploy_root_image')
+	def _deploy_root_image(self) -> None:
+		"""块部署模式：挂载前将 rootfs.img 直接按块写入根分区，不满足条件时回退到逐文件复制"""
+		part_mod = find_block_deploy_target(self._disk_config)
+
+		if part_mod is not None:
+			self._mount_squashfs()
+			deployer = BlockDeployer(Path(self.ROOTFS_IMAGE_PATH), part_mod, self._separate_mountpoints())
 
-		# mount all regular partitions
-		self._mount_partition_layout(luks_handlers)
+			if deployer.supported():
+				deployer.deploy()
+				self._block_deployed = True
+				return
+
+		warn('块部署条件不满足，回退到逐文件复制')
 
-	def _mount_partition_layout(self, luks_handlers: dict[Any, Luks2]) -> None:
+	def _partition_layout_mounts(self, luks_handlers: dict[Any, Luks2]) -> list[MountRequest]:
 		debug('Mounting partition layout')
 
+		requests: list[MountRequest] = []
+
 		# do not mount any PVs part of the LVM configuration
 		pvs = []
 		if self._disk_config.lvm_config:
@@ -326,41 +415,50 @@ class Installer:
 
 			for part_mod in sorted_part_mods:
 				if luks_handler := luks_handlers.get(part_mod):
-					self._mount_luks_partition(part_mod, luks_handler)
+					requests += self._luks_partition_mounts(part_mod, luks_handler)
 				else:
-					self._mount_partition(part_mod)
+					requests += self._partition_mounts(part_mod)
 
-	def _mount_lvm_layout(self, luks_handlers: dict[Any, Luks2] = {}) -> None:
+		return requests
+
+	def _lvm_layout_mounts(self, luks_handlers: dict[Any, Luks2] = {}) -> list[MountRequest]:
 		lvm_config = self._disk_config.lvm_config
 
 		if not lvm_config:
 			debug('No lvm config defined to be mounted')
-			return
+			return []
 
 		debug('Mounting LVM layout')
 
+		requests: list[MountRequest] = []
+
 		for vg in lvm_config.vol_groups:
 			sorted_vol = sorted(vg.volumes, key=lambda x: x.mountpoint or Path('/'))
 
 			for vol in sorted_vol:
 				if luks_handler := luks_handlers.get(vol):
-					self._mount_luks_volume(vol, luks_handler)
+					requests += self._luks_volume_mounts(vol, luks_handler)
 				else:
-					self._mount_lvm_vol(vol)
+					requests += self._lvm_vol_mounts(vol)
+
+		return requests
+
+	def _unlock_luks_devices(self, devices: list[tuple[Path, str]]) -> list[Luks2]:
+		"""并行解锁相互独立的 LUKS 设备，并发数受内存和 CPU 限制"""
+		workers = luks_kdf.concurrency(self._disk_encryption.iter_time)
+
+		def unlock(device: tuple[Path, str]) -> Luks2:
+			return device_handler.unlock_luks2_dev(device[0], device[1], self._disk_encryption.encryption_password)
+
+		with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='luks-open') as executor:
+			return list(executor.map(unlock, devices))
 
 	def _prepare_luks_partitions(
 		self,
 		partitions: list[PartitionModification],
 	) -> dict[PartitionModification, Luks2]:
-		return {
-			part_mod: device_handler.unlock_luks2_dev(
-				part_mod.dev_path,
-				part_mod.mapper_name,
-				self._disk_encryption.encryption_password,
-			)
-			for part_mod in partitions
-			if part_mod.mapper_name and part_mod.dev_path
-		}
+		devices = {part_mod: (part_mod.safe_dev_path, name) for part_mod in partitions if (name := part_mod.mapper_name) and part_mod.dev_path}
+		return dict(zip(devices, self._unlock_luks_devices(list(devices.values()))))
 
 	def _import_lvm(self) -> None:
 		lvm_config = self._disk_config.lvm_config
@@ -379,72 +477,80 @@ class Installer:
 		self,
 		lvm_volumes: list[LvmVolume],
 	) -> dict[LvmVolume, Luks2]:
-		return {
-			vol: device_handler.unlock_luks2_dev(
-				vol.dev_path,
-				vol.mapper_name,
-				self._disk_encryption.encryption_password,
-			)
-			for vol in lvm_volumes
-			if vol.mapper_name and vol.dev_path
-		}
+		devices = {vol: (vol.safe_dev_path, name) for vol in lvm_volumes if (name := vol.mapper_name) and vol.dev_path}
+		return dict(zip(devices, self._unlock_luks_devices(list(devices.values()))))
 
-	def _mount_partition(self, part_mod: PartitionModification) -> None:
+	def _partition_mounts(self, part_mod: PartitionModification) -> list[MountRequest]:
 		if not part_mod.dev_path:
-			return
+			return []
 
 		# it would be none if it's btrfs as the subvolumes will have the mountpoints defined
 		if part_mod.mountpoint:
 			target = self.target / part_mod.relative_mountpoint
-			device_handler.mount(part_mod.dev_path, target, options=part_mod.mount_options)
+			return [MountRequest(part_mod.dev_path, target, self._mount_fs(part_mod.fs_type), part_mod.mount_options)]
 		elif part_mod.fs_type == FilesystemType.Btrfs:
-			self._mount_btrfs_subvol(
+			return self._btrfs_subvol_mounts(
 				part_mod.dev_path,
 				part_mod.btrfs_subvols,
 				part_mod.mount_options,
 			)
 		elif part_mod.is_swap():
+			# swap is not part of the mount tree, it is enabled right away
 			device_handler.swapon(part_mod.dev_path)
 
-	def _mount_lvm_vol(self, volume: LvmVolume) -> None:
+		return []
+
+	def _lvm_vol_mounts(self, volume: LvmVolume) -> list[MountRequest]:
 		if volume.fs_type != FilesystemType.Btrfs:
 			if volume.mountpoint and volume.dev_path:
 				target = self.target / volume.relative_mountpoint
-				device_handler.mount(volume.dev_path, target, options=volume.mount_options)
+				return [MountRequest(volume.dev_path, target, self._mount_fs(volume.fs_type), volume.mount_options)]
 
 		if volume.fs_type == FilesystemType.Btrfs and volume.dev_path:
-			self._mount_btrfs_subvol(volume.dev_path, volume.btrfs_subvols, volume.mount_options)
+			return self._btrfs_subvol_mounts(volume.dev_path, volume.btrfs_subvols, volume.mount_options)
+
+		return []
 
-	def _mount_luks_partition(self, part_mod: PartitionModification, luks_handler: Luks2) -> None:
+	def _luks_partition_mounts(self, part_mod: PartitionModification, luks_handler: Luks2) -> list[MountRequest]:
 		if not luks_handler.mapper_dev:
-			return None
+			return []
 
 		if part_mod.fs_type == FilesystemType.Btrfs and part_mod.btrfs_subvols:
-			self._mount_btrfs_subvol(luks_handler.mapper_dev, part_mod.btrfs_subvols, part_mod.mount_options)
+			return self._btrfs_subvol_mounts(luks_handler.mapper_dev, part_mod.btrfs_subvols, part_mod.mount_options)
 		elif part_mod.mountpoint:
 			target = self.target / part_mod.relative_mountpoint
-			device_handler.mount(luks_handler.mapper_dev, target, options=part_mod.mount_options)
+			return [MountRequest(luks_handler.mapper_dev, target, self._mount_fs(part_mod.fs_type), part_mod.mount_options)]
+
+		return []
 
-	def _mount_luks_volume(self, volume: LvmVolume, luks_handler: Luks2) -> None:
+	def _luks_volume_mounts(self, volume: LvmVolume, luks_handler: Luks2) -> list[MountRequest]:
 		if volume.fs_type != FilesystemType.Btrfs:
 			if volume.mountpoint and luks_handler.mapper_dev:
 				target = self.target / volume.relative_mountpoint
-				device_handler.mount(luks_handler.mapper_dev, target, options=volume.mount_options)
+				return [MountRequest(luks_handler.mapper_dev, target, self._mount_fs(volume.fs_type), volume.mount_options)]
 
 		if volume.fs_type == FilesystemType.Btrfs and luks_handler.mapper_dev:
-			self._mount_btrfs_subvol(luks_handler.mapper_dev, volume.btrfs_subvols, volume.mount_options)
+			return self._btrfs_subvol_mounts(luks_handler.mapper_dev, volume.btrfs_subvols, volume.mount_options)
 
-	def _mount_btrfs_subvol(
+		return []
+
+	def _btrfs_subvol_mounts(
 		self,
 		dev_path: Path,
 		subvolumes: list[SubvolumeModification],
 		mount_options: list[str] = [],
-	) -> None:
-		for subvol in sorted(subvolumes, key=lambda x: x.relative_mountpoint):
-			mountpoint = self.target / subvol.relative_mountpoint
-			options = mount_options + [f'subvol={subvol.name}']
-			device_handler.mount(dev_path, mountpoint, options=options)
+	) -> list[MountRequest]:
+		return [
+			MountRequest(dev_path, self.target / subvol.relative_mountpoint, 'btrfs', mount_options + [f'subvol={subvol.name}'])
+			for subvol in sorted(subvolumes, key=lambda x: x.relative_mountpoint)
+		]
+
+	@staticmethod
+	def _mount_fs(fs_type: FilesystemType | None) -> str | None:
+		"""内核文件系统类型，未知时由 mount 命令自行探测"""
+		return fs_type.fs_type_mount if fs_type else None
 
+	@profiler.phase('Installer.generate_key_files')
 	def generate_key_files(self) -> None:
 		match self._disk_encryption.encryption_type:
 			case EncryptionType.Luks:
@@ -504,6 +610,10 @@ class Installer:
 						)
 
 	def sync_log_to_install_medium(self) -> bool:
+		# the timing summary ends up in the install log as well
+		profiler.write_report()
+		logger.flush()
+
 		# Copy over the install log (if there is one) to the install medium if
 		# at least the base has been strapped in, otherwise we won't have a filesystem/structure to copy to.
 		if self._helper_flags.get('base-strapped', False) is True:
@@ -514,6 +624,9 @@ class Installer:
 
 			shutil.copy2(absolute_logfile, f'{self.target}/{absolute_logfile}')
 
+			if (timings := logger.directory / 'timings.json').exists():
+				shutil.copy2(timings, f'{self.target}/{timings}')
+
 		return True
 
 	def add_swapfile(self, size: str = '4G', enable_resume: bool = True, file: str = '/swapfile') -> None:
@@ -548,6 +661,7 @@ class Installer:
 	def post_install_check(self, *args: str, **kwargs: str) -> list[str]:
 		return [step for step, flag in self._helper_flags.items() if flag is False]
 
+	@profiler.phase('Installer.set_mirrors')
 	def set_mirrors(
 		self,
 		mirror_config: MirrorConfiguration,
@@ -591,6 +705,9 @@ class Installer:
 
 			content = mirrorlist_config.read_text()
 			mirrorlist_config.write_text(f'{custom_servers}\n\n{content}')
+
+	@profiler.phase('Installer.genfstab')
+	@progress.phase('fstab')
 	def genfstab(self, flags: str = '-pU') -> None:
 		fstab_path = self.target / 'etc' / 'fstab'
 		
@@ -600,51 +717,16 @@ class Installer:
 			fstab_path.unlink()
 			SysCommand(f'rm -f {fstab_path}')
 		
-		# Get all mounted devices
-		mounts = []
-		with open('/proc/mounts') as f:
-			for line in f:
-				device, mountpoint, fstype, options, _, _ = line.split()
-				if str(self.target) in mountpoint:
-					# Keep root mountpoint as '/' instead of empty string
-					rel_mountpoint = mountpoint.replace(str(self.target), '')
-					if rel_mountpoint == '':
-						rel_mountpoint = '/'
-					mounts.append((device, rel_mountpoint, fstype, options))
-		
-		# Generate fstab entries
-		fstab_entries = []
-		for device, mountpoint, fstype, options in mounts:
-			# Skip special filesystems
-			if fstype in ('proc', 'sysfs', 'devpts', 'tmpfs', 'devtmpfs'):
-				continue
-				
-			# Get UUID for the device
-			try:
-				lsblk_info = get_lsblk_info(Path(device))
-				uuid = lsblk_info.uuid
-				if not uuid:
-					raise ValueError(f'Unable to get UUID for {device}')
-				
-				# Format fstab entry
-				entry = f"UUID={uuid} {mountpoint} {fstype} {options} 0 0"
-				fstab_entries.append(entry)
-			except Exception as err:
-				warn(f'Skipping {device} in fstab: {err}')
-		
-		# Handle swap
-		with open('/proc/swaps') as f:
-			for line in f:
-				if line.startswith('/'):
-					swap_device = line.split()[0]
-					try:
-						lsblk_info = get_lsblk_info(Path(swap_device))
-						uuid = lsblk_info.uuid
-						if uuid:
-							fstab_entries.append(f"UUID={uuid} none swap sw 0 0")
-					except Exception as err:
-						warn(f'Skipping swap {swap_device} in fstab: {err}')
-		
+		# 一次读取挂载表和 /proc/swaps，所有设备的 UUID 一次性解析，不再为每个设备单独调用 lsblk
+		mounts = read_mountinfo()
+		swaps = parse_swaps(Path('/proc/swaps').read_text())
+		sources = {mount.source for mount in mounts_below(mounts, self.target)}
+		sources |= {path for path, swap_type in swaps if swap_type == 'partition'}
+
+		fstab_entries = [entry.line() for entry in generate_fstab(mounts, self.target, resolve_uuids(sources), swaps)]
+		# add_swapfile() 等登记的额外条目
+		fstab_entries += self._fstab_entries
+
 		# Write fstab file
 		with open(fstab_path, 'w') as f:
 			f.write("# /etc/fstab: static file system information.\n")
@@ -658,16 +740,15 @@ class Installer:
 			f.write("\n")
 			# Add tmpfs entry
 			f.write("tmpfs                     /tmp           tmpfs   defaults,noatime,mode=1777 0 0\n")
-			fstab_path = self.target / 'etc' / 'fstab'
 			info(f'Updating {fstab_path}')
 
-		
-
+	@profiler.phase('Installer.set_hostname')
 	def set_hostname(self, hostname: str) -> None:
 		hostname_path = self.target / 'etc/hostname'
 		hostname_path.parent.mkdir(parents=True, exist_ok=True)
 		hostname_path.write_text(hostname + '\n')
 
+	@profiler.phase('Installer.set_locale')
 	def set_locale(self, locale_config: LocaleConfiguration) -> bool:
 		from .system_detection import SystemType
 		system_type = SystemType.detect()
@@ -728,10 +809,12 @@ class Installer:
 		(self.target / 'etc/locale.conf').write_text(f'LANG={lang_value}\n')
 		return 
 
+	@profiler.phase('Installer.regenerate_initramfs')
+	@progress.phase('initramfs')
 	def regenerate_initramfs(self) -> None:
 		"""
 		在切根环境中重建initramfs和machine-id
-		使用dracut重新生成所有已安装内核的initramfs镜像
+		使用dracut为所选内核生成initramfs镜像（见 _build_initramfs）
 		并重新生成machine-id以确保系统唯一性
 		"""
 		info(f'正在重建initramfs和machine-id...')
@@ -742,13 +825,7 @@ class Installer:
 			self.arch_chroot('systemd-machine-id-setup')
 			info(f'machine-id重建完成')
 
-			# 使用dracut重新生成所有内核的initramfs
-			# --regenerate-all: 为所有已安装的内核重新生成initramfs
-			# --force: 强制覆盖已存在的initramfs文件
-			# --verbose: 显示详细输出
-			# --omit multipath: 排除multipath模块（避免某些硬件兼容性问题）
-			dracut_args = ['--regenerate-all', '--force', '--verbose', '--omit', 'multipath']
-			self.arch_chroot(f'dracut {" ".join(dracut_args)}')
+			self._build_initramfs()
 			info(f'initramfs重建完成')
 		except SysCallError as e:
 			error(f'重建initramfs或machine-id时出错: {e}')
@@ -757,6 +834,67 @@ class Installer:
 				log(e.worker_log.decode())
 			raise ServiceException(f'无法重建initramfs: {e}')
 		
+	def _initramfs_stack(self) -> StorageStack:
+		"""根据磁盘配置得到 initramfs 挂载根文件系统所需的文件系统驱动和 dracut 模块"""
+		stack = StorageStack()
+		fs_types = [
+			part_mod.fs_type
+			for mod in self._disk_config.device_modifications
+			for part_mod in mod.partitions
+			if part_mod.fs_type and not part_mod.is_delete()
+		]
+
+		if self._disk_config.lvm_config:
+			stack.modules.add('lvm')
+			fs_types += [vol.fs_type for vg in self._disk_config.lvm_config.vol_groups for vol in vg.volumes]
+
+		for fs_type in fs_types:
+			if fs_type not in (FilesystemType.Crypto_luks, FilesystemType.LinuxSwap):
+				stack.filesystems.add(fs_type.fs_type_mount)
+
+		if self._disk_encryption.encryption_type != EncryptionType.NoEncryption:
+			stack.modules.add('crypt')
+
+		if 'btrfs' in stack.filesystems:
+			stack.modules.add('btrfs')
+
+		return stack
+
+	def _selected_kernel_versions(self) -> list[str]:
+		"""self.kernels 中的内核包在目标系统中对应的内核版本，无法对应时返回所有已安装的内核版本"""
+		installed = installed_kernel_versions(self.target)
+		queries = [f"rpm -q --qf '%{{VERSION}}-%{{RELEASE}}.%{{ARCH}}\\n' {shlex.quote(kernel)}" for kernel in self.kernels]
+
+		selected: set[str] = set()
+		for result in self.chroot_batch(queries):
+			if result.exit_code == 0:
+				selected.update(result.decode().split())
+
+		return [kver for kver in installed if kver in selected] or installed
+
+	@profiler.phase('Installer._build_initramfs')
+	def _build_initramfs(self) -> None:
+		"""
+		按 --initramfs-mode 生成 initramfs
+		hostonly（默认）：只为所选内核构建，模块集合由本机的存储栈和文件系统决定，多个内核并行构建，
+		某个内核的 host-only 构建失败时为其改为构建通用镜像；
+		generic：与之前相同，为所有已安装的内核重新生成通用镜像。
+		不输出 dracut 的逐文件详细信息，只记录每个镜像的大小和耗时。
+		"""
+		kvers = self._selected_kernel_versions() if arch_config_handler.args.initramfs_mode == 'hostonly' else []
+
+		if not kvers:
+			# --omit multipath: 排除multipath模块（避免某些硬件兼容性问题）
+			self.arch_chroot('dracut --regenerate-all --force --omit multipath')
+			return
+
+		try:
+			InitramfsBuilder(self.target, self._prepare_chroot()).build(kvers, self._initramfs_stack())
+		except CalledProcessError as err:
+			raise SysCallError(f'dracut exited with abnormal exit code [{err.returncode}]', exit_code=err.returncode, worker_log=err.stdout or b'')
+
+	@profiler.phase('Installer.post_deal_devstation')
+	@progress.phase('finalize')
 	def post_deal_devstation(self) -> None:
 		"""
 		在切根环境中处理 devstation 相关清理工作
@@ -772,9 +910,6 @@ class Installer:
 		# 设置默认语言环境为中文
 		self._set_locale_default()
 
-		# 全系统 SELinux 重标（首次启动时自动执行）
-		self._relabel_selinux_full()
-
 		# 设置网络
 		self._set_network()
 
@@ -786,6 +921,9 @@ class Installer:
 
 		# 处理dns主机名解析问题
 		self._handle_dns_hostname_resolution()
+
+		# 全系统 SELinux 标记，放在最后以覆盖前面步骤新建的文件
+		self._relabel_selinux_full()
 		
 		info(f'devstation 相关清理完成')
 
@@ -923,11 +1061,10 @@ class Installer:
 
 			# 2. 禁用可能冲突的网络服务
 			info(f'禁用可能冲突的网络服务...')
-			for service in ['systemd-networkd.service', 'NetworkManager-wait-online.service']:
-				try:
-					self.arch_chroot(f'systemctl disable {service} 2>/dev/null || true')
-				except Exception:
-					pass
+			self.chroot_batch([
+				f'systemctl disable {service} 2>/dev/null || true'
+				for service in ['systemd-networkd.service', 'NetworkManager-wait-online.service']
+			])
 
 			# 3. 启用 NetworkManager 服务，确保开机自启
 			info(f'启用 NetworkManager 服务开机自启...')
@@ -1096,21 +1233,36 @@ class Installer:
 				continue
 		return count
 
+	@profiler.phase('Installer._relabel_selinux_full')
 	def _relabel_selinux_full(self) -> None:
 		"""
-		触发全系统 SELinux 标签重标
+		在安装时对目标系统执行全系统 SELinux 标记
+
+		复制时去除了 security.selinux 的挂载点没有 SELinux 标签，保留了镜像标签的挂载点上
+		只有安装过程中新建或替换的文件标签不对：主机未运行 SELinux 时它们没有标签，运行时
+		它们继承了父目录的标签（如 /etc/shadow 成为 etc_t）。本方法使用目标系统自身的策略和
+		file_contexts 离线执行 setfiles，按挂载点和子树拆分后并行处理，保留了标签的挂载点只
+		标记缺少标签或复制结束后有改动（ctime 更新）的文件，
+		FAT32 ESP 等不支持扩展属性的文件系统会被跳过，避免首次启动时的全盘重标。
+
+		离线标记无法完成时（安装介质缺少 setfiles、策略文件缺失或 setfiles 执行失败），
+		回退为在目标根目录创建 /.autorelabel 标志文件，由首次启动时的
+		selinux-autorelabel.service 执行 restorecon 全盘重标。
+		"""
+		labeler = SelinuxLabeler(self.target, preserved=self._selinux_preserved, changed_since=self._rootfs_copied_at)
 
-		由于 rsync 复制时跳过了 security.selinux 扩展属性（FAT32 等文件系统不支持），
-		安装后的文件系统 SELinux 标签可能不完整。本方法通过在目标根目录创建
-		/.autorelabel 标志文件，触发首次启动时由 selinux-autorelabel.service
-		自动对整个根文件系统执行 restorecon 全盘重标。
+		if not labeler.enabled():
+			info('目标系统未启用 SELinux，跳过标记')
+			return
+
+		info(f'正在离线执行全系统 SELinux 标记...')
+		try:
+			labeler.label()
+			return
+		except (RequirementError, CalledProcessError, OSError) as e:
+			output = e.stdout.decode(errors='backslashreplace').strip()[-500:] if isinstance(e, CalledProcessError) and e.stdout else ''
+			warn(f'离线 SELinux 标记失败，回退为首次启动时重标: {e} {output}')
 
-		这是 openEuler/RHEL 系发行版的标准做法：
-		- 在真实启动环境中运行，内核已加载完整 SELinux 策略
-		- 覆盖所有已挂载的文件系统（含 EFI 分区等）
-		- 重标完成后标志文件会被自动删除，仅执行一次
-		"""
-		info(f'正在配置全系统 SELinux 自动重标...')
 		try:
 			autorelabel_file = self.target / '.autorelabel'
 			autorelabel_file.touch()
@@ -1126,8 +1278,7 @@ class Installer:
 		# 卸载 rootfs 挂载点
 		info(f"卸载 rootfs 挂载点: {self.ROOTFS_MOUNT_DIR}")
 		try:
-			SysCommand(f'umount -l {self.ROOTFS_MOUNT_DIR}')
-			SysCommand(f'rm -rf {self.ROOTFS_MOUNT_DIR}')
+			self._umount_and_remove(self.ROOTFS_MOUNT_DIR)
 			info(f"成功卸载并删除 rootfs 挂载点")
 		except Exception as e:
 			error(f"卸载 rootfs 挂载点失败: {e}")
@@ -1135,14 +1286,23 @@ class Installer:
 		# 卸载 LiveOS 挂载点
 		info(f"卸载 LiveOS 挂载点: {self.LIVEOS_MOUNT_DIR}")
 		try:
-			SysCommand(f'umount -l {self.LIVEOS_MOUNT_DIR}')
-			SysCommand(f'rm -rf {self.LIVEOS_MOUNT_DIR}')
+			self._umount_and_remove(self.LIVEOS_MOUNT_DIR)
 			info(f"成功卸载并删除 LiveOS 挂载点")
 		except Exception as e:
 			error(f"卸载 LiveOS 挂载点失败: {e}")
 		
 		info("所有挂载点卸载完成")
 
+	@staticmethod
+	def _umount_and_remove(mount_dir: str) -> None:
+		"""卸载成功或目录本就不是挂载点时才删除目录，避免删除仍挂载的镜像内容"""
+		mount_manager.umount(Path(mount_dir), lazy=True)
+
+		if os.path.ismount(mount_dir):
+			raise DiskError(f'{mount_dir} 仍处于挂载状态，不删除该目录')
+
+		shutil.rmtree(mount_dir, ignore_errors=True)
+
 	def _set_locale_default(self) -> None:
 		"""
 		在切根环境中设置默认语言环境为中文 zh_CN.UTF-8
@@ -1225,14 +1385,13 @@ class Installer:
 				if packages:
 					info(tr(f'找到 {len(packages)} 个 heolleo 相关的包: {", ".join(packages)}'))
 					
-					# 逐个删除找到的包
-					for package in packages:
-						try:
-							info(f'正在删除包: {package}')
-							self.arch_chroot(f'rpm -e {package} --nodeps')
+					# 在同一个 chroot 会话中逐个删除找到的包
+					results = self.chroot_batch([f'rpm -e {package} --nodeps' for package in packages])
+					for package, result in zip(packages, results):
+						if result.exit_code == 0:
 							info(f'包 {package} 已删除')
-						except Exception as pkg_error:
-							warn(f'删除包 {package} 时出错: {pkg_error}')
+						else:
+							warn(f'删除包 {package} 时出错: {result.decode()}')
 					
 					info(f'所有 heolleo 相关的软件包已删除')
 				else:
@@ -1243,14 +1402,98 @@ class Installer:
 			warn(f'删除 heolleo 软件包时出错: {e}')
 			# 继续执行，不中断整个流程
 
+	@profiler.phase('Installer.updategrub')
+	@progress.phase('grub')
 	def updategrub(self) -> bool:
-		info(f'updtae grub.cfg start')
+		"""安装流程末尾的引导配置阶段：生成一次 grub.cfg 并复制到 EFI 目录"""
+		self._request_grub_config()
+		return self.write_grub_config()
+
+	def _request_grub_config(self) -> None:
+		"""记录需要重新生成 grub.cfg，实际生成推迟到 write_grub_config() 中统一执行一次"""
+		self._grub_config_pending = True
+
+	def _os_prober_enabled(self) -> bool:
+		"""目标系统的 /etc/default/grub 未禁用 os-prober 且已安装 os-prober"""
+		default_grub = self.target / 'etc/default/grub'
+
+		if default_grub.exists():
+			for line in default_grub.read_text().splitlines():
+				key, _, value = line.strip().partition('=')
+				if key == 'GRUB_DISABLE_OS_PROBER' and value.strip('"\'') == 'true':
+					return False
+
+		return any((self.target / directory / 'os-prober').exists() for directory in ('usr/bin', 'usr/sbin', 'bin', 'sbin'))
+
+	def _probe_other_systems(self) -> str:
+		"""
+		在目标系统中执行一次 os-prober 并缓存结果，同一次安装中多次生成 grub.cfg 时不再重复探测。
+		--os-prober=install-disk 时在独立的挂载命名空间中用只包含安装磁盘的 /proc/partitions
+		覆盖原文件，os-prober 只会探测安装磁盘；--os-prober=off 时不探测。
+		"""
+		if self._os_prober_result is not None:
+			return self._os_prober_result
+
+		mode = arch_config_handler.args.os_prober
+		self._os_prober_result = ''
+
+		if mode == 'off' or not self._os_prober_enabled():
+			return self._os_prober_result
+
+		chroot_cmd = self._prepare_chroot()
+		cmd = f'{chroot_cmd} {self.target} os-prober'
+
+		if mode == 'install-disk':
+			names: set[str] = set()
+			for mod in self._disk_config.device_modifications:
+				names |= get_kernel_names(mod.device_path)
+
+			partitions = logger.directory / 'os-prober-partitions'
+			partitions.write_text(restrict_proc_partitions(Path('/proc/partitions').read_text(), names))
+			script = f'mount --bind {partitions} {self.target}/proc/partitions && exec {cmd}'
+			cmd = f'unshare --mount sh -c {shlex.quote(script)}'
+
+		info(f'正在探测其它操作系统 (os-prober: {mode})')
 		try:
-			self.arch_chroot(f'grub2-mkconfig -o {self.GRUB_CFG_PATH}')
+			self._os_prober_result = SysCommand(cmd).decode()
+		except SysCallError as err:
+			warn(f'os-prober 执行失败，grub.cfg 中不包含其它操作系统: {err}')
+
+		debug(f'os-prober 结果: {self._os_prober_result}')
+		return self._os_prober_result
+
+	@profiler.phase('Installer.write_grub_config')
+	def write_grub_config(self) -> bool:
+		"""
+		如有待生成的请求，执行一次 grub2-mkconfig 并复制到 EFI 目录。
+		grub2-mkconfig 调用的 os-prober 被替换为输出缓存结果的脚本，避免再次探测所有磁盘。
+		"""
+		if not self._grub_config_pending:
+			return False
+
+		result = self._probe_other_systems()
+
+		# 缓存结果通过 PATH 中靠前的同名脚本提供给 30_os-prober
+		wrapper_dir = self.target / 'tmp/eulerinstall-os-prober'
+		wrapper_dir.mkdir(parents=True, exist_ok=True)
+		(wrapper_dir / 'result').write_text(result)
+		(wrapper_dir / 'os-prober').write_text('#!/bin/sh\ncat /tmp/eulerinstall-os-prober/result\n')
+		(wrapper_dir / 'os-prober').chmod(0o755)
+
+		info('grub2-mkconfig run start')
+		try:
+			self.arch_chroot(f"sh -c 'PATH=/tmp/eulerinstall-os-prober:$PATH grub2-mkconfig -o {self.GRUB_CFG_PATH}'")
 			self.arch_chroot(f'cp {self.GRUB_CFG_PATH} {self.EFI_OPEN_EULER_PATH}')
 		except SysCallError as err:
 			raise DiskError(f'Could not update GRUB: {err}')
+		finally:
+			shutil.rmtree(wrapper_dir, ignore_errors=True)
+
+		info('grub2-mkconfig run successful')
+		self._grub_config_pending = False
+		return True
 
+	@profiler.phase('Installer.set_timezone')
 	def set_timezone(self, zone: str) -> bool:
 		if not zone:
 			return True
@@ -1272,6 +1515,7 @@ class Installer:
 
 		return False
 
+	@profiler.phase('Installer.activate_time_synchronization')
 	def activate_time_synchronization(self) -> None:
 		info('Activating systemd-timesyncd for time synchronization using Arch Linux and ntp.org NTP servers')
 		self.enable_service('systemd-timesyncd')
@@ -1292,6 +1536,7 @@ class Installer:
 		except Exception as err:
 			warn(f'Failed to enable fstrim.timer: {err}')
 
+	@profiler.phase('Installer.enable_service')
 	def enable_service(self, services: str | list[str]) -> None:
 		if isinstance(services, str):
 			services = [services]
@@ -1312,18 +1557,12 @@ class Installer:
 	def run_command(self, cmd: str, *args: str, **kwargs: str) -> SysCommand:
 		return SysCommand(f'arch-chroot {self.target} {cmd}')
 
-	def arch_chroot(self, cmd: str, run_as: str | None = None) -> SysCommand:
+	def _prepare_chroot(self) -> str:
 		from .system_detection import SystemType
-		system_type = SystemType.detect()
-		chroot_cmd = 'chroot'
-		if system_type != 'openEuler':
-			chroot_cmd = 'arch-chroot'
-
-		if run_as:
-			cmd = f'su - {run_as} -c {shlex.quote(cmd)}'
+		chroot_cmd = SystemType.host_profile().chroot_command
 
 		# For standard chroot, we need to mount necessary filesystems
-		if chroot_cmd == 'chroot':
+		if chroot_cmd == 'chroot' and not self._chroot_mounts_ready:
 			# This is a simplified version. A more robust solution would check if they are already mounted.
 			mount_points = {
 				'proc': 'proc',
@@ -1339,6 +1578,38 @@ class Installer:
 				if not target_path.is_mount():
 					SysCommand(f'mount --bind /{point} {target_path}')
 
+			self._chroot_mounts_ready = True
+
+		return chroot_cmd
+
+	@profiler.phase('Installer.chroot_batch')
+	def chroot_batch(self, cmds: list[str], check: bool = False) -> list[ChrootResult]:
+		"""
+		在目标系统中通过常驻的 chroot 会话批量执行命令，避免为每条命令启动新的 chroot 进程。
+		check=True 时，所有命令执行完后对第一个失败的命令抛出 SysCallError。
+		"""
+		if self._chroot_session is None:
+			self._chroot_session = ChrootSession(self.target, self._prepare_chroot())
+
+		for cmd in cmds:
+			progress.step(cmd)
+
+		return self._chroot_session.run_batch(cmds, check=check)
+
+	def close_chroot_session(self) -> None:
+		if self._chroot_session is not None:
+			self._chroot_session.close()
+			self._chroot_session = None
+
+	@profiler.phase('Installer.arch_chroot')
+	def arch_chroot(self, cmd: str, run_as: str | None = None) -> SysCommand:
+		chroot_cmd = self._prepare_chroot()
+
+		if run_as:
+			cmd = f'su - {run_as} -c {shlex.quote(cmd)}'
+
+		progress.step(cmd)
+
 		try:
 			return SysCommand(f'{chroot_cmd} {self.target} {cmd}')
 		except SysCallError as e:
@@ -1349,10 +1620,7 @@ class Installer:
 
 	def drop_to_shell(self) -> None:
 		from .system_detection import SystemType
-		system_type = SystemType.detect()
-		chroot_cmd = 'chroot'
-		if system_type != 'openEuler':
-			chroot_cmd = 'arch-chroot'
+		chroot_cmd = SystemType.host_profile().chroot_command
 		subprocess.check_call(f'{chroot_cmd} {self.target}', shell=True)
 
 	def configure_nic(self, nic: Nic) -> None:
@@ -1430,11 +1698,9 @@ class Installer:
 
 		if system_type == 'openEuler':
 			try:
-				# Use dracut for openEuler. The --regenerate-all flag will rebuild for all installed kernels.
-				# The --force flag is used to overwrite existing initramfs files.
+				# Use dracut for openEuler, see _build_initramfs() for the kernels and modules.
 				# We ignore the `flags` parameter as it contains mkinitcpio-specific options like '-P'.
-				dracut_args = ['--force', '--regenerate-all']
-				self.arch_chroot(f'dracut {" ".join(dracut_args)}')
+				self._build_initramfs()
 				return True
 			except SysCallError as e:
 				if e.worker_log:
@@ -1575,6 +1841,7 @@ semodule -i gdm_policy.pp
 		return result.stdout
 
 
+	@profiler.phase('Installer.minimal_installation')
 	def minimal_installation(
 		self,
 		optional_repositories: list[Repository] = [],
@@ -1641,37 +1908,12 @@ semodule -i gdm_policy.pp
 		self._mount_squashfs()
 		self._mount_rootfs()
 			
-		# 复制系统文件 - 智能优化版本
-		info(f'快速复制系统文件从 {self.ROOTFS_MOUNT_DIR}')
-		try:
-			info('使用优化的rsync方法')
-			# -a: 归档模式，保持文件属性
-			# -H: 保留硬链接
-			# -A: 保留ACL权限
-			# -X: 保留扩展属性
-			# --numeric-ids: 使用数字ID而不是用户名
-			# --progress: 显示进度
-			# --exclude: 排除不需要的目录
-			# --filter='-x security.selinux': 排除 SELinux xattr
-			#   原因: EFI 分区(FAT32)等文件系统不支持 security.selinux 扩展属性，
-			#   rsync 设置该 xattr 时会报 "Operation not supported" 错误。
-			#   SELinux 标签会在后续通过 restorecon/setfiles 按策略重新生成，无需在此保留。
-			subprocess.run(f'rsync -aHAX --numeric-ids '\
-							f'--filter=\'-x security.selinux\' '\
-							f'--exclude=/dev/ '\
-							f'--exclude=/proc/ '\
-							f'--exclude=/sys/ '\
-							f'--exclude=/run/ '\
-							f'--exclude=/tmp/* '\
-							f'--exclude=/etc/machine-id '\
-							f'--exclude=/etc/machine-info '\
-							f'--exclude=/lost+found/ '\
-							f'--exclude=/var/log/* '\
-							f'{self.ROOTFS_MOUNT_DIR} {self.target}', shell=True, check=False)
-		except Exception as e:
-			# 对于 rsync 退出代码 23 表示部分传输，这是正常的，允许继续执行
-			warn(f'rsync completed with partial transfer, but continuing installation: {str(e)}')
-		
+		# 复制系统文件 - 按目录和大小切分后由多个 rsync 并行复制
+		# 硬链接、ACL、扩展属性、稀疏文件和数字 ID 均会保留，SELinux 标签只在目标文件系统
+		# 不支持时去除，之后通过 setfiles 按策略重新生成。
+		with progress.phase('copy'):
+			self._copy_rootfs()
+
 		self._helper_flags['base-strapped'] = True
 
 		pacman_conf.persist()
@@ -1711,6 +1953,77 @@ semodule -i gdm_policy.pp
 			if hasattr(plugin, 'on_install'):
 				plugin.on_install(self)
 
+	def _probe_selinux_mounts(self, source: Path) -> dict[Path, bool]:
+		"""
+		检测目标系统各挂载点能否保存 rootfs.img 中的 SELinux 标签，返回 {挂载点: 是否支持}。
+		镜像本身不带标签时全部视为不支持，复制时照旧去除 security.selinux。
+		"""
+		context = get_context(source)
+		supported: dict[Path, bool] = {Path('/'): False}
+
+		for mount in target_mounts(self.target):
+			mountpoint = Path('/') / mount.path.relative_to(self.target)
+			supported[mountpoint] = context is not None and supports_context(mount.path, context)
+			debug(f'SELinux 标签保留检测: {mountpoint} ({mount.fs_type}) -> {supported[mountpoint]}')
+
+		return supported
+
+	@profiler.phase('Installer._copy_rootfs')
+	def _copy_rootfs(self) -> None:
+		"""
+		将挂载的 rootfs.img 内容复制到目标系统
+
+		目标文件系统（ext4/xfs/btrfs 等）能保存 SELinux 标签时保留镜像中的标签，
+		只有 FAT32 ESP 等不支持的挂载点单独复制并去除 security.selinux，
+		保留了标签的挂载点在安装结束时只需标记新建的文件。
+		"""
+		info(f'快速复制系统文件从 {self.ROOTFS_MOUNT_DIR}')
+		source = Path(self.ROOTFS_MOUNT_DIR)
+		workers = arch_config_handler.args.copy_workers
+		supported = self._probe_selinux_mounts(source)
+
+		def parent_mount(path: Path, mountpoints: Iterable[Path]) -> Path | None:
+			return next((parent for parent in path.parents if parent in mountpoints), None)
+
+		# 每个复制根目录由一组 rsync 处理，与上层挂载点标签处理方式不同的挂载点单独复制
+		roots: list[Path] = []
+		for mountpoint in sorted(supported):
+			parent = parent_mount(mountpoint, supported)
+
+			if mountpoint == Path('/'):
+				# 块部署时根分区已按块写入，标签随镜像一起保留
+				if not self._block_deployed:
+					roots.append(mountpoint)
+			elif self._block_deployed and parent == Path('/'):
+				roots.append(mountpoint)
+			elif parent is not None and supported[mountpoint] != supported[parent]:
+				roots.append(mountpoint)
+
+		for root in roots:
+			if not (source / root.relative_to('/')).is_dir():
+				continue
+
+			skip = [str(other.relative_to('/')) for other in roots if parent_mount(other, roots) == root]
+			strip_xattrs = [] if supported[root] else None
+
+			info(f'复制 {root}，{"保留" if supported[root] else "去除"} SELinux 标签')
+			RootfsCopier(
+				source,
+				self.target,
+				workers=workers,
+				strip_xattrs=strip_xattrs,
+				subtree=str(root.relative_to('/')) if root != Path('/') else '',
+				skip_subtrees=skip,
+				on_progress=progress.copy_progress,
+			).copy()
+
+		self._selinux_preserved = [self.target / mountpoint.relative_to('/') for mountpoint, keep in supported.items() if keep]
+		if self._block_deployed and get_context(source) is not None:
+			self._selinux_preserved.append(self.target)
+
+		# 内核的 ctime 时钟精度较粗，留出 1 秒余量，复制末尾的文件多标记一次也无妨
+		self._rootfs_copied_at = time.time() - 1
+
 	def _get_available_loop_device(self) -> tuple[str, bool]:
 		"""查找可用的loop设备，返回(设备路径, 是否是新创建的)"""
 		import glob
@@ -1835,6 +2148,7 @@ semodule -i gdm_policy.pp
 		# 使用公共方法挂载镜像
 		self._mount_with_loop_device(self.ROOTFS_IMAGE_PATH, self.ROOTFS_MOUNT_DIR)
 
+	@profiler.phase('Installer.setup_btrfs_snapshot')
 	def setup_btrfs_snapshot(
 		self,
 		snapshot_type: SnapshotType,
@@ -1916,12 +2230,12 @@ semodule -i gdm_policy.pp
 		return None
 
 	def _get_luks_uuid_from_mapper_dev(self, mapper_dev_path: Path) -> str:
-		lsblk_info = get_lsblk_info(mapper_dev_path, reverse=True, full_dev_path=True)
+		parent = get_lsblk_parent(mapper_dev_path)
 
-		if not lsblk_info.children or not lsblk_info.children[0].uuid:
+		if not parent or not parent.uuid:
 			raise ValueError('Unable to determine UUID of luks superblock')
 
-		return lsblk_info.children[0].uuid
+		return parent.uuid
 
 	def _get_kernel_params_partition(
 		self,
@@ -2255,11 +2569,10 @@ semodule -i gdm_policy.pp
 								f'2. Create new partition table if needed\n'
 								f'3. Ensure boot partition is marked as bootable')
 
+		# grub.cfg 在安装末尾由 write_grub_config() 统一生成
+		self._request_grub_config()
+
 		try:
-			info('grub2-mkconfig run start')
-			self.arch_chroot(f'grub2-mkconfig -o {self.GRUB_CFG_PATH}')
-			self.arch_chroot(f'cp {self.GRUB_CFG_PATH} {self.EFI_OPEN_EULER_PATH}')
-			info('grub2-mkconfig run successful')
 			if SysInfo.has_uefi():
 				info(f'umount efivarfs start')
 				SysCommand(f'umount {self.target}{self.EFI_VARS_PATH}')
@@ -2533,6 +2846,8 @@ semodule -i gdm_policy.pp
 		if not self.mkinitcpio(['-P']):
 			error('Error generating initramfs (continuing anyway)')
 
+	@profiler.phase('Installer.add_bootloader')
+	@progress.phase('bootloader')
 	def add_bootloader(self, bootloader: Bootloader, uki_enabled: bool = False) -> None:
 		"""
 		Adds a bootloader to the installation instance.
@@ -2578,6 +2893,7 @@ semodule -i gdm_policy.pp
 			case Bootloader.Limine:
 				self._add_limine_bootloader(boot_partition, efi_partition, root, uki_enabled)
 
+	@profiler.phase('Installer.add_additional_packages')
 	def add_additional_packages(self, packages: str | list[str]) -> None:
 		return self.pacman.strap(packages)
 
@@ -2611,6 +2927,8 @@ semodule -i gdm_policy.pp
 		# Guarantees sudoer conf file recommended perms
 		rule_file.chmod(0o440)
 
+	@profiler.phase('Installer.create_users')
+	@progress.phase('users')
 	def create_users(self, users: User | list[User]) -> None:
 		if not isinstance(users, list):
 			users = [users]
@@ -2654,12 +2972,13 @@ semodule -i gdm_policy.pp
 
 		self.set_user_password(user)
 
-		for group in user.groups:
-			self.arch_chroot(f'gpasswd -a {user.username} {group}')
+		if user.groups:
+			self.chroot_batch([f'gpasswd -a {user.username} {group}' for group in user.groups], check=True)
 
 		if user.sudo:
 			self.enable_sudo(user)
 
+	@profiler.phase('Installer.set_user_password')
 	def set_user_password(self, user: User) -> bool:
 		info(f'Setting password for {user.username}')
 
@@ -2672,10 +2991,7 @@ semodule -i gdm_policy.pp
 		input_data = f'{user.username}:{enc_password}'.encode()
 		# We can't use arch_chroot here because it doesn't support passing input_data directly
 		from .system_detection import SystemType
-		system_type = SystemType.detect()
-		chroot_cmd = 'chroot'
-		if system_type != 'openEuler':
-			chroot_cmd = 'arch-chroot'
+		chroot_cmd = SystemType.host_profile().chroot_command
 		cmd = [chroot_cmd, str(self.target), 'chpasswd', '--encrypted']
 
 		try:
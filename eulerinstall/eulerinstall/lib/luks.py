@@ -9,7 +9,10 @@
 
 from __future__ import annotations
 
+import os
+import re
 import shlex
+import threading
 from dataclasses import dataclass
 from pathlib import Path
 from subprocess import CalledProcessError
@@ -21,7 +24,116 @@ from eulerinstall.lib.models.device import DEFAULT_ITER_TIME
 from .exceptions import DiskError, SysCallError
 from .general import SysCommand, SysCommandWorker, generate_password, run
 from .models.users import Password
-from .output import debug, info
+from .output import debug, info, warn
+
+# upper limit of cryptsetup for the argon2 memory cost in KiB, and the default number of threads
+_MAX_PBKDF_MEMORY = 1048576
+_MIN_PBKDF_MEMORY = 65536
+_MAX_PBKDF_PARALLEL = 4
+
+# share of the available memory all key derivations running at the same time may use
+_KDF_MEMORY_SHARE = 0.5
+
+_ARGON2_BENCHMARK_RE = re.compile(r'argon2id\s+(\d+) iterations,\s+(\d+) memory,\s+(\d+) parallel')
+
+
+@dataclass(frozen=True)
+class Argon2Params:
+	"""argon2id cost parameters as measured by cryptsetup benchmark, memory in KiB"""
+
+	iterations: int
+	memory: int
+	parallel: int
+
+	def cryptsetup_args(self) -> list[str]:
+		return [
+			'--pbkdf-force-iterations',
+			str(self.iterations),
+			'--pbkdf-memory',
+			str(self.memory),
+			'--pbkdf-parallel',
+			str(self.parallel),
+		]
+
+
+def parse_argon2_benchmark(output: str) -> Argon2Params | None:
+	if match := _ARGON2_BENCHMARK_RE.search(output):
+		return Argon2Params(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+	return None
+
+
+def mem_available_kib(meminfo: Path = Path('/proc/meminfo')) -> int | None:
+	try:
+		for line in meminfo.read_text().splitlines():
+			if line.startswith('MemAvailable:'):
+				return int(line.split()[1])
+	except (OSError, ValueError, IndexError):
+		pass
+
+	return None
+
+
+def kdf_concurrency(params: Argon2Params | None, mem_available: int | None, cpus: int) -> int:
+	"""
+	How many argon2 key derivations can run at the same time without exhausting the memory
+	or running more threads than there are CPUs, at least one
+	"""
+	memory = params.memory if params else _MAX_PBKDF_MEMORY
+	parallel = params.parallel if params else _MAX_PBKDF_PARALLEL
+
+	by_cpus = cpus // parallel
+	by_memory = int(mem_available * _KDF_MEMORY_SHARE) // memory if mem_available else 1
+
+	return max(1, min(by_cpus, by_memory))
+
+
+class KdfCalibration:
+	"""
+	Benchmarks argon2id once per iteration time, every device formatted afterwards uses
+	the measured cost instead of running its own benchmark in luksFormat
+	"""
+
+	def __init__(self) -> None:
+		self._lock = threading.Lock()
+		self._params: dict[int, Argon2Params | None] = {}
+
+	def params(self, iter_time: int) -> Argon2Params | None:
+		with self._lock:
+			if iter_time not in self._params:
+				self._params[iter_time] = self._benchmark(iter_time)
+			return self._params[iter_time]
+
+	def concurrency(self, iter_time: int) -> int:
+		"""Number of devices which can be formatted or opened at once, based on the calibration if there is one"""
+		with self._lock:
+			params = self._params.get(iter_time)
+
+		return kdf_concurrency(params, mem_available_kib(), os.cpu_count() or 1)
+
+	def _benchmark(self, iter_time: int) -> Argon2Params | None:
+		memory = _MAX_PBKDF_MEMORY
+
+		if (available := mem_available_kib()) is not None:
+			# on small live images a single derivation has to fit into the memory share
+			memory = max(_MIN_PBKDF_MEMORY, min(memory, int(available * _KDF_MEMORY_SHARE)))
+
+		cmd = ['cryptsetup', 'benchmark', '--pbkdf', 'argon2id', '--iter-time', str(iter_time), '--pbkdf-memory', str(memory)]
+
+		try:
+			output = SysCommand(cmd).decode()
+		except SysCallError as err:
+			warn(f'Could not calibrate argon2id, every device runs its own benchmark: {err}')
+			return None
+
+		if (params := parse_argon2_benchmark(output)) is None:
+			warn(f'Could not parse the argon2id benchmark: {output}')
+			return None
+
+		info(f'argon2id calibrated for {iter_time} ms: {params.iterations} iterations, {params.memory} KiB, {params.parallel} threads')
+		return params
+
+
+luks_kdf = KdfCalibration()
 
 
 @dataclass
@@ -93,6 +205,12 @@ class Luks2:
 
 		key_file_arg, passphrase = self._get_passphrase_args(key_file)
 
+		# the calibrated cost skips the benchmark luksFormat would run for every device
+		if pbkdf := luks_kdf.params(iter_time):
+			cost_args = pbkdf.cryptsetup_args()
+		else:
+			cost_args = ['--iter-time', str(iter_time)]
+
 		cmd = [
 			'cryptsetup',
 			'--batch-mode',
@@ -105,8 +223,7 @@ class Luks2:
 			hash_type,
 			'--key-size',
 			str(key_size),
-			'--iter-time',
-			str(iter_time),
+			*cost_args,
 			*key_file_arg,
 			'--use-urandom',
 			'luksFormat',
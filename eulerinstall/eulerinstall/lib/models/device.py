@@ -52,8 +52,16 @@ class DiskLayoutType(Enum):
 				return tr('Pre-mounted configuration')
 
 
+class DeployMode(Enum):
+	# copy the root image file by file
+	File = 'file'
+	# write the root image onto the root partition block by block
+	Block = 'block'
+
+
 class _DiskLayoutConfigurationSerialization(TypedDict):
 	config_type: str
+	deploy_mode: NotRequired[str]
 	device_modifications: NotRequired[list[_DeviceModificationSerialization]]
 	lvm_config: NotRequired[_LvmConfigurationSerialization]
 	mountpoint: NotRequired[str]
@@ -68,6 +76,7 @@ class DiskLayoutConfiguration:
 	lvm_config: LvmConfiguration | None = None
 	disk_encryption: DiskEncryption | None = None
 	btrfs_options: BtrfsOptions | None = None
+	deploy_mode: DeployMode = DeployMode.File
 
 	# used for pre-mounted config
 	mountpoint: Path | None = None
@@ -93,6 +102,9 @@ class DiskLayoutConfiguration:
 			if self.btrfs_options:
 				config['btrfs_options'] = self.btrfs_options.json()
 
+			if self.deploy_mode != DeployMode.File:
+				config['deploy_mode'] = self.deploy_mode.value
+
 			return config
 
 	@classmethod
@@ -212,6 +224,9 @@ class DiskLayoutConfiguration:
 			if (btrfs_arg := disk_config.get('btrfs_options', None)) is not None:
 				config.btrfs_options = BtrfsOptions.parse_arg(btrfs_arg)
 
+		if (deploy_mode := disk_config.get('deploy_mode', None)) is not None:
+			config.deploy_mode = DeployMode(deploy_mode)
+
 		return config
 
 	def is_default_btrfs(self) -> bool:
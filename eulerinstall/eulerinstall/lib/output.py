@@ -7,15 +7,19 @@
 
 # Modified for openEuler Installation by Liu Wang in 2025
 
+import atexit
 import logging
 import os
+import queue
 import sys
+import threading
+import time
 from collections.abc import Callable
 from dataclasses import asdict, is_dataclass
 from datetime import UTC, datetime
 from enum import Enum
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import IO, TYPE_CHECKING, Any
 
 from .utils.unicode import unicode_ljust, unicode_rjust
 
@@ -155,9 +159,177 @@ class Journald:
 		log_adapter.log(level, message)
 
 
+# Queued lines before writers block until the background thread caught up
+_MAX_QUEUED_LINES = 10000
+_FLUSH_INTERVAL = 1.0
+
+
+class _Barrier:
+	def __init__(self, sync: bool) -> None:
+		self.sync = sync
+		self.done = threading.Event()
+
+
+class _LogWriter:
+	"""
+	Appends to log files from a background thread. Every file is opened once and kept open,
+	lines are queued in memory, written in batches and flushed periodically and at exit.
+	"""
+
+	def __init__(self, max_queued: int = _MAX_QUEUED_LINES, interval: float = _FLUSH_INTERVAL) -> None:
+		self._queue: queue.Queue[tuple[Path, str, int | None] | _Barrier | None] = queue.Queue(maxsize=max_queued)
+		self._interval = interval
+		self._files: dict[Path, IO[str]] = {}
+		self._dirty = False
+		self._thread: threading.Thread | None = None
+		self._start_lock = threading.Lock()
+
+		atexit.register(self.close)
+
+	def _ensure_started(self) -> None:
+		if self._thread is not None:
+			return
+
+		with self._start_lock:
+			if self._thread is None:
+				self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+				self._thread.start()
+
+	def write(self, path: Path, content: str, mode: int | None = None) -> None:
+		"""mode is applied to the file when it gets created"""
+		self._ensure_started()
+
+		while self._thread is not None and self._thread.is_alive():
+			try:
+				self._queue.put((path, content, mode), timeout=self._interval)
+				return
+			except queue.Full:
+				continue
+
+		# the writer thread is gone, a full queue would block forever
+		self._append(path, content, mode)
+
+	@staticmethod
+	def _append(path: Path, content: str, mode: int | None) -> None:
+		try:
+			created = not path.exists()
+
+			with path.open('a') as f:
+				f.write(content)
+
+			if created and mode is not None:
+				path.chmod(mode)
+		except Exception:
+			pass
+
+	def flush(self, sync: bool = False) -> None:
+		"""Waits until everything queued so far is written, with sync=True it is fsynced as well"""
+		if self._thread is None or not self._thread.is_alive():
+			return
+
+		barrier = _Barrier(sync)
+		self._queue.put(barrier)
+		barrier.done.wait()
+
+	def close(self) -> None:
+		if self._thread is None or not self._thread.is_alive():
+			return
+
+		self._queue.put(None)
+		self._thread.join()
+		self._thread = None
+
+	def _open(self, path: Path, mode: int | None) -> IO[str] | None:
+		if (f := self._files.get(path)) is not None:
+			return f
+
+		try:
+			created = not path.exists()
+			f = path.open('a')
+
+			if created and mode is not None:
+				path.chmod(mode)
+		except OSError:
+			# the log directory is not available (yet), the line is dropped as before
+			return None
+
+		self._files[path] = f
+		return f
+
+	def _flush_files(self, sync: bool = False) -> None:
+		for f in self._files.values():
+			try:
+				f.flush()
+				if sync:
+					os.fsync(f.fileno())
+			except (OSError, ValueError):
+				pass
+
+		self._dirty = False
+
+	def _handle(self, item: tuple[Path, str, int | None] | _Barrier) -> None:
+		if isinstance(item, _Barrier):
+			try:
+				self._flush_files(item.sync)
+			finally:
+				item.done.set()
+			return
+
+		path, content, mode = item
+
+		if (f := self._open(path, mode)) is not None:
+			try:
+				f.write(content)
+				self._dirty = True
+			except OSError:
+				pass
+
+	def _close_files(self) -> None:
+		self._flush_files()
+
+		for f in self._files.values():
+			f.close()
+
+		self._files.clear()
+
+	def _run(self) -> None:
+		last_flush = time.monotonic()
+
+		while True:
+			batch: list[tuple[Path, str, int | None] | _Barrier | None] = []
+
+			try:
+				batch.append(self._queue.get(timeout=self._interval))
+				# everything queued meanwhile is written before the next flush
+				while len(batch) < _MAX_QUEUED_LINES:
+					batch.append(self._queue.get_nowait())
+			except queue.Empty:
+				pass
+
+			for item in batch:
+				if item is None:
+					self._close_files()
+					return
+
+				try:
+					self._handle(item)
+				except Exception as err:
+					# e.g. content which cannot be encoded, the line is dropped and the thread keeps running
+					sys.stderr.write(f'Unable to write log line: {err!r}\n')
+
+			if self._dirty and time.monotonic() - last_flush >= self._interval:
+				self._flush_files()
+				last_flush = time.monotonic()
+
+
+_log_writer = _LogWriter()
+
+
 class Logger:
 	def __init__(self, path: Path = Path('/var/log/archinstall')) -> None:
 		self._path = path
+		# the directory is only checked once instead of for every line
+		self._checked_path: Path | None = None
 
 	@property
 	def path(self) -> Path:
@@ -183,12 +355,21 @@ class Logger:
 			warn(f'Not enough permission to place log file at {log_file}, creating it in {logger.path} instead')
 
 	def log(self, level: int, content: str) -> None:
-		self._check_permissions()
+		if self._checked_path != self._path:
+			self._checked_path = self._path
+			self._check_permissions()
+
+		ts = _timestamp()
+		level_name = logging.getLevelName(level)
+		_log_writer.write(self.path, f'[{ts}] - {level_name} - {content}\n')
+
+	def append(self, file: str, content: str, mode: int | None = None) -> None:
+		"""Appends to another file of the log directory, mode is applied when the file gets created"""
+		_log_writer.write(self._path / file, content, mode)
 
-		with self.path.open('a') as f:
-			ts = _timestamp()
-			level_name = logging.getLevelName(level)
-			f.write(f'[{ts}] - {level_name} - {content}\n')
+	def flush(self, sync: bool = False) -> None:
+		"""Writes all queued log lines, with sync=True they are fsynced as well"""
+		_log_writer.flush(sync)
 
 
 logger = Logger()
@@ -26,8 +26,9 @@ class Pacman:
 		self.synced = False
 		self.silent = silent
 		self.target = target
-		self.system_type = SystemType.detect()
-		self.package_manager = SystemType.get_package_manager()
+		host = SystemType.host_profile()
+		self.system_type = host.distro
+		self.package_manager = host.package_manager
 
 	@staticmethod
 	def run(args: str, default_cmd: str = None) -> SysCommand:
@@ -36,19 +37,13 @@ class Pacman:
 		It also protects us from colliding with other running package manager sessions (if used locally).
 		The grace period is set to 10 minutes before exiting hard if another instance is running.
 		"""
-		system_type = SystemType.detect()
+		host = SystemType.host_profile()
 		
 		if default_cmd is None:
-			default_cmd = SystemType.get_package_manager()
+			default_cmd = host.package_manager
 		
-		# 根据系统类型设置锁文件路径
-		match system_type:
-			case 'arch':
-				lock_file = Path('/var/lib/pacman/db.lck')
-			case 'openEuler':
-				lock_file = Path('/var/lib/dnf/dnf.lock')
-			case _:
-				lock_file = Path('/var/lib/pacman/db.lck')  # 默认使用pacman路径
+		# 锁文件路径由系统类型决定
+		lock_file = host.lock_file
 		
 		if lock_file.exists():
 			warn(tr(f'{default_cmd.capitalize()} is already running, waiting maximum 10 minutes for it to terminate.'))
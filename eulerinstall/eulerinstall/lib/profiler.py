@@ -0,0 +1,169 @@
+# Arch Linux install script (archinstall)
+# Copyright (C) 2021-2023 Arch Linux
+#
+# This file is part of archinstall.
+# This file is licensed under the GNU General Public License version 3.
+# Refer to the `LICENSE` file for further details.
+
+# Modified for openEuler Installation by Liu Wang in 2025
+
+from __future__ import annotations
+
+import json
+import resource
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from .output import debug, info, logger
+
+
+@dataclass
+class _Counters:
+	wall: float
+	cpu: float
+	children: int
+	bytes_written: int
+
+
+@dataclass
+class PhaseStats:
+	"""Accumulated values of all runs of a phase, identified by its stack path"""
+
+	path: str
+	calls: int = 0
+	wall: float = 0.0
+	# wall time not spent in nested phases, used for the flame graph
+	self_wall: float = 0.0
+	cpu: float = 0.0
+	children: int = 0
+	bytes_written: int = 0
+
+	@property
+	def depth(self) -> int:
+		return self.path.count(';')
+
+	@property
+	def name(self) -> str:
+		return self.path.rsplit(';', 1)[-1]
+
+
+@dataclass
+class _Frame:
+	name: str
+	path: str
+	start: _Counters
+	nested_wall: float = 0.0
+
+
+class _ThreadState(threading.local):
+	def __init__(self) -> None:
+		self.stack: list[_Frame] = []
+
+
+class PhaseProfiler:
+	"""
+	Records wall time, CPU time (installer and reaped child processes), the number of
+	spawned processes and the bytes written to block devices for every phase.
+
+	Phases nest per thread, a phase entered in a worker thread starts a new stack.
+	CPU time and block I/O are process wide, so phases running at the same time in
+	different threads both account for them.
+	"""
+
+	def __init__(self) -> None:
+		self._lock = threading.Lock()
+		self._stats: dict[str, PhaseStats] = {}
+		self._children = 0
+		self._thread = _ThreadState()
+
+	def count_child(self) -> None:
+		with self._lock:
+			self._children += 1
+
+	def _counters(self) -> _Counters:
+		own = resource.getrusage(resource.RUSAGE_SELF)
+		reaped = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+		return _Counters(
+			wall=time.perf_counter(),
+			cpu=own.ru_utime + own.ru_stime + reaped.ru_utime + reaped.ru_stime,
+			children=self._children,
+			# ru_oublock counts 512 byte blocks
+			bytes_written=(own.ru_oublock + reaped.ru_oublock) * 512,
+		)
+
+	@contextmanager
+	def phase(self, name: str) -> Iterator[None]:
+		"""Can be used as context manager or as method decorator"""
+		stack = self._thread.stack
+		path = f'{stack[-1].path};{name}' if stack else name
+
+		with self._lock:
+			# reserve the entry so the report lists phases in the order they started
+			self._stats.setdefault(path, PhaseStats(path))
+
+		frame = _Frame(name, path, self._counters())
+		stack.append(frame)
+
+		try:
+			yield
+		finally:
+			stack.pop()
+			end = self._counters()
+			wall = end.wall - frame.start.wall
+
+			if stack:
+				stack[-1].nested_wall += wall
+
+			with self._lock:
+				stats = self._stats[path]
+				stats.calls += 1
+				stats.wall += wall
+				stats.self_wall += max(wall - frame.nested_wall, 0.0)
+				stats.cpu += end.cpu - frame.start.cpu
+				stats.children += end.children - frame.start.children
+				stats.bytes_written += end.bytes_written - frame.start.bytes_written
+
+	def stats(self) -> list[PhaseStats]:
+		with self._lock:
+			return list(self._stats.values())
+
+	def summary(self) -> str:
+		lines = [f'{"phase":<50} {"calls":>5} {"wall s":>9} {"cpu s":>9} {"procs":>6} {"written MiB":>12}']
+
+		for stats in self.stats():
+			name = '  ' * stats.depth + stats.name
+			lines.append(
+				f'{name[:50]:<50} {stats.calls:>5} {stats.wall:>9.2f} {stats.cpu:>9.2f} {stats.children:>6} {stats.bytes_written / 1024 / 1024:>12.1f}',
+			)
+
+		return '\n'.join(lines)
+
+	def folded(self) -> str:
+		"""Stack paths with their self time in milliseconds, the input format of flamegraph.pl"""
+		return '\n'.join(f'{stats.path} {round(stats.self_wall * 1000)}' for stats in self.stats()) + '\n'
+
+	def write_report(self, directory: Path | None = None) -> None:
+		if not (all_stats := self.stats()):
+			return
+
+		directory = directory or logger.directory
+
+		report = {
+			'phases': [asdict(stats) for stats in all_stats],
+		}
+
+		try:
+			(directory / 'timings.json').write_text(json.dumps(report, indent=4))
+			(directory / 'timings.folded').write_text(self.folded())
+		except OSError as err:
+			debug(f'Unable to write timings to {directory}: {err}')
+
+		info(f'Installation timings:\n{self.summary()}')
+
+
+profiler = PhaseProfiler()
@@ -0,0 +1,151 @@
+# Arch Linux install script (archinstall)
+# Copyright (C) 2021-2023 Arch Linux
+#
+# This file is part of archinstall.
+# This file is licensed under the GNU General Public License version 3.
+# Refer to the `LICENSE` file for further details.
+
+# Modified for openEuler Installation by Liu Wang in 2025
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, TextIO
+
+from .output import debug, logger
+
+# minimum seconds between two events of the same kind, phase events are never throttled
+_THROTTLE = {
+	'copy': 0.5,
+	'step': 0.25,
+}
+
+
+class ProgressReporter:
+	"""
+	Writes machine readable progress events, one JSON object per line, for front-ends
+	such as the Electron installer (--progress-fd / --progress-json).
+
+	Frequent events are throttled per kind; an event dropped by the throttle is kept
+	and written once the interval has passed, so the last state always arrives.
+	"""
+
+	def __init__(self) -> None:
+		self._stream: TextIO | None = None
+		self._lock = threading.Lock()
+		self._last_emit: dict[str, float] = {}
+		self._pending: dict[str, dict[str, Any]] = {}
+		self._timers: dict[str, threading.Timer] = {}
+		self._phase_start: dict[str, float] = {}
+		self._copy_start: float | None = None
+
+	@property
+	def enabled(self) -> bool:
+		return self._stream is not None
+
+	def open_fd(self, fd: int) -> None:
+		self._stream = os.fdopen(fd, 'w', buffering=1, encoding='utf-8')
+
+	def open_stdout(self) -> None:
+		self._stream = sys.stdout
+
+	def _write(self, payload: dict[str, Any]) -> None:
+		if self._stream is None:
+			return
+
+		try:
+			self._stream.write(json.dumps(payload, ensure_ascii=False) + '\n')
+			self._stream.flush()
+		except (OSError, ValueError) as err:
+			# the reader went away, the installation itself must carry on
+			debug(f'Disabling progress events: {err}')
+			self._stream = None
+
+	def _flush_pending(self, kind: str) -> None:
+		with self._lock:
+			self._timers.pop(kind, None)
+
+			if payload := self._pending.pop(kind, None):
+				self._last_emit[kind] = time.monotonic()
+				self._write(payload)
+
+	def emit(self, kind: str, force: bool = False, **data: Any) -> None:
+		if not self.enabled:
+			return
+
+		payload = {'event': kind, 'time': round(time.time(), 3), **data}
+		interval = _THROTTLE.get(kind, 0.0)
+
+		with self._lock:
+			now = time.monotonic()
+			elapsed = now - self._last_emit.get(kind, 0.0)
+
+			if not force and interval and elapsed < interval:
+				self._pending[kind] = payload
+
+				if kind not in self._timers:
+					timer = threading.Timer(interval - elapsed, self._flush_pending, args=(kind,))
+					timer.daemon = True
+					self._timers[kind] = timer
+					timer.start()
+				return
+
+			self._pending.pop(kind, None)
+			self._last_emit[kind] = now
+			self._write(payload)
+
+	def phase_start(self, name: str) -> None:
+		self._phase_start[name] = time.monotonic()
+		self.emit('phase_start', phase=name)
+
+	def phase_end(self, name: str, success: bool = True) -> None:
+		# deliver throttled events of this phase before closing it
+		for kind in list(self._pending):
+			self._flush_pending(kind)
+
+		start = self._phase_start.pop(name, None)
+		duration = round(time.monotonic() - start, 3) if start is not None else None
+		self.emit('phase_end', phase=name, success=success, duration=duration)
+
+		# the log of a finished phase survives a crash or power loss from here on
+		logger.flush(sync=True)
+
+	@contextmanager
+	def phase(self, name: str) -> Iterator[None]:
+		"""Can be used as context manager or as method decorator"""
+		self.phase_start(name)
+		try:
+			yield
+		except BaseException:
+			self.phase_end(name, success=False)
+			raise
+		self.phase_end(name)
+
+	def step(self, message: str) -> None:
+		self.emit('step', message=message)
+
+	def copy_progress(self, copied: int, total: int) -> None:
+		"""
+		Takes the cost units of the rootfs copy (allocated bytes plus a fixed amount per file),
+		they are reported as such and not as bytes
+		"""
+		if self._copy_start is None or copied == 0:
+			self._copy_start = time.monotonic()
+
+		elapsed = time.monotonic() - self._copy_start
+		eta = round(elapsed / copied * (total - copied), 1) if copied and total >= copied else None
+		percent = round(copied * 100 / total, 1) if total else 100.0
+
+		self.emit('copy', force=copied >= total, copied_units=copied, total_units=total, percent=percent, eta=eta)
+
+	def done(self, success: bool) -> None:
+		self.emit('done', force=True, success=success)
+
+
+progress = ProgressReporter()
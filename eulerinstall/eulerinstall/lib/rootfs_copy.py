@@ -0,0 +1,305 @@
+# Arch Linux install script (archinstall)
+# Copyright (C) 2021-2023 Arch Linux
+#
+# This file is part of archinstall.
+# This file is licensed under the GNU General Public License version 3.
+# Refer to the `LICENSE` file for further details.
+
+# Modified for openEuler Installation by Liu Wang in 2025
+
+from __future__ import annotations
+
+import os
+import stat
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from subprocess import CalledProcessError
+
+from .general import run
+from .output import debug, info, warn
+
+# Top level directories which are never copied into the target
+_EXCLUDED_DIRS = {'dev', 'proc', 'sys', 'run', 'lost+found'}
+# Directories which are created in the target but whose content is skipped
+_EMPTIED_DIRS = {'tmp', 'var/log'}
+# Single files which must be generated per installation
+_EXCLUDED_FILES = {'etc/machine-id', 'etc/machine-info'}
+
+# rsync exit codes for a partial transfer, these are tolerated as before
+_RSYNC_PARTIAL_CODES = (23, 24)
+
+# Every file carries a fixed cost for creating the inode and setting its metadata,
+# without it a unit with thousands of tiny files would look as cheap as an empty one
+_PER_FILE_COST = 4096
+_UNITS_PER_WORKER = 4
+_MIN_UNIT_BYTES = 64 * 1024 * 1024
+
+
+def default_copy_workers() -> int:
+	return max(1, min(os.cpu_count() or 1, 8))
+
+
+@dataclass
+class CopyUnit:
+	"""A batch of paths (relative to the copy source) handled by one rsync process"""
+
+	paths: list[str] = field(default_factory=list)
+	size: int = 0
+	hardlinks: bool = False
+
+	def add(self, path: str, size: int) -> None:
+		self.paths.append(path)
+		self.size += size
+
+
+@dataclass
+class WorkerStats:
+	name: str
+	units: int = 0
+	files: int = 0
+	size: int = 0
+	elapsed: float = 0.0
+
+	def throughput(self) -> float:
+		"""MiB/s while the worker was busy"""
+		if self.elapsed <= 0:
+			return 0.0
+		return self.size / self.elapsed / 1024 / 1024
+
+
+@dataclass
+class CopyPlan:
+	units: list[CopyUnit]
+	total_size: int
+	total_files: int
+
+
+def _entry_cost(st: os.stat_result) -> int:
+	# st_blocks reflects the allocated size which keeps sparse files cheap
+	return min(st.st_size, st.st_blocks * 512) + _PER_FILE_COST
+
+
+def split_units(
+	groups: list[tuple[str, list[tuple[str, int]]]],
+	workers: int,
+) -> list[CopyUnit]:
+	"""
+	Packs directory groups of (path, size) entries into units of roughly the same size.
+	Files of one directory stay together unless the directory alone exceeds a unit,
+	the result is sorted largest first so the pool schedules the expensive units early.
+	"""
+	total = sum(size for _, entries in groups for _, size in entries)
+	target = max(total // max(workers * _UNITS_PER_WORKER, 1), _MIN_UNIT_BYTES)
+
+	units: list[CopyUnit] = []
+	current = CopyUnit()
+
+	for _, entries in groups:
+		group_size = sum(size for _, size in entries)
+
+		if current.paths and current.size + group_size > target:
+			units.append(current)
+			current = CopyUnit()
+
+		for path, size in entries:
+			if current.paths and current.size >= target:
+				units.append(current)
+				current = CopyUnit()
+			current.add(path, size)
+
+	if current.paths:
+		units.append(current)
+
+	return sorted(units, key=lambda unit: unit.size, reverse=True)
+
+
+class RootfsCopier:
+	"""
+	Copies the mounted root filesystem image into the target with several rsync workers.
+
+	The source tree is walked once and split into balanced units, every unit is then copied
+	by its own rsync process via --files-from. Files with more than one link are put into a
+	single unit so that rsync -H can recreate the hard links, and the directory tree is
+	synced before and after the file units so ownership, modes and timestamps of the
+	directories match the source.
+	"""
+
+	def __init__(
+		self,
+		source: Path,
+		target: Path,
+		workers: int | None = None,
+		strip_xattrs: list[str] | None = None,
+		subtree: str = '',
+		skip_subtrees: list[str] | None = None,
+		on_progress: Callable[[int, int], None] | None = None,
+	):
+		# only copy the given directory (relative to the image root), the exclusions
+		# still apply relative to the image root
+		self.subtree = subtree.strip('/')
+		self.source = source / self.subtree if self.subtree else source
+		self.target = target / self.subtree if self.subtree else target
+		self.workers = workers if workers else default_copy_workers()
+		# SELinux labels are regenerated from the policy after the copy
+		self.strip_xattrs = strip_xattrs if strip_xattrs is not None else ['security.selinux']
+		# directories (relative to the image root) left to a separate copy, e.g. mountpoints
+		# of filesystems which need different xattr handling
+		self.skip_subtrees = {path.strip('/') for path in skip_subtrees or []}
+
+		# called with the copied and the total cost (see _entry_cost) whenever a unit finished
+		self.on_progress = on_progress
+
+		self._stats: dict[str, WorkerStats] = {}
+		self._stats_lock = threading.Lock()
+		self._copied = 0
+		self._total = 0
+
+	def _base_cmd(self) -> list[str]:
+		cmd = ['rsync', '-aAX', '--numeric-ids']
+		cmd += [f'--filter=-x {name}' for name in self.strip_xattrs]
+		return cmd
+
+	def _exclude_rules(self) -> list[str]:
+		patterns = [f'/{name}/' for name in sorted(_EXCLUDED_DIRS)]
+		patterns += [f'/{name}/*' for name in sorted(_EMPTIED_DIRS)]
+		patterns += [f'/{name}' for name in sorted(_EXCLUDED_FILES)]
+		patterns += [f'/{name}/' for name in sorted(self.skip_subtrees)]
+
+		if self.subtree:
+			prefix = f'/{self.subtree}'
+			patterns = [pattern[len(prefix):] for pattern in patterns if pattern.startswith(f'{prefix}/')]
+
+		return [f'--exclude={pattern}' for pattern in patterns]
+
+	def _is_excluded(self, rel_path: str, is_dir: bool) -> bool:
+		path = os.path.join(self.subtree, rel_path) if self.subtree else rel_path
+
+		if is_dir and (path in _EXCLUDED_DIRS or path in self.skip_subtrees):
+			return True
+		if path in _EXCLUDED_FILES:
+			return True
+		parent = os.path.dirname(path)
+		return parent in _EMPTIED_DIRS
+
+	def scan(self) -> CopyPlan:
+		groups: list[tuple[str, list[tuple[str, int]]]] = []
+		hardlinked = CopyUnit(hardlinks=True)
+		total_files = 0
+
+		pending = ['']
+
+		while pending:
+			rel_dir = pending.pop()
+			entries: list[tuple[str, int]] = []
+
+			with os.scandir(self.source / rel_dir) as it:
+				for entry in it:
+					rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+					st = entry.stat(follow_symlinks=False)
+					is_dir = stat.S_ISDIR(st.st_mode)
+
+					if self._is_excluded(rel_path, is_dir):
+						continue
+
+					if is_dir:
+						pending.append(rel_path)
+						continue
+
+					total_files += 1
+
+					if st.st_nlink > 1:
+						hardlinked.add(rel_path, _entry_cost(st))
+					else:
+						entries.append((rel_path, _entry_cost(st)))
+
+			if entries:
+				groups.append((rel_dir, entries))
+
+		units = split_units(groups, self.workers)
+
+		if hardlinked.paths:
+			units.insert(0, hardlinked)
+
+		total_size = sum(unit.size for unit in units)
+		return CopyPlan(units=units, total_size=total_size, total_files=total_files)
+
+	def _sync_directories(self) -> None:
+		cmd = self._base_cmd() + self._exclude_rules() + ['--include=*/', '--exclude=*']
+		cmd += [f'{self.source}/', f'{self.target}/']
+		self._run_rsync(cmd, 'directory tree')
+
+	def _run_rsync(self, cmd: list[str], what: str, input_data: bytes | None = None) -> None:
+		try:
+			run(cmd, input_data=input_data)
+		except CalledProcessError as err:
+			output = err.stdout.decode(errors='backslashreplace').strip() if err.stdout else ''
+
+			if err.returncode in _RSYNC_PARTIAL_CODES:
+				warn(f'rsync completed with partial transfer of {what}, but continuing installation: {output}')
+			else:
+				warn(f'rsync failed copying {what} (exit code {err.returncode}): {output}')
+
+	def _copy_unit(self, unit: CopyUnit) -> None:
+		cmd = self._base_cmd()
+		cmd += ['--sparse', '--no-implied-dirs', '--from0', '--files-from=-']
+
+		if unit.hardlinks:
+			cmd.append('-H')
+
+		cmd += [f'{self.source}/', f'{self.target}/']
+		file_list = b'\0'.join(os.fsencode(path) for path in unit.paths) + b'\0'
+
+		start = time.monotonic()
+		self._run_rsync(cmd, f'{len(unit.paths)} files', input_data=file_list)
+		elapsed = time.monotonic() - start
+
+		name = threading.current_thread().name
+
+		with self._stats_lock:
+			stats = self._stats.setdefault(name, WorkerStats(name))
+			stats.units += 1
+			stats.files += len(unit.paths)
+			stats.size += unit.size
+			stats.elapsed += elapsed
+
+			self._copied += unit.size
+			copied = self._copied
+
+		if self.on_progress:
+			self.on_progress(copied, self._total)
+
+	def copy(self) -> list[WorkerStats]:
+		start = time.monotonic()
+
+		plan = self.scan()
+		info(f'Copying {plan.total_files} files ({plan.total_size // 1024 // 1024} MiB) in {len(plan.units)} units with {self.workers} workers')
+
+		self._total = plan.total_size
+		if self.on_progress:
+			self.on_progress(0, self._total)
+
+		self._sync_directories()
+
+		with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='rootfs-copy') as executor:
+			futures = [executor.submit(self._copy_unit, unit) for unit in plan.units]
+
+			for future in as_completed(futures):
+				future.result()
+
+		# creating the files has touched the directory timestamps again
+		self._sync_directories()
+
+		elapsed = time.monotonic() - start
+		stats = sorted(self._stats.values(), key=lambda s: s.name)
+
+		for worker in stats:
+			debug(f'{worker.name}: {worker.units} units, {worker.files} files, {worker.size // 1024 // 1024} MiB, {worker.throughput():.1f} MiB/s')
+
+		total_rate = plan.total_size / elapsed / 1024 / 1024 if elapsed > 0 else 0.0
+		info(f'Root filesystem copied in {elapsed:.1f}s ({total_rate:.1f} MiB/s)')
+
+		return stats
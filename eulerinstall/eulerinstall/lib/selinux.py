@@ -0,0 +1,386 @@
+# Arch Linux install script (archinstall)
+# Copyright (C) 2021-2023 Arch Linux
+#
+# This file is part of archinstall.
+# This file is licensed under the GNU General Public License version 3.
+# Refer to the `LICENSE` file for further details.
+
+# Modified for openEuler Installation by Liu Wang in 2025
+
+from __future__ import annotations
+
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
+from collections.abc import Container
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .disk.mountinfo import API_FSTYPES, mounts_below, read_mountinfo
+from .exceptions import RequirementError
+from .general import run
+from .output import debug, info
+
+# Filesystems which cannot store security.selinux, e.g. the FAT32 ESP
+_NO_XATTR_FSTYPES = {'vfat', 'msdos', 'exfat', 'ntfs', 'ntfs3', 'fuseblk', 'iso9660', 'udf'}
+
+_XATTR_NAME = 'security.selinux'
+
+# Directories are split into per-worker units up to this depth below the mountpoint
+_MAX_SPLIT_DEPTH = 3
+_UNITS_PER_WORKER = 4
+_MIN_UNIT_FILES = 2000
+# every split directory becomes an -e argument of the unit labeling its parents
+_MAX_EXCLUDES = 1000
+
+
+def default_label_workers() -> int:
+	# setfiles is bound by matching paths against file_contexts, so every core helps
+	return max(1, os.cpu_count() or 1)
+
+
+@dataclass
+class TargetMount:
+	path: Path
+	fs_type: str
+
+
+@dataclass
+class LabelUnit:
+	"""Paths labeled recursively by one setfiles process, excluded paths are left to other units"""
+
+	paths: list[str] = field(default_factory=list)
+	excludes: list[str] = field(default_factory=list)
+	files: int = 0
+
+
+@dataclass
+class MountLabelStats:
+	mountpoint: Path
+	fs_type: str
+	files: int = 0
+	units: int = 0
+	elapsed: float = 0.0
+	skipped: str | None = None
+
+
+@dataclass
+class TreeScan:
+	"""Entry counts of a mounted tree, directories deeper than the split depth are only counted"""
+
+	root: str
+	# number of entries below and including a directory
+	counts: dict[str, int] = field(default_factory=dict)
+	# subdirectories of every directory which may still be split
+	children: dict[str, list[str]] = field(default_factory=dict)
+	# mountpoints nested in the tree, labeled on their own
+	mountpoints: list[str] = field(default_factory=list)
+
+	@property
+	def total(self) -> int:
+		return self.counts.get(self.root, 0)
+
+
+def get_context(path: Path) -> bytes | None:
+	try:
+		return os.getxattr(path, _XATTR_NAME, follow_symlinks=False)
+	except OSError:
+		return None
+
+
+def supports_context(mountpoint: Path, context: bytes) -> bool:
+	"""Probes whether the filesystem mounted at mountpoint can store the given SELinux context"""
+	try:
+		fd, probe = tempfile.mkstemp(dir=mountpoint, prefix='.eulerinstall-xattr-')
+	except OSError as err:
+		debug(f'Unable to probe xattr support of {mountpoint}: {err}')
+		return False
+
+	try:
+		os.setxattr(fd, _XATTR_NAME, context)
+		return True
+	except OSError as err:
+		# EOPNOTSUPP for filesystems without xattrs, EINVAL if the host policy rejects the context
+		debug(f'{mountpoint} cannot store SELinux contexts: {err}')
+		return False
+	finally:
+		os.close(fd)
+		os.unlink(probe)
+
+
+def target_mounts(target: Path, mountinfo: Path = Path('/proc/self/mountinfo')) -> list[TargetMount]:
+	"""Filesystems mounted at or below the target, parents before their nested mounts"""
+	mounts = [TargetMount(entry.mountpoint, entry.fs_type) for entry in mounts_below(read_mountinfo(mountinfo), target)]
+	return sorted(mounts, key=lambda mount: len(mount.path.parts))
+
+
+def scan_tree(root: str, nested: Container[str] = frozenset(), max_depth: int = _MAX_SPLIT_DEPTH) -> TreeScan:
+	"""
+	nested are the mountpoints below root, they are labeled on their own. A different st_dev
+	does not mean a mount, every btrfs subvolume has its own.
+	"""
+	scan = TreeScan(root)
+
+	def walk(path: str, depth: int) -> int:
+		count = 1
+		subdirs: list[str] = []
+
+		try:
+			it = os.scandir(path)
+		except OSError as err:
+			debug(f'Unable to scan {path}: {err}')
+			return count
+
+		with it:
+			for entry in it:
+				try:
+					st = entry.stat(follow_symlinks=False)
+				except OSError:
+					continue
+
+				if not stat.S_ISDIR(st.st_mode):
+					count += 1
+					continue
+
+				if entry.path in nested:
+					scan.mountpoints.append(entry.path)
+					continue
+
+				count += walk(entry.path, depth + 1)
+				subdirs.append(entry.path)
+
+		if depth <= max_depth:
+			scan.counts[path] = count
+		if depth < max_depth:
+			scan.children[path] = subdirs
+
+		return count
+
+	walk(root, 0)
+	return scan
+
+
+def find_unlabeled(root: str, nested: Container[str] = frozenset(), changed_since: float | None = None) -> list[str]:
+	"""
+	Entries of a tree without a SELinux context and, with changed_since, entries whose inode
+	changed after that time, e.g. files created or replaced after a copy which kept the
+	contexts. On a host running SELinux those got a context derived from their parent
+	directory instead of none. Such directories are returned without their content, setfiles
+	labels them recursively. The nested mountpoints are skipped.
+	"""
+	unlabeled: list[str] = []
+	pending = [root]
+
+	if get_context(Path(root)) is None:
+		return [root]
+
+	while pending:
+		directory = pending.pop()
+
+		try:
+			it = os.scandir(directory)
+		except OSError as err:
+			debug(f'Unable to scan {directory}: {err}')
+			continue
+
+		with it:
+			for entry in it:
+				try:
+					st = entry.stat(follow_symlinks=False)
+				except OSError:
+					continue
+
+				is_dir = stat.S_ISDIR(st.st_mode)
+
+				if is_dir and entry.path in nested:
+					continue
+
+				changed = changed_since is not None and st.st_ctime >= changed_since
+
+				if changed or get_context(Path(entry.path)) is None:
+					unlabeled.append(entry.path)
+				elif is_dir:
+					pending.append(entry.path)
+
+	return unlabeled
+
+
+def plan_units(scan: TreeScan, workers: int) -> list[LabelUnit]:
+	"""
+	Splits a tree into units of roughly the same number of entries. Directories larger than
+	a unit are split into their subdirectories, one more unit labels the split directories
+	themselves together with the files directly inside them. The result is sorted largest first.
+	"""
+	target = max(scan.total // max(workers * _UNITS_PER_WORKER, 1), _MIN_UNIT_FILES)
+
+	leaves: list[str] = []
+	pending = [scan.root]
+
+	while pending:
+		directory = pending.pop(0)
+
+		for child in scan.children.get(directory, []):
+			split = scan.counts[child] > target and child in scan.children
+			if split and len(leaves) + len(scan.children[child]) <= _MAX_EXCLUDES:
+				pending.append(child)
+			else:
+				leaves.append(child)
+
+	units: list[LabelUnit] = []
+	current = LabelUnit()
+
+	for leaf in sorted(leaves, key=lambda path: scan.counts[path], reverse=True):
+		if current.paths and current.files + scan.counts[leaf] > target:
+			units.append(current)
+			current = LabelUnit()
+
+		current.paths.append(leaf)
+		current.files += scan.counts[leaf]
+
+	if current.paths:
+		units.append(current)
+
+	parents = LabelUnit(paths=[scan.root], excludes=list(leaves), files=scan.total - sum(unit.files for unit in units))
+	units.append(parents)
+
+	for unit in units:
+		unit.excludes += scan.mountpoints
+
+	return sorted(units, key=lambda unit: unit.files, reverse=True)
+
+
+def _split_paths(paths: list[str], workers: int) -> list[LabelUnit]:
+	count = min(workers, len(paths))
+	return [LabelUnit(paths=paths[i::count], files=len(paths[i::count])) for i in range(count)]
+
+
+class SelinuxLabeler:
+	"""
+	Labels the installed system offline with setfiles against the policy of the target.
+
+	Every filesystem mounted below the target is split into subtrees which are labeled by
+	parallel setfiles processes. Filesystems which cannot hold extended attributes are
+	skipped, they get their context from the mount options of the booted system. On
+	filesystems which kept the contexts of the image only unlabeled entries and entries
+	changed after the copy are labeled.
+	"""
+
+	def __init__(
+		self,
+		target: Path,
+		workers: int | None = None,
+		preserved: list[Path] | None = None,
+		changed_since: float | None = None,
+	):
+		self.target = target
+		self.workers = workers if workers else default_label_workers()
+		# mountpoints whose contexts were kept from the image, only unlabeled entries and
+		# entries changed since the copy finished are labeled there
+		self.preserved = preserved or []
+		self.changed_since = changed_since
+
+		self._stats_lock = threading.Lock()
+
+	def _selinux_config(self) -> dict[str, str]:
+		config: dict[str, str] = {}
+		config_file = self.target / 'etc/selinux/config'
+
+		if not config_file.exists():
+			return config
+
+		for line in config_file.read_text().splitlines():
+			key, sep, value = line.strip().partition('=')
+			if sep and not key.startswith('#'):
+				config[key.strip()] = value.strip().strip('"\'')
+
+		return config
+
+	def enabled(self) -> bool:
+		return self._selinux_config().get('SELINUX', 'disabled') != 'disabled'
+
+	def file_contexts(self) -> Path:
+		policy_type = self._selinux_config().get('SELINUXTYPE', 'targeted')
+		file_contexts = self.target / 'etc/selinux' / policy_type / 'contexts/files/file_contexts'
+
+		if not file_contexts.exists():
+			raise RequirementError(f'SELinux file contexts of the target not found: {file_contexts}')
+
+		return file_contexts
+
+	def _setfiles(self, file_contexts: Path, unit: LabelUnit) -> None:
+		# -m: the host kernel may not report seclabel for the target mounts
+		# -F: reset the full context, the copy did not keep any labels
+		# -0 -f -: the paths are read from stdin, a unit of unlabeled files can be long
+		cmd = ['setfiles', '-r', str(self.target), '-m', '-F', '-0', '-f', '-']
+		for path in unit.excludes:
+			cmd += ['-e', path]
+		cmd.append(str(file_contexts))
+
+		run(cmd, input_data=b'\0'.join(os.fsencode(path) for path in unit.paths) + b'\0')
+
+	def _label_unit(self, file_contexts: Path, unit: LabelUnit, stats: MountLabelStats) -> None:
+		start = time.monotonic()
+		self._setfiles(file_contexts, unit)
+		elapsed = time.monotonic() - start
+
+		debug(f'Labeled {unit.files} entries below {", ".join(unit.paths)} in {elapsed:.1f}s')
+
+		with self._stats_lock:
+			stats.files += unit.files
+			stats.units += 1
+
+	def label(self) -> list[MountLabelStats]:
+		if not shutil.which('setfiles'):
+			raise RequirementError('setfiles is not available on the installation medium')
+
+		file_contexts = self.file_contexts()
+		all_stats: list[MountLabelStats] = []
+		jobs: list[tuple[LabelUnit, MountLabelStats]] = []
+
+		mounts = target_mounts(self.target)
+		nested = {str(mount.path) for mount in mounts}
+
+		for mount in mounts:
+			stats = MountLabelStats(mount.path, mount.fs_type)
+			all_stats.append(stats)
+
+			if mount.fs_type in _NO_XATTR_FSTYPES:
+				stats.skipped = 'no extended attributes'
+			elif mount.fs_type in API_FSTYPES:
+				stats.skipped = 'API filesystem'
+			elif mount.path in self.preserved:
+				jobs += [(unit, stats) for unit in _split_paths(find_unlabeled(str(mount.path), nested, self.changed_since), self.workers)]
+			else:
+				jobs += [(unit, stats) for unit in plan_units(scan_tree(str(mount.path), nested), self.workers)]
+
+		start = time.monotonic()
+		started: dict[Path, float] = {}
+
+		def label_unit(unit: LabelUnit, stats: MountLabelStats) -> None:
+			with self._stats_lock:
+				started.setdefault(stats.mountpoint, time.monotonic())
+
+			self._label_unit(file_contexts, unit, stats)
+
+			with self._stats_lock:
+				stats.elapsed = time.monotonic() - started[stats.mountpoint]
+
+		with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='setfiles') as executor:
+			futures = [executor.submit(label_unit, unit, stats) for unit, stats in jobs]
+
+			for future in as_completed(futures):
+				future.result()
+
+		for stats in all_stats:
+			if stats.skipped:
+				info(f'SELinux labeling skipped {stats.mountpoint} ({stats.fs_type}): {stats.skipped}')
+			else:
+				info(f'SELinux labeled {stats.files} entries on {stats.mountpoint} ({stats.fs_type}) with {stats.units} units in {stats.elapsed:.1f}s')
+
+		info(f'SELinux labeling finished in {time.monotonic() - start:.1f}s with {self.workers} workers')
+
+		return all_stats
@@ -0,0 +1,115 @@
+# Arch Linux install script (archinstall)
+# Copyright (C) 2021-2023 Arch Linux
+#
+# This file is part of archinstall.
+# This file is licensed under the GNU General Public License version 3.
+# Refer to the `LICENSE` file for further details.
+
+# Modified for openEuler Installation by Liu Wang in 2025
+
+from __future__ import annotations
+
+import builtins
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any
+
+# only the standard library is imported here, this module is loaded before everything it measures
+
+
+def _absolute_name(name: str, globals: dict[str, Any] | None, level: int) -> str:
+	if level == 0 or not globals:
+		return name
+
+	package = globals.get('__package__') or ''
+	base = package.rsplit('.', level - 1)[0] if level > 1 else package
+	return f'{base}.{name}' if name else base
+
+
+class StartupProfile:
+	"""
+	Time spent in each first import of a module (excluding the modules it imports itself) and
+	in the initialization steps before the script runs, printed with --profile-startup.
+
+	Imports are traced through builtins.__import__ on the main thread only.
+	"""
+
+	def __init__(self) -> None:
+		self.start = time.perf_counter()
+		self.imports: dict[str, float] = {}
+		self.steps: list[tuple[str, float]] = []
+		self._nested: list[float] = []
+		self._thread = threading.get_ident()
+		self._original_import: Any = None
+
+	def trace_imports(self) -> None:
+		if self._original_import is not None:
+			return
+
+		original = self._original_import = builtins.__import__
+
+		def timed_import(
+			name: str,
+			globals: dict[str, Any] | None = None,
+			locals: dict[str, Any] | None = None,
+			fromlist: tuple[str, ...] = (),
+			level: int = 0,
+		) -> ModuleType:
+			if threading.get_ident() != self._thread:
+				return original(name, globals, locals, fromlist, level)
+
+			module = _absolute_name(name, globals, level)
+			if module in sys.modules:
+				return original(name, globals, locals, fromlist, level)
+
+			self._nested.append(0.0)
+			start = time.perf_counter()
+
+			try:
+				return original(name, globals, locals, fromlist, level)
+			finally:
+				elapsed = time.perf_counter() - start
+				nested = self._nested.pop()
+				self.imports[module] = self.imports.get(module, 0.0) + elapsed - nested
+
+				if self._nested:
+					self._nested[-1] += elapsed
+
+		builtins.__import__ = timed_import
+
+	def stop_tracing(self) -> None:
+		if self._original_import is not None:
+			builtins.__import__ = self._original_import
+			self._original_import = None
+
+	@contextmanager
+	def step(self, name: str) -> Iterator[None]:
+		start = time.perf_counter()
+
+		try:
+			yield
+		finally:
+			self.steps.append((name, time.perf_counter() - start))
+
+	def summary(self, limit: int = 20) -> str:
+		total = time.perf_counter() - self.start
+		slowest = sorted(self.imports.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+		lines = [f'Startup took {total:.3f}s', f'{"import (self time)":<60} {"s":>8}']
+		lines += [f'{module[:60]:<60} {elapsed:>8.3f}' for module, elapsed in slowest]
+		lines.append(f'{"all imports":<60} {sum(self.imports.values()):>8.3f}')
+		lines.append(f'{"initialization step":<60} {"s":>8}')
+		lines += [f'{name[:60]:<60} {elapsed:>8.3f}' for name, elapsed in self.steps]
+
+		return '\n'.join(lines)
+
+
+startup_profile = StartupProfile()
+
+# the flag is checked before the arguments are parsed, parsing needs most of the imports to be measured
+if '--profile-startup' in sys.argv:
+	startup_profile.trace_imports()
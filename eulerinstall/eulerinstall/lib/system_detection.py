@@ -9,18 +9,105 @@
 
 import os
 import subprocess
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Literal
+from typing import ClassVar, Literal
 
 from .output import debug, info
 
+DistroType = Literal['arch', 'openEuler', 'ubuntu', 'debian', 'unknown']
+
+
+@dataclass(frozen=True)
+class HostProfile:
+    """当前系统的发行版以及由此确定的命令、锁文件和服务名称"""
+
+    distro: DistroType
+    package_manager: str
+    install_command: str
+    sync_command: str
+    chroot_command: str
+    lock_file: Path
+    mirror_service: str
+    keyring_service: str
+    time_sync_command: str = 'timedatectl show --property=NTPSynchronized --value'
+
+    @staticmethod
+    def for_distro(distro: DistroType) -> 'HostProfile':
+        """根据发行版类型生成主机配置"""
+        match distro:
+            case 'arch':
+                return HostProfile(
+                    distro=distro,
+                    package_manager='pacman',
+                    install_command='pacstrap',
+                    sync_command='pacman -Syy',
+                    chroot_command='arch-chroot',
+                    lock_file=Path('/var/lib/pacman/db.lck'),
+                    mirror_service='reflector',
+                    keyring_service='archlinux-keyring-wkd-sync',
+                )
+            case 'openEuler':
+                return HostProfile(
+                    distro=distro,
+                    package_manager='dnf',
+                    install_command='dnf',
+                    sync_command='dnf makecache',
+                    chroot_command='chroot',
+                    lock_file=Path('/var/lib/dnf/dnf.lock'),
+                    mirror_service='dnf-makecache.timer',
+                    keyring_service='gpg-agent',
+                )
+            case 'ubuntu' | 'debian':
+                return HostProfile(
+                    distro=distro,
+                    package_manager='apt',
+                    install_command='debootstrap',
+                    sync_command='apt update',
+                    chroot_command='arch-chroot',
+                    lock_file=Path('/var/lib/pacman/db.lck'),
+                    mirror_service='apt-daily.timer',
+                    keyring_service='gpg-agent',
+                )
+            case _:
+                return HostProfile(
+                    distro='unknown',
+                    package_manager='unknown',
+                    install_command='unknown',
+                    sync_command='unknown',
+                    chroot_command='arch-chroot',
+                    lock_file=Path('/var/lib/pacman/db.lck'),
+                    mirror_service='unknown',
+                    keyring_service='unknown',
+                )
+
 
 class SystemType:
     """检测当前运行的操作系统类型"""
-    
+
+    # 检测结果在进程内只计算一次
+    _host_profile: ClassVar[HostProfile | None] = None
+
+    @classmethod
+    def host_profile(cls) -> HostProfile:
+        """返回当前系统的主机配置，首次调用时进行检测"""
+        if cls._host_profile is None:
+            cls._host_profile = HostProfile.for_distro(cls._detect_distro())
+        return cls._host_profile
+
+    @classmethod
+    def set_host_profile(cls, profile: HostProfile | None) -> None:
+        """指定主机配置（例如用于测试），传入 None 时下次调用重新检测"""
+        cls._host_profile = profile
+
     @staticmethod
-    def detect() -> Literal['arch', 'openEuler', 'ubuntu', 'debian', 'unknown']:
+    def detect() -> DistroType:
         """检测当前操作系统类型"""
+        return SystemType.host_profile().distro
+
+    @staticmethod
+    def _detect_distro() -> DistroType:
+        """检测当前操作系统类型（不使用缓存）"""
         try:
             # 检查 /etc/os-release 文件
             if Path('/etc/os-release').exists():
@@ -28,7 +115,7 @@ class SystemType:
                     content = f.read().lower()
                     if 'arch' in content:
                         return 'arch'
-                    elif 'openEuler' in content:
+                    elif 'openeuler' in content:
                         return 'openEuler'
                     elif 'ubuntu' in content:
                         return 'ubuntu'
@@ -52,92 +139,32 @@ class SystemType:
     @staticmethod
     def get_package_manager() -> str:
         """获取当前系统的包管理器"""
-        system_type = SystemType.detect()
-        
-        match system_type:
-            case 'arch':
-                return 'pacman'
-            case 'openEuler':
-                return 'dnf'
-            case 'ubuntu' | 'debian':
-                return 'apt'
-            case _:
-                return 'unknown'
+        return SystemType.host_profile().package_manager
     
     @staticmethod
     def get_install_command() -> str:
         """获取安装命令"""
-        system_type = SystemType.detect()
-        
-        match system_type:
-            case 'arch':
-                return 'pacstrap'
-            case 'openEuler':
-                return 'dnf'
-            case 'ubuntu' | 'debian':
-                return 'debootstrap'
-            case _:
-                return 'unknown'
+        return SystemType.host_profile().install_command
     
     @staticmethod
     def get_sync_command() -> str:
         """获取同步命令"""
-        system_type = SystemType.detect()
-        
-        match system_type:
-            case 'arch':
-                return 'pacman -Syy'
-            case 'openEuler':
-                return 'dnf makecache'
-            case 'ubuntu' | 'debian':
-                return 'apt update'
-            case _:
-                return 'unknown'
+        return SystemType.host_profile().sync_command
     
     @staticmethod
     def get_time_sync_command() -> str:
         """获取时间同步命令"""
-        system_type = SystemType.detect()
-        
-        match system_type:
-            case 'arch':
-                return 'timedatectl show --property=NTPSynchronized --value'
-            case 'openEuler':
-                return 'timedatectl show --property=NTPSynchronized --value'
-            case 'ubuntu' | 'debian':
-                return 'timedatectl show --property=NTPSynchronized --value'
-            case _:
-                return 'timedatectl show --property=NTPSynchronized --value'
+        return SystemType.host_profile().time_sync_command
     
     @staticmethod
     def get_mirror_service() -> str:
         """获取镜像服务名称"""
-        system_type = SystemType.detect()
-        
-        match system_type:
-            case 'arch':
-                return 'reflector'
-            case 'openEuler':
-                return 'dnf-makecache.timer'
-            case 'ubuntu' | 'debian':
-                return 'apt-daily.timer'
-            case _:
-                return 'unknown'
+        return SystemType.host_profile().mirror_service
     
     @staticmethod
     def get_keyring_service() -> str:
         """获取密钥环服务名称"""
-        system_type = SystemType.detect()
-        
-        match system_type:
-            case 'arch':
-                return 'archlinux-keyring-wkd-sync'
-            case 'openEuler':
-                return 'gpg-agent'
-            case 'ubuntu' | 'debian':
-                return 'gpg-agent'
-            case _:
-                return 'unknown'
+        return SystemType.host_profile().keyring_service
     
     @staticmethod
     def is_supported() -> bool:
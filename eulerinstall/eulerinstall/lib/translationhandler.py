@@ -13,7 +13,8 @@ import builtins
 import gettext
 import json
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
 import sys
 
@@ -27,9 +28,17 @@ else:
 class Language:
 	abbr: str
 	name_en: str
-	translation: gettext.NullTranslations
-	translation_percent: int
 	translated_lang: str | None
+	handler: TranslationHandler = field(repr=False, compare=False)
+
+	@cached_property
+	def translation(self) -> gettext.NullTranslations:
+		"""The catalog is only read once the language is used"""
+		return self.handler.load_translation(self)
+
+	@cached_property
+	def translation_percent(self) -> int:
+		return self.handler.translation_percent(self)
 
 	@property
 	def display_name(self) -> str:
@@ -52,16 +61,19 @@ class TranslationHandler:
 		self._base_pot = 'base.pot'
 		self._languages = 'languages.json'
 
-		self._total_messages = self._get_total_active_messages()
-		self._translated_languages = self._get_translations()
+		# languages are listed on first use, catalogs are loaded per language when needed
+		self._total_messages: int | None = None
+		self._translated_languages: list[Language] | None = None
 
 	@property
 	def translated_languages(self) -> list[Language]:
+		if self._translated_languages is None:
+			self._translated_languages = self._get_translations()
 		return self._translated_languages
 
 	def _get_translations(self) -> list[Language]:
 		"""
-		Load all translated languages and return a list of such
+		List all translated languages without loading their catalogs
 		"""
 		mappings = self._load_language_mappings()
 		defined_languages = self._provided_translations()
@@ -74,25 +86,33 @@ class TranslationHandler:
 			lang = mapping_entry['lang']
 			translated_lang = mapping_entry.get('translated_lang', None)
 
-			try:
-				# get a translation for a specific language
-				translation = gettext.translation('base', localedir=self._get_locales_dir(), languages=(abbr, lang))
+			languages.append(Language(abbr, lang, translated_lang, self))
 
-				# calculate the percentage of total translated text to total number of messages
-				if abbr == 'en':
-					percent = 100
-				else:
-					num_translations = self._get_catalog_size(translation)
-					percent = int((num_translations / self._total_messages) * 100)
-					# prevent cases where the .pot file is out of date and the percentage is above 100
-					percent = min(100, percent)
+		return languages
 
-				language = Language(abbr, lang, translation, percent, translated_lang)
-				languages.append(language)
-			except FileNotFoundError as err:
-				raise FileNotFoundError(f"Could not locate language file for '{lang}': {err}")
+	def load_translation(self, language: Language) -> gettext.NullTranslations:
+		"""
+		Load the catalog of a specific language
+		"""
+		try:
+			return gettext.translation('base', localedir=self._get_locales_dir(), languages=(language.abbr, language.name_en))
+		except FileNotFoundError as err:
+			raise FileNotFoundError(f"Could not locate language file for '{language.name_en}': {err}")
 
-		return languages
+	def translation_percent(self, language: Language) -> int:
+		"""
+		Percentage of total translated text to total number of messages
+		"""
+		if language.abbr == 'en':
+			return 100
+
+		if self._total_messages is None:
+			self._total_messages = self._get_total_active_messages()
+
+		num_translations = self._get_catalog_size(language.translation)
+		percent = int((num_translations / self._total_messages) * 100)
+		# prevent cases where the .pot file is out of date and the percentage is above 100
+		return min(100, percent)
 
 	def _load_language_mappings(self) -> list[dict[str, str]]:
 		"""
@@ -130,7 +150,7 @@ class TranslationHandler:
 		Get a language object by it's name, e.g. English
 		"""
 		try:
-			return next(filter(lambda x: x.name_en == name, self._translated_languages))
+			return next(filter(lambda x: x.name_en == name, self.translated_languages))
 		except Exception:
 			raise ValueError(f'No language with name found: {name}')
 
@@ -139,7 +159,7 @@ class TranslationHandler:
 		Get a language object by its abbreviation, e.g. en
 		"""
 		try:
-			return next(filter(lambda x: x.abbr == abbr, self._translated_languages))
+			return next(filter(lambda x: x.abbr == abbr, self.translated_languages))
 		except Exception:
 			raise ValueError(f'No language with abbreviation "{abbr}" found')
 
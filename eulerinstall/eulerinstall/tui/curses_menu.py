@@ -19,7 +19,7 @@ from curses.ascii import isprint
 from curses.textpad import Textbox
 from types import FrameType, TracebackType
 import sys
-from typing import Literal, TypeVar, Generic
+from typing import Any, Literal, TypeVar, Generic
 
 if sys.version_info >= (3, 12):
     from typing import override
@@ -751,6 +751,11 @@ class SelectMenu(AbstractCurses[ValueT]):
 
 		self._prev_scroll_pos: int = 0
 
+		# preview lines per item together with the value they were rendered for
+		self._preview_cache: dict[int, tuple[Any, list[str]]] = {}
+		# what each viewport shows at the moment, unchanged viewports are not redrawn
+		self._rendered: dict[Viewport, tuple[Any, ...]] = {}
+
 		self._visible_entries: list[ViewportEntry] = []
 		self._max_height, self._max_width = Tui.t().max_yx
 
@@ -794,12 +799,23 @@ class SelectMenu(AbstractCurses[ValueT]):
 				if self._handle_interrupt():
 					return Result(ResultType.Reset, None)
 				else:
+					# the confirmation menu was drawn over this one
+					self._invalidate()
 					return self.kickoff(win)
 
 	@override
 	def resize_win(self) -> None:
+		self._invalidate()
 		self._draw()
 
+	def _invalidate(self) -> None:
+		"""
+		Forget the cached previews and redraw every viewport on the next draw, used after
+		values may have changed or something else was drawn on the screen
+		"""
+		self._preview_cache.clear()
+		self._rendered.clear()
+
 	def _clear_all(self) -> None:
 		self.clear_help_win()
 
@@ -814,6 +830,8 @@ class SelectMenu(AbstractCurses[ValueT]):
 		if self._title_vp:
 			self._title_vp.erase()
 
+		self._rendered.clear()
+
 	def _footer_entries(self) -> list[ViewportEntry]:
 		if self._active_search:
 			filter_pattern = self._item_group.filter_pattern
@@ -986,11 +1004,15 @@ class SelectMenu(AbstractCurses[ValueT]):
 		viewport: Viewport,
 		entries: list[ViewportEntry],
 		cur_pos: int = 0,
+		scroll_pos: int | None = None,
 	) -> None:
-		if entries:
-			viewport.update(entries, cur_pos=cur_pos)
-		else:
-			viewport.update([])
+		state = (tuple((e.text, e.row, e.col, e.style) for e in entries), cur_pos, scroll_pos)
+
+		if self._rendered.get(viewport) == state:
+			return
+
+		self._rendered[viewport] = state
+		viewport.update(entries, cur_pos=cur_pos, scroll_pos=scroll_pos)
 
 	def _get_col_widths(self, items: list[list[MenuItem]]) -> list[int]:
 		cols_widths = self._calc_col_widths(items, self._horizontal_cols)
@@ -1053,6 +1075,23 @@ class SelectMenu(AbstractCurses[ValueT]):
 		item_text += self._item_group.get_item_text(item)
 		return item_text
 
+	def _preview_lines(self, item: MenuItem) -> list[str]:
+		"""
+		The preview of an item is only rendered again once its value changed,
+		moving the cursor or scrolling reuses the lines
+		"""
+		assert item.preview_action is not None
+
+		cached = self._preview_cache.get(id(item))
+		if cached is not None and cached[0] is item.value:
+			return cached[1]
+
+		action_text = item.preview_action(item)
+		lines = action_text.split('\n') if action_text else []
+
+		self._preview_cache[id(item)] = (item.value, lines)
+		return lines
+
 	def _update_preview(self) -> None:
 		if not self._preview_vp:
 			return
@@ -1060,26 +1099,23 @@ class SelectMenu(AbstractCurses[ValueT]):
 		focus_item = self._item_group.focus_item
 
 		if not focus_item or focus_item.preview_action is None:
-			self._preview_vp.update([])
+			self._update_viewport(self._preview_vp, [])
 			return
 
-		action_text = focus_item.preview_action(focus_item)
+		preview_lines = self._preview_lines(focus_item)
 
-		if not action_text:
-			self._preview_vp.update([])
+		if not preview_lines:
+			self._update_viewport(self._preview_vp, [])
 			return
 
-		preview_text = action_text.split('\n')
-		entries = [ViewportEntry(e, idx, 0, STYLE.NORMAL) for idx, e in enumerate(preview_text)]
-
-		total_prev_rows = max([e.row for e in entries]) + 1  # rows start with 0 and we need the count
+		total_prev_rows = len(preview_lines)
 		available_rows = self._preview_vp.height - 2  # for the preview frame
 
-		self._calc_prev_scroll_pos(entries, total_prev_rows)
-		prev_entries = self._get_scroll_win_prev_entries(entries, total_prev_rows, available_rows)
+		self._calc_prev_scroll_pos(total_prev_rows)
+		prev_entries = self._get_scroll_win_prev_entries(preview_lines, total_prev_rows, available_rows)
 		scroll_pct = self._get_scroll_pct(total_prev_rows, available_rows)
 
-		self._preview_vp.update(prev_entries, scroll_pos=scroll_pct)
+		self._update_viewport(self._preview_vp, prev_entries, scroll_pos=scroll_pct)
 
 	def _get_scroll_pct(
 		self,
@@ -1103,7 +1139,7 @@ class SelectMenu(AbstractCurses[ValueT]):
 
 	def _get_scroll_win_prev_entries(
 		self,
-		entries: list[ViewportEntry],
+		lines: list[str],
 		total_prev_rows: int,
 		available_rows: int,
 	) -> list[ViewportEntry]:
@@ -1119,17 +1155,11 @@ class SelectMenu(AbstractCurses[ValueT]):
 		if end_row > total_prev_rows:
 			end_row = total_prev_rows
 
-		prev_entries = [e for e in entries if start_row <= e.row < end_row]
-
-		# normalize the rows
-		for e in prev_entries:
-			e.row -= start_row
-
-		return prev_entries
+		# only the visible rows become entries, with rows relative to the window
+		return [ViewportEntry(lines[row], row - start_row, 0, STYLE.NORMAL) for row in range(max(start_row, 0), end_row)]
 
 	def _calc_prev_scroll_pos(
 		self,
-		entries: list[ViewportEntry],
 		total_prev_rows: int,
 	) -> None:
 		if self._prev_scroll_pos >= total_prev_rows:
@@ -1202,6 +1232,8 @@ class SelectMenu(AbstractCurses[ValueT]):
 					if item:
 						if item.action:
 							item.value = item.action(item.value)
+							# the action ran its own menus and may have changed other items as well
+							self._invalidate()
 
 						if self._item_group.is_mandatory_fulfilled():
 							return Result(ResultType.Selection, self._item_group.focus_item)
@@ -1218,6 +1250,7 @@ class SelectMenu(AbstractCurses[ValueT]):
 			case MenuKeys.MULTI_SELECT:
 				if self._multi:
 					self._item_group.select_current_item()
+					self._preview_cache.clear()
 			case MenuKeys.ENABLE_SEARCH:
 				if self._search_enabled and not self._active_search:
 					self._active_search = True
@@ -0,0 +1,130 @@
+"""
+Test module for eulerinstall.lib.disk.block_deploy
+"""
+from pathlib import Path
+
+from eulerinstall.lib.disk.block_deploy import BlockDeployer, find_block_deploy_target
+from eulerinstall.lib.models.device import (
+    DeployMode,
+    DeviceModification,
+    DiskEncryption,
+    DiskLayoutConfiguration,
+    DiskLayoutType,
+    EncryptionType,
+    FilesystemType,
+    LvmConfiguration,
+    LvmLayoutType,
+    ModificationStatus,
+    PartitionModification,
+    PartitionType,
+    SectorSize,
+    Size,
+    Unit,
+)
+
+
+def _partition(
+    mountpoint: str | None,
+    fs_type: FilesystemType = FilesystemType.Ext4,
+    status: ModificationStatus = ModificationStatus.Create,
+) -> PartitionModification:
+    return PartitionModification(
+        status=status,
+        type=PartitionType.Primary,
+        start=Size(1, Unit.MiB, SectorSize.default()),
+        length=Size(10, Unit.GiB, SectorSize.default()),
+        fs_type=fs_type,
+        mountpoint=Path(mountpoint) if mountpoint else None,
+        dev_path=Path('/dev/sda2'),
+    )
+
+
+def _config(*partitions: PartitionModification) -> DiskLayoutConfiguration:
+    # the device itself is not looked at when picking the target
+    modification = DeviceModification(device=None, wipe=True, partitions=list(partitions))  # type: ignore[arg-type]
+    return DiskLayoutConfiguration(config_type=DiskLayoutType.Default, device_modifications=[modification])
+
+
+class TestFindBlockDeployTarget:
+    """Test find_block_deploy_target function."""
+
+    def test_plain_root(self) -> None:
+        """A formatted ext4 or xfs root partition should be the target."""
+        root = _partition('/', FilesystemType.Xfs)
+
+        assert find_block_deploy_target(_config(_partition('/boot', FilesystemType.Fat32), root)) is root
+
+    def test_unsupported_filesystem(self) -> None:
+        """Other root filesystems should not be written block by block."""
+        assert find_block_deploy_target(_config(_partition('/', FilesystemType.Btrfs))) is None
+
+    def test_existing_root(self) -> None:
+        """A root partition which is not formatted by the installer should be kept."""
+        assert find_block_deploy_target(_config(_partition('/', status=ModificationStatus.Exist))) is None
+
+    def test_no_root(self) -> None:
+        """Without a root partition there is no target."""
+        assert find_block_deploy_target(_config(_partition('/home'))) is None
+
+    def test_encryption_and_lvm(self) -> None:
+        """Encrypted and LVM layouts should not be written block by block."""
+        root = _partition('/')
+
+        encrypted = _config(root)
+        encrypted.disk_encryption = DiskEncryption(EncryptionType.Luks, partitions=[root])
+        assert find_block_deploy_target(encrypted) is None
+
+        lvm = _config(root)
+        lvm.lvm_config = LvmConfiguration(LvmLayoutType.Default, [])
+        assert find_block_deploy_target(lvm) is None
+
+    def test_pre_mounted(self) -> None:
+        """Pre-mounted configurations should not be written block by block."""
+        config = DiskLayoutConfiguration(config_type=DiskLayoutType.Pre_mount, mountpoint=Path('/mnt'))
+
+        assert find_block_deploy_target(config) is None
+
+
+class TestDeployMode:
+    """Test the deploy mode of the disk layout configuration."""
+
+    def test_json_round_trip(self) -> None:
+        """The block mode should survive json and parse_arg, the default is not written."""
+        config = DiskLayoutConfiguration(config_type=DiskLayoutType.Default, deploy_mode=DeployMode.Block)
+        serialized = config.json()
+
+        assert serialized['deploy_mode'] == 'block'
+
+        parsed = DiskLayoutConfiguration.parse_arg(serialized)
+        assert parsed is not None
+        assert parsed.deploy_mode == DeployMode.Block
+
+    def test_default_file_mode(self) -> None:
+        """Without a deploy mode the image should be copied file by file."""
+        serialized = DiskLayoutConfiguration(config_type=DiskLayoutType.Default).json()
+
+        assert 'deploy_mode' not in serialized
+
+        parsed = DiskLayoutConfiguration.parse_arg(serialized)
+        assert parsed is not None
+        assert parsed.deploy_mode == DeployMode.File
+
+
+class TestClearImageState:
+    """Test the cleanup of the written root filesystem."""
+
+    def test_per_installation_files_removed(self, tmp_path: Path) -> None:
+        """machine-id, temporary files and logs of the image should not be kept."""
+        (tmp_path / 'etc').mkdir()
+        (tmp_path / 'etc/machine-id').write_text('0123456789abcdef\n')
+        (tmp_path / 'etc/hostname').write_text('openeuler\n')
+        (tmp_path / 'tmp/build').mkdir(parents=True)
+        (tmp_path / 'var/log/journal').mkdir(parents=True)
+        (tmp_path / 'var/log/messages').write_text('boot\n')
+
+        BlockDeployer(tmp_path / 'rootfs.img', _partition('/'), [])._clear_image_state(tmp_path)
+
+        assert not (tmp_path / 'etc/machine-id').exists()
+        assert (tmp_path / 'etc/hostname').exists()
+        assert list((tmp_path / 'tmp').iterdir()) == []
+        assert list((tmp_path / 'var/log').iterdir()) == []
@@ -0,0 +1,96 @@
+"""
+Test module for eulerinstall.lib.disk.btrfs
+"""
+import errno
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from eulerinstall.lib.disk import btrfs
+from eulerinstall.lib.disk.btrfs import (
+    FS_COMPR_FL,
+    FS_NOCOW_FL,
+    SubvolumeBuilder,
+    getflags_request,
+    setflags_request,
+    subvol_create_args,
+    subvol_create_request,
+    with_attributes,
+)
+from eulerinstall.lib.exceptions import DiskError
+
+
+class TestIoctlRequests:
+    """Test the ioctl request numbers."""
+
+    def test_x86_64(self) -> None:
+        """The numbers should match the kernel headers."""
+        assert subvol_create_request('x86_64') == 0x5000940E
+        assert getflags_request('x86_64') == 0x80086601
+        assert setflags_request('x86_64') == 0x40086602
+
+    def test_powerpc(self) -> None:
+        """powerpc uses other direction bits."""
+        assert subvol_create_request('ppc64le') == 0x9000940E
+        assert setflags_request('ppc64le') == 0x80086602
+
+
+class TestSubvolCreateArgs:
+    """Test subvol_create_args and with_attributes functions."""
+
+    def test_packed(self) -> None:
+        """The name should follow the fd field and be zero padded."""
+        args = subvol_create_args('@home')
+
+        assert len(args) == 4096
+        assert args[8:14] == b'@home\0'
+
+    @pytest.mark.parametrize('name', ['', 'a/b', 'x' * 4088])
+    def test_invalid_name(self, name: str) -> None:
+        """Empty, nested and too long names should raise."""
+        with pytest.raises(DiskError):
+            subvol_create_args(name)
+
+    def test_attributes(self) -> None:
+        """Attributes should be added to the existing flags."""
+        assert with_attributes(0x10, nodatacow=True, compress=False) == 0x10 | FS_NOCOW_FL
+        assert with_attributes(0, nodatacow=True, compress=True) == FS_NOCOW_FL | FS_COMPR_FL
+        assert with_attributes(0x10, nodatacow=False, compress=False) == 0x10
+
+
+class TestSubvolumeBuilder:
+    """Test the ioctl errors of SubvolumeBuilder."""
+
+    @staticmethod
+    def _failing_ioctl(code: int) -> Any:
+        def ioctl(fd: int, request: int, arg: Any) -> Any:
+            raise OSError(code, 'ioctl failed')
+
+        return ioctl
+
+    def test_unsupported_falls_back(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """A missing ioctl should switch to chattr for this and every later subvolume."""
+        commands: list[list[str]] = []
+        monkeypatch.setattr(btrfs.fcntl, 'ioctl', self._failing_ioctl(errno.ENOTTY))
+        monkeypatch.setattr(btrfs, 'SysCommand', commands.append)
+
+        builder = SubvolumeBuilder(tmp_path)
+        builder.set_attributes(tmp_path, nodatacow=True, compress=False)
+        builder.set_attributes(tmp_path, nodatacow=False, compress=True)
+
+        assert commands == [['chattr', '+C', str(tmp_path)], ['chattr', '+c', str(tmp_path)]]
+
+    def test_rejected_flags_raise(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """EINVAL rejects the flags, it should raise and keep the ioctl for later subvolumes."""
+        commands: list[list[str]] = []
+        monkeypatch.setattr(btrfs.fcntl, 'ioctl', self._failing_ioctl(errno.EINVAL))
+        monkeypatch.setattr(btrfs, 'SysCommand', commands.append)
+
+        builder = SubvolumeBuilder(tmp_path)
+
+        with pytest.raises(DiskError):
+            builder.set_attributes(tmp_path, nodatacow=True, compress=True)
+
+        assert commands == []
+        assert builder._native_flags
@@ -0,0 +1,67 @@
+"""
+Test module for eulerinstall.lib.chroot
+"""
+import os
+from pathlib import Path
+
+import pytest
+
+from eulerinstall.lib import chroot
+from eulerinstall.lib.chroot import ChrootSession
+from eulerinstall.lib.exceptions import SysCallError
+
+
+@pytest.mark.skipif(os.geteuid() != 0, reason='chroot requires root')
+class TestChrootSession:
+    """Test ChrootSession class, chrooting into / as target."""
+
+    def test_batch_results(self) -> None:
+        """Every command of a batch should get its own output and exit code."""
+        with ChrootSession(Path('/')) as session:
+            results = session.run_batch(['echo hello', 'false', 'printf abc', 'echo err >&2; exit 3'])
+
+        assert [result.exit_code for result in results] == [0, 1, 0, 3]
+        assert [result.output for result in results] == [b'hello\n', b'', b'abc', b'err\n']
+
+    def test_commands_are_isolated(self) -> None:
+        """A command changing directory or exiting should not affect the session."""
+        with ChrootSession(Path('/')) as session:
+            session.run('cd /tmp; exit 0')
+            result = session.run('pwd')
+
+            assert result.decode() == '/'
+            assert session.running
+
+    def test_input_data(self) -> None:
+        """Input data should be passed to the command's stdin."""
+        with ChrootSession(Path('/')) as session:
+            result = session.run('cat', input_data=b'root:secret')
+
+        assert result.output == b'root:secret\n'
+
+    def test_check_raises(self) -> None:
+        """A failing command should raise with check=True."""
+        with ChrootSession(Path('/')) as session:
+            with pytest.raises(SysCallError) as err:
+                session.run('exit 4')
+
+        assert err.value.exit_code == 4
+
+    def test_commands_are_logged(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Every batched command should be recorded in the command history."""
+        spawned: list[list[str]] = []
+        history: list[list[str]] = []
+        monkeypatch.setattr(chroot, '_cmd_history', spawned.append)
+        monkeypatch.setattr(chroot, '_log_cmd', history.append)
+
+        with ChrootSession(Path('/')) as session:
+            session.run_batch(['true', 'echo hello'])
+            session.run('true')
+
+        # only the session itself is a process of its own
+        assert spawned == [['chroot', '/', '/bin/sh']]
+        assert history == [
+            ['chroot', '/', '/bin/sh', '-c', 'true'],
+            ['chroot', '/', '/bin/sh', '-c', 'echo hello'],
+            ['chroot', '/', '/bin/sh', '-c', 'true'],
+        ]
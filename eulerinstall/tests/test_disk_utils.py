@@ -0,0 +1,156 @@
+"""
+Test module for eulerinstall.lib.disk.utils
+"""
+from pathlib import Path
+
+import pytest
+
+from eulerinstall.lib.disk.utils import LsblkOutput, LsblkSnapshot, plan_lv_extents, poll_until, restrict_proc_partitions
+from eulerinstall.lib.exceptions import DiskError
+
+
+def _lsblk_entry(name: str, pkname: str | None = None, **kwargs) -> dict:
+    entry = {
+        'name': name,
+        'path': f'/dev/{name}',
+        'pkname': pkname,
+        'log-sec': 512,
+        'size': 1024 * 1024 * 1024,
+        'pttype': None,
+        'ptuuid': None,
+        'rota': False,
+        'tran': None,
+        'partn': None,
+        'partuuid': None,
+        'parttype': None,
+        'uuid': None,
+        'fstype': None,
+        'fsver': None,
+        'fsavail': None,
+        'fsuse%': None,
+        'type': 'disk',
+        'mountpoint': None,
+        'mountpoints': [None],
+        'fsroots': [None],
+        'children': [],
+    }
+    entry.update(kwargs)
+    return entry
+
+
+def _snapshot() -> LsblkSnapshot:
+    root = _lsblk_entry(
+        'sda2',
+        pkname='sda',
+        type='part',
+        partn=2,
+        uuid='root-uuid',
+        partuuid='root-partuuid',
+        fstype='ext4',
+        mountpoint='/mnt',
+        mountpoints=['/mnt'],
+    )
+    boot = _lsblk_entry('sda1', pkname='sda', type='part', partn=1, uuid='boot-uuid', mountpoints=['/mnt/boot'])
+    disk = _lsblk_entry('sda', pttype='gpt', children=[boot, root])
+
+    return LsblkSnapshot(LsblkOutput.model_validate({'blockdevices': [disk]}))
+
+
+class TestLsblkSnapshot:
+    """Test the indexes of LsblkSnapshot."""
+
+    def test_find_by_path(self) -> None:
+        """Disks and nested partitions should be found by their path."""
+        snapshot = _snapshot()
+
+        assert snapshot.find('/dev/sda').name == 'sda'
+        assert snapshot.find(Path('/dev/sda2')).name == 'sda2'
+        assert snapshot.find('/dev/sdb') is None
+
+    def test_find_keeps_children(self) -> None:
+        """An entry should carry its children like a direct lsblk call does."""
+        snapshot = _snapshot()
+
+        assert [child.name for child in snapshot.find('/dev/sda').children] == ['sda1', 'sda2']
+
+    def test_indexes(self) -> None:
+        """Mountpoint, UUID, PARTUUID and parent lookups should resolve to the same entries."""
+        snapshot = _snapshot()
+
+        assert [entry.name for entry in snapshot.by_mountpoint[Path('/mnt')]] == ['sda2']
+        assert snapshot.by_uuid['boot-uuid'].name == 'sda1'
+        assert snapshot.by_partuuid['root-partuuid'].name == 'sda2'
+        assert [entry.name for entry in snapshot.by_parent['sda']] == ['sda1', 'sda2']
+        assert len(snapshot.entries) == 3
+
+
+class TestRestrictProcPartitions:
+    """Test restrict_proc_partitions function."""
+
+    def test_only_given_devices(self) -> None:
+        """The header and the lines of the given devices should be kept."""
+        content = (
+            'major minor  #blocks  name\n'
+            '\n'
+            '   8        0   41943040 sda\n'
+            '   8        1     614400 sda1\n'
+            '   8       16 1073741824 sdb\n'
+            '   8       17 1073740800 sdb1\n'
+            ' 253        0   40000000 dm-0\n'
+        )
+
+        restricted = restrict_proc_partitions(content, {'sda', 'sda1', 'dm-0'})
+
+        assert restricted.splitlines() == [
+            'major minor  #blocks  name',
+            '',
+            '   8        0   41943040 sda',
+            '   8        1     614400 sda1',
+            ' 253        0   40000000 dm-0',
+        ]
+
+
+class TestPollUntil:
+    """Test poll_until function."""
+
+    def test_returns_first_value(self) -> None:
+        """Polling should stop as soon as the check returns a value."""
+        attempts: list[int] = []
+
+        def check() -> str | None:
+            attempts.append(1)
+            return 'ready' if len(attempts) == 3 else None
+
+        assert poll_until(check, timeout=5, what='test', initial_delay=0.001) == 'ready'
+        assert len(attempts) == 3
+
+    def test_timeout(self) -> None:
+        """A check which never succeeds should raise once the deadline passed."""
+        with pytest.raises(DiskError, match='not ready after'):
+            poll_until(lambda: None, timeout=0.05, what='test', initial_delay=0.01)
+
+
+class TestPlanLvExtents:
+    """Test plan_lv_extents function."""
+
+    MIB = 1024 * 1024
+
+    def test_largest_takes_remaining(self) -> None:
+        """Volumes should be rounded up to extents and fill the group exactly."""
+        extents = plan_lv_extents([1 * self.MIB, 100 * self.MIB, 10 * self.MIB], 4 * self.MIB, 30)
+
+        assert extents == [1, 26, 3]
+        assert sum(extents) == 30
+
+    def test_largest_shrinks(self) -> None:
+        """The largest volume should give up the space taken by the metadata."""
+        assert plan_lv_extents([512 * self.MIB, 512 * self.MIB], 4 * self.MIB, 254) == [126, 128]
+
+    def test_does_not_fit(self) -> None:
+        """Volumes which leave nothing for the largest one should raise."""
+        with pytest.raises(DiskError, match='do not fit'):
+            plan_lv_extents([8 * self.MIB, 8 * self.MIB], 4 * self.MIB, 2)
+
+    def test_no_volumes(self) -> None:
+        """A group without volumes needs no extents."""
+        assert plan_lv_extents([], 4 * self.MIB, 10) == []
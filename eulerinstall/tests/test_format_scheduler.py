@@ -0,0 +1,147 @@
+"""
+Test module for eulerinstall.lib.disk.format_scheduler
+"""
+import threading
+import time
+
+from pathlib import Path
+
+import pytest
+
+from eulerinstall.lib.disk.filesystem import FilesystemHandler
+from eulerinstall.lib.disk.format_scheduler import FormatScheduler
+from eulerinstall.lib.models.device import (
+    DiskLayoutConfiguration,
+    DiskLayoutType,
+    FilesystemType,
+    LvmConfiguration,
+    LvmLayoutType,
+    LvmVolume,
+    LvmVolumeGroup,
+    LvmVolumeStatus,
+    SectorSize,
+    Size,
+    Unit,
+)
+
+
+class TestFormatScheduler:
+    """Test FormatScheduler class."""
+
+    def test_dependencies_run_first(self) -> None:
+        """A task should only start once all its dependencies finished."""
+        order: list[str] = []
+        scheduler = FormatScheduler(max_workers=4)
+
+        pv = scheduler.add('pv', lambda: order.append('pv'))
+        vg = scheduler.add('vg', lambda: order.append('vg'), deps=[pv])
+        scheduler.add('lv1', lambda: order.append('lv1'), deps=[vg])
+        scheduler.add('lv2', lambda: order.append('lv2'), deps=[vg])
+        scheduler.run()
+
+        assert order[:2] == ['pv', 'vg']
+        assert sorted(order[2:]) == ['lv1', 'lv2']
+
+    def test_independent_tasks_run_in_parallel(self) -> None:
+        """Independent tasks should overlap in time."""
+        barrier = threading.Barrier(2, timeout=5)
+        scheduler = FormatScheduler(max_workers=2)
+
+        scheduler.add('sda1', barrier.wait)
+        scheduler.add('sdb1', barrier.wait)
+        timings = scheduler.run()
+
+        assert sorted(timing.name for timing in timings) == ['sda1', 'sdb1']
+
+    def test_locks_serialize(self) -> None:
+        """Tasks sharing a lock should never run at the same time."""
+        active = 0
+        peak = 0
+        guard = threading.Lock()
+
+        def task() -> None:
+            nonlocal active, peak
+            with guard:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with guard:
+                active -= 1
+
+        scheduler = FormatScheduler(max_workers=4)
+        for i in range(4):
+            scheduler.add(f'subvolumes {i}', task, locks=['btrfs-mount'])
+        scheduler.run()
+
+        assert peak == 1
+
+    def test_lock_limits(self) -> None:
+        """A lock with a limit should be held by at most that many tasks."""
+        active = 0
+        peak = 0
+        guard = threading.Lock()
+
+        def task() -> None:
+            nonlocal active, peak
+            with guard:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with guard:
+                active -= 1
+
+        scheduler = FormatScheduler(max_workers=4, lock_limits={'luks': 2})
+        for i in range(4):
+            scheduler.add(f'luks {i}', task, locks=['luks'])
+        scheduler.run()
+
+        assert peak == 2
+
+    def test_first_error_is_raised(self) -> None:
+        """The error of the earliest added failing task should be raised and dependents skipped."""
+        ran: list[str] = []
+
+        def fail(message: str) -> None:
+            raise ValueError(message)
+
+        scheduler = FormatScheduler(max_workers=2)
+        first = scheduler.add('first', lambda: fail('first'))
+        scheduler.add('second', lambda: fail('second'))
+        scheduler.add('after', lambda: ran.append('after'), deps=[first])
+
+        with pytest.raises(ValueError, match='first'):
+            scheduler.run()
+
+        assert ran == []
+
+    def test_unknown_dependency(self) -> None:
+        """Dependencies must refer to tasks added before."""
+        scheduler = FormatScheduler()
+
+        with pytest.raises(ValueError):
+            scheduler.add('lv', lambda: None, deps=['vg'])
+
+
+class TestLvmScheduling:
+    """Test the LVM tasks scheduled by FilesystemHandler."""
+
+    def test_fresh_volumes(self) -> None:
+        """Volumes not created yet should be scheduled under their future device path."""
+        root = LvmVolume(LvmVolumeStatus.Create, 'root', FilesystemType.Btrfs, Size(20, Unit.GiB, SectorSize.default()), Path('/'))
+        home = LvmVolume(LvmVolumeStatus.Create, 'home', FilesystemType.Ext4, Size(10, Unit.GiB, SectorSize.default()), Path('/home'))
+        lvm_config = LvmConfiguration(LvmLayoutType.Default, [LvmVolumeGroup('vg0', pvs=[], volumes=[root, home])])
+        disk_config = DiskLayoutConfiguration(DiskLayoutType.Default, lvm_config=lvm_config)
+
+        scheduler = FormatScheduler()
+        FilesystemHandler(disk_config)._schedule_lvm_operations(scheduler)
+
+        assert list(scheduler._tasks) == [
+            'lvm pvcreate',
+            'lvm vg vg0',
+            'format /dev/vg0/root',
+            'subvolumes /dev/vg0/root',
+            'format /dev/vg0/home',
+        ]
+        assert scheduler._tasks['format /dev/vg0/home'].device == '/dev/vg0/home'
+        assert scheduler._tasks['format /dev/vg0/home'].deps == ['lvm vg vg0']
+        assert root.dev_path is None
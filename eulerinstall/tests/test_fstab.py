@@ -0,0 +1,74 @@
+"""
+Test module for eulerinstall.lib.disk.fstab
+"""
+from pathlib import Path
+
+from eulerinstall.lib.disk.fstab import generate_fstab, parse_swaps
+from eulerinstall.lib.disk.mountinfo import parse_mountinfo
+
+MOUNTINFO = '''\
+22 1 253:0 / / rw,relatime shared:1 - ext4 /dev/mapper/live-rw rw,seclabel
+60 22 8:2 /@ /mnt rw,noatime shared:30 - btrfs /dev/sda2 rw,seclabel,compress=zstd:3,space_cache=v2,subvolid=256,subvol=/@
+61 60 8:2 /@home /mnt/home rw,noatime shared:31 - btrfs /dev/sda2 rw,seclabel,compress=zstd:3,space_cache=v2,subvolid=257,subvol=/@home
+62 60 8:1 / /mnt/boot/efi rw,relatime shared:32 - vfat /dev/sda1 rw,fmask=0022,dmask=0022,codepage=437,iocharset=ascii,shortname=mixed,errors=remount-ro
+63 60 8:3 / /mnt/var/lib\\040data rw,relatime shared:33 - ext4 /dev/sda3 rw,seclabel
+64 60 8:2 /@/srv/www /mnt/var/www rw,noatime shared:30 - btrfs /dev/sda2 rw,seclabel,compress=zstd:3,space_cache=v2,subvolid=256,subvol=/@
+65 60 0:5 / /mnt/dev rw,nosuid shared:2 - devtmpfs devtmpfs rw,seclabel,size=4096k
+66 60 0:22 / /mnt/proc rw,nosuid,nodev,noexec,relatime shared:12 - proc proc rw
+'''
+
+UUIDS = {
+    '/dev/sda1': '1234-ABCD',
+    '/dev/sda2': 'aaaa-btrfs',
+    '/dev/sda3': 'cccc-ext4',
+    '/dev/sda4': 'dddd-swap',
+}
+
+
+class TestParseMountinfo:
+    """Test parse_mountinfo function."""
+
+    def test_fields(self) -> None:
+        """Optional fields should be skipped and escaped paths decoded."""
+        entries = parse_mountinfo(MOUNTINFO)
+
+        assert len(entries) == 8
+        assert entries[1].root == '/@'
+        assert entries[1].super_option('subvol') == '/@'
+        assert entries[4].mountpoint == Path('/mnt/var/lib data')
+        assert entries[4].fs_type == 'ext4'
+        assert entries[4].source == '/dev/sda3'
+
+
+class TestGenerateFstab:
+    """Test generate_fstab function."""
+
+    def test_entries(self) -> None:
+        """Mounts below the target should be listed parents first with subvolumes, binds and fsck passes."""
+        swaps = parse_swaps('Filename\tType\tSize\tUsed\tPriority\n/dev/sda4 partition 1048572 0 -2\n/mnt/swapfile file 1048572 0 -3\n')
+        entries = generate_fstab(parse_mountinfo(MOUNTINFO), Path('/mnt'), UUIDS, swaps)
+
+        assert [(entry.spec, entry.file, entry.vfstype, entry.passno) for entry in entries] == [
+            ('UUID=aaaa-btrfs', '/', 'btrfs', 0),
+            ('UUID=aaaa-btrfs', '/home', 'btrfs', 0),
+            ('UUID=1234-ABCD', '/boot/efi', 'vfat', 2),
+            ('UUID=cccc-ext4', '/var/lib data', 'ext4', 2),
+            ('/srv/www', '/var/www', 'none', 0),
+            ('UUID=dddd-swap', 'none', 'swap', 0),
+            ('/swapfile', 'none', 'swap', 0),
+        ]
+
+        assert entries[1].options == 'rw,noatime,compress=zstd:3,space_cache=v2,subvol=/@home'
+        assert entries[4].options == 'bind'
+        assert entries[3].line().split()[1] == '/var/lib\\040data'
+
+    def test_root_fsck_pass(self) -> None:
+        """An ext4 root should be checked first, a device without UUID should be named by its path."""
+        mountinfo = '30 1 8:2 / /mnt rw,relatime - ext4 /dev/sdb2 rw\n31 30 8:1 / /mnt/boot rw,relatime - ext4 /dev/sdb1 rw\n'
+
+        entries = generate_fstab(parse_mountinfo(mountinfo), Path('/mnt'), {'/dev/sdb2': 'root-uuid'})
+
+        assert [(entry.spec, entry.file, entry.passno) for entry in entries] == [
+            ('UUID=root-uuid', '/', 1),
+            ('/dev/sdb1', '/boot', 2),
+        ]
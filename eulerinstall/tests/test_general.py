@@ -10,6 +10,7 @@ from unittest.mock import MagicMock, mock_open, patch
 
 import pytest
 
+from eulerinstall.lib.exceptions import SysCallError
 from eulerinstall.lib.general import (
     JSON,
     UNSAFE_JSON,
@@ -193,3 +194,42 @@ class TestJSONEncoders:
         encoded = UNSAFE_JSON().encode(data)
         decoded = json.loads(encoded)
         assert decoded == {'!secret': 'value', 'public': 'data'}
+
+
+class TestSysCommand:
+    """Test SysCommand and SysCommandWorker with real processes."""
+
+    def test_output_and_exit_code(self) -> None:
+        """Output should be captured completely and the exit code set."""
+        cmd = SysCommand(['sh', '-c', 'seq 1 50000'])
+        assert cmd.exit_code == 0
+        assert cmd.decode().splitlines()[-1] == '50000'
+        assert isinstance(cmd.output(), bytes)
+        assert cmd[:2] == b'1\r'
+
+    def test_abnormal_exit_raises(self) -> None:
+        """A non-zero exit code should raise SysCallError with the output."""
+        with pytest.raises(SysCallError) as exc_info:
+            SysCommand(['sh', '-c', 'echo failed; exit 3'])
+
+        assert exc_info.value.exit_code == 3
+        assert b'failed' in exc_info.value.worker_log
+
+    def test_background_child_does_not_block(self) -> None:
+        """A grandchild keeping the pty open should not delay the result."""
+        cmd = SysCommand(['sh', '-c', '(sleep 5 &); echo started'])
+        assert cmd.decode() == 'started'
+
+    def test_worker_write_and_wait(self) -> None:
+        """Input written to the worker should reach the command."""
+        worker = SysCommandWorker(['sh', '-c', 'read line; echo got $line'])
+        worker.write(b'abc')
+        assert worker.wait() == 0
+        assert b'got abc' in bytes(worker._trace_log)
+
+    def test_worker_wait_raises(self) -> None:
+        """wait() should raise SysCallError for a failing command."""
+        worker = SysCommandWorker(['sh', '-c', 'exit 2'])
+
+        with pytest.raises(SysCallError):
+            worker.wait()
@@ -0,0 +1,86 @@
+"""
+Test module for eulerinstall.lib.disk.holders
+"""
+from pathlib import Path
+
+from eulerinstall.lib.disk.holders import partitions_of, read_holder_graph, teardown_batches, teardown_order
+
+
+def _device(sys_block: Path, name: str, holders: tuple[str, ...] = (), parent: str | None = None, dm_name: str | None = None) -> None:
+    path = sys_block / parent / name if parent else sys_block / name
+    (path / 'holders').mkdir(parents=True)
+
+    for holder in holders:
+        (path / 'holders' / holder).touch()
+
+    if parent:
+        (path / 'partition').write_text('1\n')
+        # /sys/class/block lists partitions next to the disks as well
+        (sys_block / name).symlink_to(path)
+
+    if dm_name:
+        (path / 'dm').mkdir()
+        (path / 'dm' / 'name').write_text(f'{dm_name}\n')
+
+
+def _luks_on_lvm(sys_block: Path) -> None:
+    """sda2 is a PV of a VG with two LVs, the second one carries LUKS, sda3 is part of a RAID"""
+    _device(sys_block, 'sda')
+    _device(sys_block, 'sda1', parent='sda')
+    _device(sys_block, 'sda2', ('dm-0', 'dm-1'), parent='sda')
+    _device(sys_block, 'sda3', ('md127',), parent='sda')
+    _device(sys_block, 'dm-0', dm_name='vg-root')
+    _device(sys_block, 'dm-1', ('dm-2',), dm_name='vg-home')
+    _device(sys_block, 'dm-2', dm_name='luks-home')
+    _device(sys_block, 'md127')
+    (sys_block / 'md127' / 'md').mkdir()
+    _device(sys_block, 'sdb', ('dm-3',))
+    _device(sys_block, 'dm-3', dm_name='other')
+
+
+class TestHolderGraph:
+    """Test read_holder_graph and partitions_of functions."""
+
+    def test_graph(self, tmp_path: Path) -> None:
+        """Every device should be listed with its holders."""
+        _luks_on_lvm(tmp_path)
+        graph = read_holder_graph(tmp_path)
+
+        assert graph['sda2'] == ['dm-0', 'dm-1']
+        assert graph['dm-1'] == ['dm-2']
+        assert graph['sda1'] == []
+
+    def test_partitions(self, tmp_path: Path) -> None:
+        """Only subdirectories with a partition file are partitions."""
+        _luks_on_lvm(tmp_path)
+
+        assert partitions_of('sda', tmp_path) == ['sda1', 'sda2', 'sda3']
+        assert partitions_of('sdb', tmp_path) == []
+        assert partitions_of('missing', tmp_path) == []
+
+
+class TestTeardownOrder:
+    """Test teardown_order and teardown_batches functions."""
+
+    def test_topmost_first(self, tmp_path: Path) -> None:
+        """A device should only be removed after all devices holding it."""
+        _luks_on_lvm(tmp_path)
+        order = teardown_order(['sda', *partitions_of('sda', tmp_path)], read_holder_graph(tmp_path))
+
+        assert order == ['dm-0', 'dm-2', 'dm-1', 'md127']
+        assert 'dm-3' not in order
+
+    def test_shared_holder(self) -> None:
+        """A holder of several roots should be listed once."""
+        graph = {'sda1': ['dm-0'], 'sdb1': ['dm-0'], 'dm-0': []}
+
+        assert teardown_order(['sda1', 'sdb1'], graph) == ['dm-0']
+
+    def test_batches(self, tmp_path: Path) -> None:
+        """Consecutive devices of the same kind should share one batch."""
+        _luks_on_lvm(tmp_path)
+
+        assert teardown_batches(['dm-0', 'dm-2', 'dm-1', 'md127'], tmp_path) == [
+            ('dm', ['dm-0', 'dm-2', 'dm-1']),
+            ('md', ['md127']),
+        ]
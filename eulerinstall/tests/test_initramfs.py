@@ -0,0 +1,60 @@
+"""
+Test module for eulerinstall.lib.initramfs
+"""
+from pathlib import Path
+from subprocess import CalledProcessError
+
+from eulerinstall.lib.initramfs import InitramfsBuilder, StorageStack, dracut_args, installed_kernel_versions
+
+
+class TestDracutArgs:
+    """Test dracut_args function."""
+
+    def test_hostonly(self) -> None:
+        """A host-only build should add the drivers and modules of the storage stack."""
+        stack = StorageStack(filesystems={'xfs', 'vfat'}, modules={'lvm', 'crypt'})
+
+        assert dracut_args('6.6.0-1.oe2403.x86_64', stack) == [
+            '--force',
+            '--omit', 'multipath',
+            '--hostonly',
+            '--add-drivers', 'vfat xfs',
+            '--add', 'crypt lvm',
+            '--kver', '6.6.0-1.oe2403.x86_64',
+            '/boot/initramfs-6.6.0-1.oe2403.x86_64.img',
+        ]
+
+    def test_generic(self) -> None:
+        """A generic build should not restrict the image to this machine."""
+        args = dracut_args('6.6.0', None)
+
+        assert '--hostonly' not in args
+        assert args[-3:] == ['--kver', '6.6.0', '/boot/initramfs-6.6.0.img']
+
+
+class TestInitramfsBuilder:
+    """Test InitramfsBuilder class."""
+
+    def test_installed_kernel_versions(self, tmp_path: Path) -> None:
+        """Only module directories with modules.dep should count as kernels."""
+        for kver in ('6.6.0-2', '6.6.0-1', 'extra'):
+            (tmp_path / 'lib/modules' / kver).mkdir(parents=True)
+        (tmp_path / 'lib/modules/6.6.0-1/modules.dep').touch()
+        (tmp_path / 'lib/modules/6.6.0-2/modules.dep').touch()
+
+        assert installed_kernel_versions(tmp_path) == ['6.6.0-1', '6.6.0-2']
+
+    def test_generic_fallback(self, tmp_path: Path) -> None:
+        """A failing host-only build should be retried as a generic build."""
+        calls: list[tuple[str, bool]] = []
+
+        class Builder(InitramfsBuilder):
+            def _dracut(self, kver: str, stack: StorageStack | None) -> None:
+                calls.append((kver, stack is not None))
+                if stack is not None and kver == 'b':
+                    raise CalledProcessError(1, 'dracut', output=b'no root device')
+
+        results = Builder(tmp_path, workers=2).build(['a', 'b'], StorageStack(filesystems={'ext4'}))
+
+        assert sorted(calls) == [('a', True), ('b', False), ('b', True)]
+        assert [(result.kver, result.hostonly) for result in results] == [('a', True), ('b', False)]
@@ -0,0 +1,62 @@
+"""
+Test module for eulerinstall.lib.luks
+"""
+from pathlib import Path
+
+from eulerinstall.lib.luks import Argon2Params, kdf_concurrency, mem_available_kib, parse_argon2_benchmark
+
+BENCHMARK = '''\
+# Tests are approximate using memory only (no storage IO).
+argon2id      5 iterations, 1048576 memory, 4 parallel threads (CPUs) for 256-bit key (requested 2000 ms time)
+'''
+
+
+class TestArgon2Calibration:
+    """Test the argon2id calibration helpers."""
+
+    def test_parse_benchmark(self) -> None:
+        """The cost parameters should be read from the benchmark output."""
+        params = parse_argon2_benchmark(BENCHMARK)
+
+        assert params == Argon2Params(iterations=5, memory=1048576, parallel=4)
+        assert params.cryptsetup_args() == [
+            '--pbkdf-force-iterations',
+            '5',
+            '--pbkdf-memory',
+            '1048576',
+            '--pbkdf-parallel',
+            '4',
+        ]
+
+    def test_parse_failure(self) -> None:
+        """Unknown output should not yield parameters."""
+        assert parse_argon2_benchmark('PBKDF2-sha256 1000000 iterations per second') is None
+
+    def test_mem_available(self, tmp_path: Path) -> None:
+        """MemAvailable should be read in KiB."""
+        meminfo = tmp_path / 'meminfo'
+        meminfo.write_text('MemTotal:        8000000 kB\nMemAvailable:    6000000 kB\n')
+
+        assert mem_available_kib(meminfo) == 6000000
+        assert mem_available_kib(tmp_path / 'missing') is None
+
+
+class TestKdfConcurrency:
+    """Test kdf_concurrency function."""
+
+    def test_limited_by_memory(self) -> None:
+        """Parallel derivations must fit into half of the available memory."""
+        params = Argon2Params(5, 1048576, 4)
+
+        assert kdf_concurrency(params, 4 * 1048576, 32) == 2
+
+    def test_limited_by_cpus(self) -> None:
+        """Parallel derivations must not run more threads than there are CPUs."""
+        params = Argon2Params(5, 262144, 4)
+
+        assert kdf_concurrency(params, 16 * 1048576, 8) == 2
+
+    def test_at_least_one(self) -> None:
+        """A small live image still formats one device at a time."""
+        assert kdf_concurrency(Argon2Params(5, 1048576, 4), 1048576, 2) == 1
+        assert kdf_concurrency(None, None, 64) == 1
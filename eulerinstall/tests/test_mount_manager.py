@@ -0,0 +1,76 @@
+"""
+Test module for eulerinstall.lib.disk.mount_manager
+"""
+from pathlib import Path
+
+from eulerinstall.lib.disk.mount_manager import MountManager, MountRequest, mount_levels, split_options
+
+MOUNTINFO = """\
+22 1 0:21 / /proc rw,nosuid,nodev,noexec,relatime shared:5 - proc proc rw
+60 1 8:2 / /mnt rw,relatime shared:30 - ext4 /dev/sda2 rw,seclabel
+61 60 8:1 / /mnt/boot rw,relatime shared:31 - vfat /dev/sda1 rw,fmask=0022
+"""
+
+
+def _targets(levels: list[list[MountRequest]]) -> list[list[str]]:
+    return [[str(request.target) for request in level] for level in levels]
+
+
+class TestSplitOptions:
+    """Test split_options function."""
+
+    def test_flags_and_data(self) -> None:
+        """Generic options should become flags, the others are passed to the filesystem."""
+        flags, data = split_options(['rw', 'noatime', 'nodev', 'compress=zstd', 'subvol=@home'])
+
+        assert flags == 0x400 | 0x4
+        assert data == 'compress=zstd,subvol=@home'
+
+    def test_userspace_options(self) -> None:
+        """Options only known to mount(8) should not reach the kernel."""
+        assert split_options(['defaults', 'nofail', 'x-systemd.automount']) == (0, '')
+
+
+class TestMountLevels:
+    """Test mount_levels function."""
+
+    def test_parents_first(self) -> None:
+        """Every mount should come after its parent directories, siblings share a level."""
+        requests = [
+            MountRequest(Path('/dev/vg/home'), Path('/mnt/home')),
+            MountRequest(Path('/dev/sda1'), Path('/mnt/boot/efi')),
+            MountRequest(Path('/dev/sda2'), Path('/mnt')),
+            MountRequest(Path('/dev/sda3'), Path('/mnt/var')),
+            MountRequest(Path('/dev/sda4'), Path('/mnt/var/log')),
+        ]
+
+        assert _targets(mount_levels(requests)) == [
+            ['/mnt'],
+            ['/mnt/home', '/mnt/boot/efi', '/mnt/var'],
+            ['/mnt/var/log'],
+        ]
+
+    def test_same_target(self) -> None:
+        """A second mount on the same path should wait for the first one."""
+        requests = [MountRequest(Path('/dev/sda2'), Path('/mnt')), MountRequest(Path('/dev/sda3'), Path('/mnt'))]
+
+        assert [[str(request.source) for request in level] for level in mount_levels(requests)] == [['/dev/sda2'], ['/dev/sda3']]
+
+    def test_empty(self) -> None:
+        """No requests should give no levels."""
+        assert mount_levels([]) == []
+
+
+class TestMountState:
+    """Test the mount state read from the mount table."""
+
+    def test_is_mounted(self, tmp_path: Path) -> None:
+        """Only the same device at the same path counts as mounted."""
+        mountinfo = tmp_path / 'mountinfo'
+        mountinfo.write_text(MOUNTINFO)
+        manager = MountManager(mountinfo)
+
+        assert manager.is_mounted(Path('/dev/sda1'), Path('/mnt/boot'))
+        assert not manager.is_mounted(Path('/dev/sda1'), Path('/mnt'))
+        assert not manager.is_mounted(Path('/dev/sdb1'), Path('/mnt/data'))
+        assert manager.mounted == []
@@ -0,0 +1,70 @@
+"""
+Test module for eulerinstall.lib.output
+"""
+import stat
+import threading
+from pathlib import Path
+
+from eulerinstall.lib.output import _LogWriter
+
+
+class TestLogWriter:
+    """Test _LogWriter class."""
+
+    def test_lines_written_in_order(self, tmp_path: Path) -> None:
+        """Queued lines should be in the files after a flush, in the order they were written."""
+        writer = _LogWriter()
+        log_file = tmp_path / 'install.log'
+
+        for i in range(5000):
+            writer.write(log_file, f'line {i}\n')
+            writer.write(tmp_path / 'cmd_output.txt', 'x')
+        writer.flush(sync=True)
+
+        assert log_file.read_text().splitlines() == [f'line {i}' for i in range(5000)]
+        assert (tmp_path / 'cmd_output.txt').read_text() == 'x' * 5000
+
+        writer.close()
+
+    def test_mode_of_created_file(self, tmp_path: Path) -> None:
+        """The mode should be applied to a file created by the writer."""
+        writer = _LogWriter()
+        writer.write(tmp_path / 'cmd_history.txt', 'ls\n', mode=stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP)
+        writer.close()
+
+        assert stat.S_IMODE((tmp_path / 'cmd_history.txt').stat().st_mode) == 0o640
+        assert (tmp_path / 'cmd_history.txt').read_text() == 'ls\n'
+
+    def test_missing_directory(self, tmp_path: Path) -> None:
+        """Lines for a file which cannot be opened should be dropped without stopping the writer."""
+        writer = _LogWriter()
+        writer.write(tmp_path / 'missing/install.log', 'lost\n')
+        writer.write(tmp_path / 'install.log', 'kept\n')
+        writer.close()
+
+        assert (tmp_path / 'install.log').read_text() == 'kept\n'
+
+    def test_bad_line(self, tmp_path: Path) -> None:
+        """A line which cannot be written should not stop the writer from writing the later ones."""
+        writer = _LogWriter()
+        log_file = tmp_path / 'install.log'
+        writer.write(log_file, 'bad \udc80\n')
+        writer.write(log_file, 'kept\n')
+        writer.flush()
+
+        assert writer._thread is not None and writer._thread.is_alive()
+        assert log_file.read_text() == 'kept\n'
+
+        writer.close()
+
+    def test_dead_thread(self, tmp_path: Path) -> None:
+        """Without a running writer thread lines should be appended directly."""
+        writer = _LogWriter(max_queued=1)
+        writer.write(tmp_path / 'install.log', 'first\n')
+        writer.close()
+
+        writer._thread = threading.Thread(target=lambda: None)
+        writer.write(tmp_path / 'install.log', 'second\n')
+        writer.write(tmp_path / 'install.log', 'third\n')
+
+        assert (tmp_path / 'install.log').read_text() == 'first\nsecond\nthird\n'
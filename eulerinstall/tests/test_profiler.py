@@ -0,0 +1,72 @@
+"""
+Test module for eulerinstall.lib.profiler
+"""
+import json
+import time
+from pathlib import Path
+
+from eulerinstall.lib.profiler import PhaseProfiler
+
+
+class TestPhaseProfiler:
+    """Test PhaseProfiler class."""
+
+    def test_nested_phases(self) -> None:
+        """Nested phases should be recorded under the path of their parent."""
+        profiler = PhaseProfiler()
+
+        with profiler.phase('install'):
+            with profiler.phase('fstab'):
+                time.sleep(0.02)
+
+        stats = {s.path: s for s in profiler.stats()}
+
+        assert list(stats) == ['install', 'install;fstab']
+        assert stats['install;fstab'].depth == 1
+        assert stats['install'].wall >= stats['install;fstab'].wall
+        assert stats['install'].self_wall < stats['install'].wall
+
+    def test_decorator_counts_calls(self) -> None:
+        """A decorated function should accumulate every call in one entry."""
+        profiler = PhaseProfiler()
+
+        @profiler.phase('arch_chroot')
+        def chroot() -> None:
+            profiler.count_child()
+
+        for _ in range(3):
+            chroot()
+
+        stats = profiler.stats()
+
+        assert len(stats) == 1
+        assert stats[0].calls == 3
+        assert stats[0].children == 3
+
+    def test_failing_phase_is_recorded(self) -> None:
+        """A phase should be recorded even if it raises."""
+        profiler = PhaseProfiler()
+
+        try:
+            with profiler.phase('mount'):
+                raise ValueError('mount failed')
+        except ValueError:
+            pass
+
+        assert profiler.stats()[0].calls == 1
+
+    def test_write_report(self, tmp_path: Path) -> None:
+        """The report should contain the JSON timings and the folded stacks."""
+        profiler = PhaseProfiler()
+
+        with profiler.phase('install'):
+            with profiler.phase('copy'):
+                pass
+
+        profiler.write_report(tmp_path)
+
+        report = json.loads((tmp_path / 'timings.json').read_text())
+        folded = (tmp_path / 'timings.folded').read_text().splitlines()
+
+        assert [phase['path'] for phase in report['phases']] == ['install', 'install;copy']
+        assert [line.split()[0] for line in folded] == ['install', 'install;copy']
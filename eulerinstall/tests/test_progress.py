@@ -0,0 +1,187 @@
+"""
+Test module for eulerinstall.lib.progress
+"""
+import json
+import os
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import pytest
+
+from eulerinstall.lib import progress as progress_module
+from eulerinstall.lib.progress import ProgressReporter
+
+
+class FakeClock:
+    """Stands in for the time module, only moves when advanced."""
+
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class FakeTimer:
+    """Records the timers instead of starting a thread, fire() runs the callback."""
+
+    created: list['FakeTimer'] = []
+
+    def __init__(self, interval: float, function: Callable[..., None], args: tuple[Any, ...] = ()) -> None:
+        self.interval = interval
+        self.function = function
+        self.args = args
+        self.daemon = False
+        FakeTimer.created.append(self)
+
+    def start(self) -> None:
+        pass
+
+    def fire(self) -> None:
+        self.function(*self.args)
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(progress_module, 'time', fake)
+    monkeypatch.setattr(progress_module.threading, 'Timer', FakeTimer)
+    FakeTimer.created = []
+    return fake
+
+
+@pytest.fixture
+def reporter() -> Iterator[tuple[ProgressReporter, int]]:
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(read_fd, False)
+    reporter = ProgressReporter()
+    reporter.open_fd(write_fd)
+
+    yield reporter, read_fd
+
+    if reporter._stream is not None:
+        reporter._stream.close()
+    os.close(read_fd)
+
+
+def _events(read_fd: int) -> list[dict[str, Any]]:
+    try:
+        data = os.read(read_fd, 65536)
+    except BlockingIOError:
+        return []
+    return [json.loads(line) for line in data.decode().splitlines()]
+
+
+class TestThrottle:
+    """Test the throttling of frequent events."""
+
+    def test_events_within_interval(self, clock: FakeClock, reporter: tuple[ProgressReporter, int]) -> None:
+        """Only the first event of a kind within the interval is written at once."""
+        progress, read_fd = reporter
+
+        progress.step('first')
+        clock.advance(0.1)
+        progress.step('second')
+
+        assert [event['message'] for event in _events(read_fd)] == ['first']
+
+        clock.advance(0.25)
+        progress.step('third')
+
+        assert [event['message'] for event in _events(read_fd)] == ['third']
+
+    def test_unthrottled_kinds(self, clock: FakeClock, reporter: tuple[ProgressReporter, int]) -> None:
+        """Phase events and forced events are never held back."""
+        progress, read_fd = reporter
+
+        progress.phase_start('copy')
+        progress.phase_start('grub')
+        progress.step('first')
+        progress.emit('step', force=True, message='forced')
+
+        events = _events(read_fd)
+
+        assert [event['event'] for event in events] == ['phase_start', 'phase_start', 'step', 'step']
+        assert FakeTimer.created == []
+
+
+class TestPendingFlush:
+    """Test the delivery of events held back by the throttle."""
+
+    def test_timer_writes_last_event(self, clock: FakeClock, reporter: tuple[ProgressReporter, int]) -> None:
+        """The timer writes the latest held back event once, for the rest of the interval."""
+        progress, read_fd = reporter
+
+        progress.step('first')
+        clock.advance(0.1)
+        progress.step('second')
+        progress.step('third')
+
+        assert len(FakeTimer.created) == 1
+        assert FakeTimer.created[0].interval == pytest.approx(0.15)
+
+        _events(read_fd)
+        clock.advance(0.15)
+        FakeTimer.created[0].fire()
+
+        assert [event['message'] for event in _events(read_fd)] == ['third']
+
+        FakeTimer.created[0].fire()
+
+        assert _events(read_fd) == []
+
+    def test_phase_end_flushes(self, clock: FakeClock, reporter: tuple[ProgressReporter, int]) -> None:
+        """Held back events of a phase arrive before its end."""
+        progress, read_fd = reporter
+
+        progress.step('first')
+        progress.step('second')
+        progress.phase_end('copy')
+
+        events = _events(read_fd)
+
+        assert [event['event'] for event in events] == ['step', 'step', 'phase_end']
+        assert events[1]['message'] == 'second'
+
+
+class TestCopyProgress:
+    """Test the copy events."""
+
+    def test_eta(self, clock: FakeClock, reporter: tuple[ProgressReporter, int]) -> None:
+        """The remaining time follows the rate since the copy started."""
+        progress, read_fd = reporter
+
+        progress.copy_progress(0, 1000)
+        clock.advance(2)
+        progress.copy_progress(250, 1000)
+
+        events = _events(read_fd)
+
+        assert events[0]['eta'] is None
+        assert events[1] == {
+            'event': 'copy',
+            'time': clock.now,
+            'copied_units': 250,
+            'total_units': 1000,
+            'percent': 25.0,
+            'eta': 6.0,
+        }
+
+    def test_finished_copy_is_forced(self, clock: FakeClock, reporter: tuple[ProgressReporter, int]) -> None:
+        """The last copy event is written even within the throttle interval."""
+        progress, read_fd = reporter
+
+        progress.copy_progress(0, 1000)
+        clock.advance(0.1)
+        progress.copy_progress(1000, 1000)
+
+        events = _events(read_fd)
+
+        assert [event['percent'] for event in events] == [0.0, 100.0]
+        assert events[1]['eta'] == 0.0
@@ -0,0 +1,92 @@
+"""
+Test module for eulerinstall.lib.rootfs_copy
+"""
+import os
+from pathlib import Path
+
+from eulerinstall.lib.rootfs_copy import RootfsCopier, split_units
+
+MIB = 1024 * 1024
+
+
+class TestSplitUnits:
+    """Test split_units function."""
+
+    def test_all_paths_assigned_once(self) -> None:
+        """Every path should end up in exactly one unit."""
+        groups = [(f'dir{d}', [(f'dir{d}/f{i}', 10 * MIB) for i in range(20)]) for d in range(10)]
+        units = split_units(groups, workers=4)
+
+        paths = [path for unit in units for path in unit.paths]
+        assert sorted(paths) == sorted(path for _, entries in groups for path, _ in entries)
+
+    def test_units_are_balanced(self) -> None:
+        """No unit should be much larger than the target size."""
+        groups = [(f'dir{d}', [(f'dir{d}/f{i}', 10 * MIB) for i in range(20)]) for d in range(10)]
+        units = split_units(groups, workers=4)
+
+        assert len(units) >= 4
+        assert max(unit.size for unit in units) <= 2 * min(unit.size for unit in units) + 10 * MIB
+
+    def test_sorted_largest_first(self) -> None:
+        """Units should be returned in descending size order."""
+        groups = [('a', [('a/big', 500 * MIB)]), ('b', [('b/small', 1 * MIB)])]
+        units = split_units(groups, workers=2)
+
+        assert [unit.size for unit in units] == sorted((unit.size for unit in units), reverse=True)
+
+    def test_small_tree_single_unit(self) -> None:
+        """A tree below the minimum unit size should not be split."""
+        groups = [('a', [('a/x', 1000)]), ('b', [('b/y', 1000)])]
+        units = split_units(groups, workers=8)
+
+        assert len(units) == 1
+
+
+class TestRootfsCopierScan:
+    """Test the source walk of RootfsCopier."""
+
+    def test_excludes(self, tmp_path: Path) -> None:
+        """Pseudo filesystems, temporary files and machine ids should be skipped."""
+        for directory in ['dev', 'proc', 'tmp', 'var/log', 'etc', 'usr/bin']:
+            (tmp_path / directory).mkdir(parents=True)
+
+        (tmp_path / 'dev/null').write_text('')
+        (tmp_path / 'tmp/scratch').write_text('x')
+        (tmp_path / 'var/log/messages').write_text('x')
+        (tmp_path / 'etc/machine-id').write_text('x')
+        (tmp_path / 'etc/hostname').write_text('x')
+        (tmp_path / 'usr/bin/true').write_text('x')
+
+        plan = RootfsCopier(tmp_path, Path('/mnt'), workers=2).scan()
+        paths = sorted(path for unit in plan.units for path in unit.paths)
+
+        assert paths == ['etc/hostname', 'usr/bin/true']
+        assert plan.total_files == 2
+
+    def test_hardlinks_grouped(self, tmp_path: Path) -> None:
+        """Files sharing an inode should be copied by the same unit."""
+        (tmp_path / 'a').mkdir()
+        (tmp_path / 'b').mkdir()
+        (tmp_path / 'a/file').write_text('x')
+        os.link(tmp_path / 'a/file', tmp_path / 'b/link')
+
+        plan = RootfsCopier(tmp_path, Path('/mnt'), workers=2).scan()
+        hardlink_units = [unit for unit in plan.units if unit.hardlinks]
+
+        assert len(hardlink_units) == 1
+        assert sorted(hardlink_units[0].paths) == ['a/file', 'b/link']
+
+    def test_skip_subtrees(self, tmp_path: Path) -> None:
+        """Subtrees copied separately should be left out of the walk and the rsync rules."""
+        for directory in ['boot/efi/EFI', 'boot/grub2']:
+            (tmp_path / directory).mkdir(parents=True)
+
+        (tmp_path / 'boot/efi/EFI/grubx64.efi').write_text('x')
+        (tmp_path / 'boot/grub2/grub.cfg').write_text('x')
+
+        copier = RootfsCopier(tmp_path, Path('/mnt'), workers=2, subtree='boot', skip_subtrees=['boot/efi'])
+        paths = sorted(path for unit in copier.scan().units for path in unit.paths)
+
+        assert paths == ['grub2/grub.cfg']
+        assert '--exclude=/efi/' in copier._exclude_rules()
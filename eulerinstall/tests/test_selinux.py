@@ -0,0 +1,166 @@
+"""
+Test module for eulerinstall.lib.selinux
+"""
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from eulerinstall.lib.exceptions import RequirementError
+from eulerinstall.lib.selinux import SelinuxLabeler, TreeScan, find_unlabeled, plan_units, scan_tree, supports_context, target_mounts
+
+
+class TestTargetMounts:
+    """Test target_mounts function."""
+
+    def test_mounts_below_target(self, tmp_path: Path) -> None:
+        """Only mounts at or below the target should be returned, parents first."""
+        mounts_file = tmp_path / 'mountinfo'
+        mounts_file.write_text(
+            '20 1 8:2 / / rw - ext4 /dev/sda2 rw\n'
+            '60 20 8:17 / /mnt/boot/efi rw - vfat /dev/sdb1 rw\n'
+            '61 20 8:18 / /mnt rw - ext4 /dev/sdb2 rw\n'
+            '62 61 8:19 / /mnt/home\\040dir rw - xfs /dev/sdb3 rw\n'
+            '63 20 8:33 / /mnt2 rw - ext4 /dev/sdc1 rw\n'
+        )
+
+        mounts = target_mounts(Path('/mnt'), mounts_file)
+
+        assert [(str(mount.path), mount.fs_type) for mount in mounts] == [
+            ('/mnt', 'ext4'),
+            ('/mnt/home dir', 'xfs'),
+            ('/mnt/boot/efi', 'vfat'),
+        ]
+
+    def test_overmount_wins(self, tmp_path: Path) -> None:
+        """A later mount on the same path should hide the earlier one."""
+        mounts_file = tmp_path / 'mountinfo'
+        mounts_file.write_text(
+            '61 20 8:18 / /mnt rw - ext4 /dev/sdb2 rw\n'
+            '62 61 0:25 / /mnt/run rw - tmpfs tmpfs rw\n'
+            '63 62 0:26 / /mnt/run rw - tmpfs /run rw\n'
+            '64 63 8:19 / /mnt/run rw - xfs /dev/sdb3 rw\n'
+        )
+
+        assert [mount.fs_type for mount in target_mounts(Path('/mnt'), mounts_file)] == ['ext4', 'xfs']
+
+
+class TestPlanUnits:
+    """Test scan_tree and plan_units functions."""
+
+    def test_every_entry_labeled_once(self, tmp_path: Path) -> None:
+        """The units together should cover the tree exactly once."""
+        for directory in ('usr/lib', 'usr/share', 'etc'):
+            (tmp_path / directory).mkdir(parents=True)
+            for i in range(3000):
+                (tmp_path / directory / f'f{i}').touch()
+        (tmp_path / 'usr/share/doc').mkdir()
+        (tmp_path / 'readme').touch()
+
+        scan = scan_tree(str(tmp_path))
+        units = plan_units(scan, workers=2)
+
+        # 9000 files, readme and six directories including the root
+        assert scan.total == 9007
+        assert sum(unit.files for unit in units) == scan.total
+        assert len(units) > 1
+
+        parents = next(unit for unit in units if unit.paths == [str(tmp_path)])
+        labeled = sorted(path for unit in units if unit is not parents for path in unit.paths)
+        assert labeled == sorted(parents.excludes)
+
+    def test_nested_mountpoints(self, tmp_path: Path) -> None:
+        """Only the given mountpoints should be left out, other directories are scanned."""
+        (tmp_path / 'boot/efi').mkdir(parents=True)
+        (tmp_path / 'boot/efi/EFI').touch()
+        (tmp_path / 'home/user').mkdir(parents=True)
+
+        scan = scan_tree(str(tmp_path), {str(tmp_path), str(tmp_path / 'boot/efi')})
+
+        assert scan.mountpoints == [str(tmp_path / 'boot/efi')]
+        # the root, boot, home and home/user
+        assert scan.total == 4
+
+    def test_small_tree_single_unit(self) -> None:
+        """A tree smaller than a unit should not be split."""
+        scan = TreeScan('/mnt', counts={'/mnt': 10, '/mnt/etc': 5}, children={'/mnt': ['/mnt/etc'], '/mnt/etc': []}, mountpoints=['/mnt/boot'])
+
+        units = plan_units(scan, workers=4)
+
+        assert [(unit.paths, unit.files) for unit in units] == [(['/mnt/etc'], 5), (['/mnt'], 5)]
+        assert units[1].excludes == ['/mnt/etc', '/mnt/boot']
+        assert units[0].excludes == ['/mnt/boot']
+
+
+class TestSelinuxLabeler:
+    """Test SelinuxLabeler class."""
+
+    def test_policy_of_target(self, tmp_path: Path) -> None:
+        """The file contexts should be taken from the policy configured in the target."""
+        (tmp_path / 'etc/selinux/mls/contexts/files').mkdir(parents=True)
+        (tmp_path / 'etc/selinux/mls/contexts/files/file_contexts').touch()
+        (tmp_path / 'etc/selinux/config').write_text('# comment\nSELINUX=enforcing\nSELINUXTYPE=mls\n')
+
+        labeler = SelinuxLabeler(tmp_path)
+
+        assert labeler.enabled()
+        assert labeler.file_contexts() == tmp_path / 'etc/selinux/mls/contexts/files/file_contexts'
+
+    def test_disabled_or_missing_policy(self, tmp_path: Path) -> None:
+        """A disabled SELinux or a missing policy should be detected."""
+        (tmp_path / 'etc/selinux').mkdir(parents=True)
+        (tmp_path / 'etc/selinux/config').write_text('SELINUX=disabled\n')
+
+        labeler = SelinuxLabeler(tmp_path)
+
+        assert not labeler.enabled()
+        with pytest.raises(RequirementError):
+            labeler.file_contexts()
+
+
+class TestFindUnlabeled:
+    """Test find_unlabeled function."""
+
+    CONTEXT = b'system_u:object_r:etc_t:s0'
+
+    def test_only_unlabeled_entries(self, tmp_path: Path) -> None:
+        """Labeled entries should be skipped and unlabeled directories returned without their content."""
+        if not supports_context(tmp_path, self.CONTEXT):
+            pytest.skip('filesystem cannot store SELinux contexts')
+
+        (tmp_path / 'etc/new').mkdir(parents=True)
+        (tmp_path / 'etc/new/file').touch()
+        (tmp_path / 'etc/passwd').touch()
+        (tmp_path / 'etc/shadow').touch()
+
+        for path in (tmp_path, tmp_path / 'etc', tmp_path / 'etc/passwd'):
+            os.setxattr(path, 'security.selinux', self.CONTEXT)
+
+        assert sorted(find_unlabeled(str(tmp_path))) == [str(tmp_path / 'etc/new'), str(tmp_path / 'etc/shadow')]
+
+    def test_changed_entries(self, tmp_path: Path) -> None:
+        """Entries changed after the copy should be returned even though they have a context."""
+        if not supports_context(tmp_path, self.CONTEXT):
+            pytest.skip('filesystem cannot store SELinux contexts')
+
+        for directory in ('etc', 'boot'):
+            (tmp_path / directory).mkdir()
+        for file in ('etc/passwd', 'etc/shadow', 'boot/grub.cfg', 'boot/vmlinuz'):
+            (tmp_path / file).touch()
+        for path in tmp_path.rglob('*'):
+            os.setxattr(path, 'security.selinux', self.CONTEXT)
+        os.setxattr(tmp_path, 'security.selinux', self.CONTEXT)
+
+        copied_at = max(path.lstat().st_ctime for path in tmp_path.rglob('*'))
+        time.sleep(0.1)
+
+        # rewritten in place and replaced, both with the context of their parent directory
+        (tmp_path / 'boot/grub.cfg').write_text('menuentry')
+        (tmp_path / 'etc/shadow.new').touch()
+        os.setxattr(tmp_path / 'etc/shadow.new', 'security.selinux', self.CONTEXT)
+        os.rename(tmp_path / 'etc/shadow.new', tmp_path / 'etc/shadow')
+
+        assert find_unlabeled(str(tmp_path)) == []
+        # etc itself changed with the replaced file, it is labeled with its content
+        assert sorted(find_unlabeled(str(tmp_path), changed_since=copied_at + 0.05)) == [str(tmp_path / 'boot/grub.cfg'), str(tmp_path / 'etc')]
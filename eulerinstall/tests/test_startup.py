@@ -0,0 +1,49 @@
+"""
+Test module for eulerinstall.lib.startup
+"""
+import sys
+
+from eulerinstall.lib.startup import StartupProfile
+
+
+class TestStartupProfile:
+    """Test StartupProfile class."""
+
+    def test_imports(self) -> None:
+        """First imports should be recorded, modules already loaded not."""
+        sys.modules.pop('colorsys', None)
+        profile = StartupProfile()
+        profile.trace_imports()
+
+        try:
+            import colorsys  # noqa: F401
+            import json  # noqa: F401
+        finally:
+            profile.stop_tracing()
+
+        assert 'colorsys' in profile.imports
+        assert 'json' not in profile.imports
+
+    def test_stop_tracing(self) -> None:
+        """builtins.__import__ should be restored."""
+        import builtins
+
+        original = builtins.__import__
+        profile = StartupProfile()
+        profile.trace_imports()
+        profile.stop_tracing()
+
+        assert builtins.__import__ is original
+
+    def test_steps(self) -> None:
+        """Steps should be listed in the summary in the order they ran."""
+        profile = StartupProfile()
+
+        with profile.step('parse arguments'):
+            pass
+        with profile.step('load configuration'):
+            pass
+
+        assert [name for name, _ in profile.steps] == ['parse arguments', 'load configuration']
+        summary = profile.summary()
+        assert summary.index('parse arguments') < summary.index('load configuration')
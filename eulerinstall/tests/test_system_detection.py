@@ -5,12 +5,19 @@ import subprocess
 from unittest.mock import patch, mock_open, MagicMock
 import pytest
 
-from eulerinstall.lib.system_detection import SystemType
+from eulerinstall.lib.system_detection import HostProfile, SystemType
 
 
 class TestSystemType:
     """Test SystemType class"""
 
+    @pytest.fixture(autouse=True)
+    def reset_host_profile(self):
+        """Detect the system type anew in every test"""
+        SystemType.set_host_profile(None)
+        yield
+        SystemType.set_host_profile(None)
+
     @patch('eulerinstall.lib.system_detection.Path')
     @patch('subprocess.run')
     def test_detect_arch_via_os_release(self, mock_run, mock_path):
@@ -160,8 +167,7 @@ class TestSystemType:
             assert result == 'unknown'
             mock_debug.assert_called_once()
 
-    @patch.object(SystemType, 'detect')
-    def test_get_package_manager(self, mock_detect):
+    def test_get_package_manager(self):
         """Test get_package_manager for each system type"""
         test_cases = [
             ('arch', 'pacman'),
@@ -171,12 +177,11 @@ class TestSystemType:
             ('unknown', 'unknown'),
         ]
         for sys_type, expected in test_cases:
-            mock_detect.return_value = sys_type
+            SystemType.set_host_profile(HostProfile.for_distro(sys_type))
             result = SystemType.get_package_manager()
             assert result == expected
 
-    @patch.object(SystemType, 'detect')
-    def test_get_install_command(self, mock_detect):
+    def test_get_install_command(self):
         """Test get_install_command for each system type"""
         test_cases = [
             ('arch', 'pacstrap'),
@@ -186,12 +191,11 @@ class TestSystemType:
             ('unknown', 'unknown'),
         ]
         for sys_type, expected in test_cases:
-            mock_detect.return_value = sys_type
+            SystemType.set_host_profile(HostProfile.for_distro(sys_type))
             result = SystemType.get_install_command()
             assert result == expected
 
-    @patch.object(SystemType, 'detect')
-    def test_get_sync_command(self, mock_detect):
+    def test_get_sync_command(self):
         """Test get_sync_command for each system type"""
         test_cases = [
             ('arch', 'pacman -Syy'),
@@ -201,22 +205,20 @@ class TestSystemType:
             ('unknown', 'unknown'),
         ]
         for sys_type, expected in test_cases:
-            mock_detect.return_value = sys_type
+            SystemType.set_host_profile(HostProfile.for_distro(sys_type))
             result = SystemType.get_sync_command()
             assert result == expected
 
-    @patch.object(SystemType, 'detect')
-    def test_get_time_sync_command(self, mock_detect):
+    def test_get_time_sync_command(self):
         """Test get_time_sync_command for each system type"""
         # All return same command
         test_cases = ['arch', 'openEuler', 'ubuntu', 'debian', 'unknown']
         for sys_type in test_cases:
-            mock_detect.return_value = sys_type
+            SystemType.set_host_profile(HostProfile.for_distro(sys_type))
             result = SystemType.get_time_sync_command()
             assert result == 'timedatectl show --property=NTPSynchronized --value'
 
-    @patch.object(SystemType, 'detect')
-    def test_get_mirror_service(self, mock_detect):
+    def test_get_mirror_service(self):
         """Test get_mirror_service for each system type"""
         test_cases = [
             ('arch', 'reflector'),
@@ -226,12 +228,11 @@ class TestSystemType:
             ('unknown', 'unknown'),
         ]
         for sys_type, expected in test_cases:
-            mock_detect.return_value = sys_type
+            SystemType.set_host_profile(HostProfile.for_distro(sys_type))
             result = SystemType.get_mirror_service()
             assert result == expected
 
-    @patch.object(SystemType, 'detect')
-    def test_get_keyring_service(self, mock_detect):
+    def test_get_keyring_service(self):
         """Test get_keyring_service for each system type"""
         test_cases = [
             ('arch', 'archlinux-keyring-wkd-sync'),
@@ -241,7 +242,7 @@ class TestSystemType:
             ('unknown', 'unknown'),
         ]
         for sys_type, expected in test_cases:
-            mock_detect.return_value = sys_type
+            SystemType.set_host_profile(HostProfile.for_distro(sys_type))
             result = SystemType.get_keyring_service()
             assert result == expected
 
@@ -285,4 +286,40 @@ class TestSystemType:
             # Should have 4 calls because of warning
             calls = mock_info.call_args_list
             assert len(calls) == 4
-            assert 'Warning: This system type is not officially supported by archinstall' in calls[3][0][0]
\ No newline at end of file
+            assert 'Warning: This system type is not officially supported by archinstall' in calls[3][0][0]
+
+    @patch('eulerinstall.lib.system_detection.Path')
+    @patch('subprocess.run')
+    def test_detect_is_cached(self, mock_run, mock_path):
+        """Test that the system is only detected once"""
+        mock_path_instance = MagicMock()
+        mock_path_instance.exists.return_value = True
+        mock_path.return_value = mock_path_instance
+
+        with patch('builtins.open', mock_open(read_data='NAME="openEuler"')) as mock_file:
+            assert SystemType.detect() == 'openEuler'
+            assert SystemType.detect() == 'openEuler'
+            assert SystemType.host_profile().package_manager == 'dnf'
+            mock_file.assert_called_once_with('/etc/os-release', 'r')
+
+        mock_run.assert_not_called()
+
+    @patch.object(SystemType, '_detect_distro')
+    def test_set_host_profile(self, mock_detect_distro):
+        """Test that an injected host profile replaces the detection"""
+        SystemType.set_host_profile(HostProfile.for_distro('arch'))
+
+        assert SystemType.detect() == 'arch'
+        assert SystemType.host_profile().chroot_command == 'arch-chroot'
+        assert SystemType.get_package_manager() == 'pacman'
+        mock_detect_distro.assert_not_called()
+
+    def test_host_profile_for_distro(self):
+        """Test the derived values of the host profile"""
+        profile = HostProfile.for_distro('openEuler')
+
+        assert profile.package_manager == 'dnf'
+        assert profile.chroot_command == 'chroot'
+        assert str(profile.lock_file) == '/var/lib/dnf/dnf.lock'
+        assert profile.mirror_service == 'dnf-makecache.timer'
+        assert HostProfile.for_distro('unknown').package_manager == 'unknown'
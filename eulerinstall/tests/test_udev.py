@@ -0,0 +1,94 @@
+"""
+Test module for eulerinstall.lib.disk.udev
+"""
+import os
+import stat
+import threading
+from pathlib import Path
+
+import pytest
+
+from eulerinstall.lib.disk.udev import partitions_ready, wait_for_partitions
+
+
+def _partition(sys_block: Path, disk: str, name: str, sectors: int) -> None:
+    path = sys_block / disk / name
+    path.mkdir(parents=True)
+    (path / 'partition').write_text('1\n')
+    (path / 'size').write_text(f'{sectors}\n')
+    (sys_block / name).symlink_to(path)
+
+
+class TestPartitionsReady:
+    """Test partitions_ready function."""
+
+    def test_missing_disk(self, tmp_path: Path) -> None:
+        """A disk unknown to sysfs is never ready."""
+        assert not partitions_ready('sda', {}, tmp_path / 'sys', tmp_path / 'dev')
+
+    def test_no_partitions(self, tmp_path: Path) -> None:
+        """A wiped disk is ready once all partitions are gone."""
+        (tmp_path / 'sys' / 'sda').mkdir(parents=True)
+
+        assert partitions_ready('sda', {}, tmp_path / 'sys', tmp_path / 'dev')
+
+        _partition(tmp_path / 'sys', 'sda', 'sda1', 2048)
+
+        assert not partitions_ready('sda', {}, tmp_path / 'sys', tmp_path / 'dev')
+
+    def test_size_and_node(self, tmp_path: Path) -> None:
+        """A partition needs the expected size and a block device node."""
+        sys_block = tmp_path / 'sys'
+        _partition(sys_block, 'sda', 'sda1', 2048)
+        (tmp_path / 'dev').mkdir()
+        (tmp_path / 'dev' / 'sda1').touch()
+
+        # a regular file is not a device node
+        assert not partitions_ready('sda', {'sda1': 2048 * 512}, sys_block, tmp_path / 'dev')
+        assert not partitions_ready('sda', {'sda1': 4096 * 512}, sys_block, tmp_path / 'dev')
+        assert not partitions_ready('sda', {'sda1': 2048 * 512, 'sda2': 512}, sys_block, tmp_path / 'dev')
+
+
+@pytest.mark.skipif(os.geteuid() != 0, reason='creating device nodes requires root')
+class TestWaitForPartitions:
+    """Test wait_for_partitions function."""
+
+    def test_wait(self, tmp_path: Path) -> None:
+        """The wait should end once the partition appears."""
+        sys_block = tmp_path / 'sys'
+        dev = tmp_path / 'dev'
+        (sys_block / 'sda').mkdir(parents=True)
+        dev.mkdir()
+        (dev / 'sda').touch()
+
+        def add_partition() -> None:
+            os.mknod(dev / 'sda1', stat.S_IFBLK | 0o600, os.makedev(8, 1))
+            _partition(sys_block, 'sda', 'sda1', 2048)
+
+        timer = threading.Timer(0.2, add_partition)
+        timer.start()
+
+        try:
+            assert wait_for_partitions(dev / 'sda', {dev / 'sda1': 2048 * 512}, 5, sys_block, dev)
+        finally:
+            timer.join()
+
+    def test_timeout(self, tmp_path: Path) -> None:
+        """The wait should give up after the timeout."""
+        sys_block = tmp_path / 'sys'
+        (sys_block / 'sda').mkdir(parents=True)
+        (tmp_path / 'sda').touch()
+
+        assert not wait_for_partitions(tmp_path / 'sda', {tmp_path / 'sda1': 512}, 0.2, sys_block, tmp_path)
+
+    def test_extended_partition(self, tmp_path: Path) -> None:
+        """An extended partition only has to exist, sysfs reports it with 2 sectors."""
+        sys_block = tmp_path / 'sys'
+        dev = tmp_path / 'dev'
+        dev.mkdir()
+        (dev / 'sda').touch()
+        os.mknod(dev / 'sda2', stat.S_IFBLK | 0o600, os.makedev(8, 2))
+        _partition(sys_block, 'sda', 'sda2', 2)
+
+        assert wait_for_partitions(dev / 'sda', {dev / 'sda2': None}, 1, sys_block, dev)
+        assert not wait_for_partitions(dev / 'sda', {dev / 'sda2': 4096 * 512}, 0.2, sys_block, dev)
@@ -79,6 +79,7 @@ export default {
     use_same_password_for_admin: 'Use Same Password for Admin',
     admin_password: 'Admin Password',
     install_failed: 'Install Failed',
+    remaining_time: 'About {time} remaining',
     close: 'Close',
     reboot: 'Reboot',
     root_user_forbidden: 'root is a default system user, please use another username',
@@ -79,6 +79,7 @@ export default {
     use_same_password_for_admin: '为管理员使用同样的密码',
     admin_password: '管理员密码',
     install_failed: '安装失败',
+    remaining_time: '预计剩余 {time}',
     close: '关闭',
     reboot: '重启',
     root_user_forbidden: 'root 属于默认的系统用户，请使用其他用户名',